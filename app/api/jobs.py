@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.api.scheduler import (
+    ScheduleRequest,
+    ScheduleResponse,
+    cache_key,
+    ensure_feasible,
+    get_cache,
+    response_content,
+    schedule,
+    schedule_kwargs,
+)
+from app.metrics import CLIENT_CLOSED_REQUEST, record_request, record_solve
+from app.pool import PoolSaturatedError, SolveHandle, get_pool
+
+router = APIRouter()
+
+
+class JobStatusResponse(BaseModel):
+    """Job status model"""
+    job_id: str
+    status: str
+    best_objective: Optional[int] = None
+    best_bound: Optional[float] = None
+    elapsed_seconds: float
+    result: Optional[ScheduleResponse] = None
+    error: Optional[str] = None
+
+
+class Job:
+    """A scheduling job and everything known about it so far"""
+
+    def __init__(self, job_id: str, handle: Optional[SolveHandle]):
+        self.job_id = job_id
+        self.handle = handle
+        self.status = "running"
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.best_objective: Optional[int] = None
+        self.best_bound: Optional[float] = None
+        self.result: Optional[ScheduleResponse] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def to_response(self) -> JobStatusResponse:
+        end = self.finished_at if self.finished else time.monotonic()
+        return JobStatusResponse(
+            job_id=self.job_id,
+            status=self.status,
+            best_objective=self.best_objective,
+            best_bound=self.best_bound,
+            elapsed_seconds=end - self.created_at,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobStore:
+    """
+    In-process job registry.
+
+    Finished jobs are kept for ``ttl_seconds`` so their results can be fetched
+    repeatedly, and at most ``max_jobs`` are held at once; the oldest finished
+    jobs are evicted first. Eviction is done lazily on every access.
+    """
+
+    def __init__(self, ttl_seconds: float, max_jobs: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Job] = {}
+
+    def evict(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl_seconds:
+                del self._jobs[job_id]
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at
+        )
+        while len(self._jobs) >= self.max_jobs and finished:
+            del self._jobs[finished.pop(0).job_id]
+
+    def has_room(self) -> bool:
+        self.evict()
+        return len(self._jobs) < self.max_jobs
+
+    def add(self, job: Job) -> None:
+        self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.evict()
+        return self._jobs.get(job_id)
+
+    def remove(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+
+_store: Optional[JobStore] = None
+
+
+def get_store() -> JobStore:
+    """Return the shared job store, configured from the environment on first use"""
+    global _store
+    if _store is None:
+        _store = JobStore(
+            ttl_seconds=float(os.getenv("JOB_TTL_SECONDS", "3600")),
+            max_jobs=int(os.getenv("JOB_STORE_MAX_JOBS", "100")),
+        )
+    return _store
+
+
+def _complete(job: Job, result: Dict[str, Any], output_format: str) -> None:
+    job.result = ScheduleResponse(**response_content(result, output_format))
+    job.best_objective = job.result.objective_value
+    job.status = "cancelled" if job.cancel_requested else "completed"
+
+
+async def _run_job(
+    job: Job, key: Optional[str], time_limit: int, output_format: str, started: float
+) -> None:
+    # The job's request is counted when the job ends, with the code its failure stands for
+    code = 200
+    try:
+        async for update in job.handle.updates():
+            job.best_objective = update["objective_value"]
+            job.best_bound = update["best_bound"]
+        result = await job.handle.result()
+        record_solve(result)
+        # A cancelled search did not get its full time limit, so it must not be reused
+        if key is not None and not job.cancel_requested:
+            get_cache().put(key, time_limit, result)
+        _complete(job, result, output_format)
+    except AssertionError as e:
+        code = 400
+        job.status = "failed"
+        job.error = f"Invalid input constraints: {str(e)}"
+    except Exception as e:
+        code = 500
+        job.status = "failed"
+        job.error = f"Error generating schedule: {str(e)}"
+    finally:
+        job.finished_at = time.monotonic()
+        record_request("job", CLIENT_CLOSED_REQUEST if job.cancel_requested else code, started)
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    job = get_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def submit_job(request: ScheduleRequest):
+    """
+    Submit a schedule request to run in the background.
+
+    Returns immediately with a job id to poll with `GET /api/jobs/{job_id}`.
+    """
+    # A job answered right away is counted here; a started solve when the job ends
+    started = time.perf_counter()
+    store = get_store()
+    try:
+        if not store.has_room():
+            raise HTTPException(status_code=503, detail="Job store is full", headers={"Retry-After": "5"})
+        kwargs = schedule_kwargs(request)
+        ensure_feasible(kwargs)
+        # Diagnostics describe this solve, so they are neither served from nor stored in the cache
+        key = None if request.diagnostics else cache_key(kwargs)
+        cached = get_cache().get(key, kwargs["time_limit_seconds"]) if key is not None else None
+        if cached is None:
+            try:
+                handle = get_pool().submit_solve(schedule, **kwargs)
+            except PoolSaturatedError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        record_request("job", getattr(e, "status_code", 500), started)
+        raise
+    if cached is not None:
+        job = Job(uuid.uuid4().hex, handle=None)
+        _complete(job, cached, request.output_format)
+        job.finished_at = job.created_at
+        store.add(job)
+        record_request("job", 200, started)
+        return job.to_response()
+
+    job = Job(uuid.uuid4().hex, handle)
+    job.task = asyncio.create_task(
+        _run_job(job, key, kwargs["time_limit_seconds"], request.output_format, started)
+    )
+    store.add(job)
+    return job.to_response()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Return the status, best objective so far and, once finished, the schedule"""
+    return _get_job_or_404(job_id).to_response()
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """
+    Stop a running job or discard a finished one.
+
+    A stopped job keeps the best schedule found before cancellation and ends
+    with status `cancelled`.
+    """
+    job = _get_job_or_404(job_id)
+    if job.finished:
+        get_store().remove(job_id)
+    elif not job.cancel_requested:
+        job.cancel_requested = True
+        job.handle.cancel()
+    return job.to_response()
@@ -1,14 +1,27 @@
 import sys
 import os
+import json
+import time
+import asyncio
+from collections import deque
 
 # Add parent directory to path to import scheduler from python package
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from typing import List, Optional  # noqa: E402
-from fastapi import APIRouter, HTTPException  # noqa: E402
+from typing import Any, AsyncIterator, Deque, Dict, List, Literal, Optional, Tuple  # noqa: E402
+from fastapi import APIRouter, HTTPException, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
 from pydantic import BaseModel, Field, field_validator  # noqa: E402
 from dotenv import load_dotenv  # noqa: E402
-from python.scheduler import schedule  # noqa: E402
+from python.scheduler import diagnose_instance, normalize_pairs, repair_schedule, schedule  # noqa: E402
+from python.cache import ScheduleCache, instance_key  # noqa: E402
+from python.compact import SEATING_ENCODING, encode_seating  # noqa: E402
+from python.solver_params import default_num_workers  # noqa: E402
+from app.encoding import encoded_response  # noqa: E402
+from app.metrics import (  # noqa: E402
+    CLIENT_CLOSED_REQUEST, VALIDATION_SECONDS, record_request, record_solve, track_request,
+)
+from app.pool import ClientDisconnectedError, PoolSaturatedError, SolveHandle, get_pool  # noqa: E402
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +35,22 @@ class PairInput(BaseModel):
     v: int = Field(..., ge=1, description="Second participant ID")
 
 
+class SolverParamsInput(BaseModel):
+    """CP-SAT parameters; unset ones come from the SOLVER_* environment variables"""
+    num_workers: Optional[int] = Field(
+        default=None, ge=1, le=64,
+        description="Search workers; default: available CPUs divided by SOLVER_POOL_WORKERS",
+    )
+    random_seed: Optional[int] = Field(default=None, ge=0, description="Seed of the search")
+    linearization_level: Optional[int] = Field(
+        default=None, ge=0, le=2, description="0 = no LP relaxation, 2 = the strongest"
+    )
+    use_lns: Optional[bool] = Field(default=None, description="Run the solver's own LNS workers")
+    log_search_progress: Optional[bool] = Field(
+        default=None, description="Write the search log to the server's stderr"
+    )
+
+
 class ScheduleRequest(BaseModel):
     """Schedule request model"""
     participants: int = Field(..., ge=1, description="Number of participants (1..a)")
@@ -36,6 +65,45 @@ class ScheduleRequest(BaseModel):
     time_limit_seconds: Optional[int] = Field(
         default=None, ge=1, le=300, description="Solver time limit in seconds"
     )
+    engine: Literal["auto", "cpsat", "constructive", "lns", "rolling"] = Field(
+        default="auto",
+        description=(
+            "Scheduling engine; auto uses a closed-form construction when it reaches the objective ceiling, "
+            "lns improves a seating by large-neighbourhood search for very large events, "
+            "rolling solves one round at a time"
+        ),
+    )
+    symmetry_breaking: bool = Field(
+        default=True, description="Order interchangeable guests and rounds in the CP-SAT model"
+    )
+    lookahead_rounds: int = Field(
+        default=0, ge=0, le=3, description="Rounds the rolling engine looks ahead when fixing a round"
+    )
+    objective_mode: Literal["weighted", "lexicographic"] = Field(
+        default="weighted",
+        description=(
+            "weighted maximises one weighted sum; lexicographic maximises pairs met, "
+            "then host visits, then pair hosts in separate CP-SAT stages"
+        ),
+    )
+    hint_assignments: Optional[List[List[List[int]]]] = Field(
+        default=None,
+        description="Previous schedule (same layout as `assignments`) used to warm-start the solver",
+    )
+    solver_params: Optional[SolverParamsInput] = Field(
+        default=None, description="CP-SAT parameters for this request"
+    )
+    diagnostics: bool = Field(
+        default=False,
+        description="Add phase timings, model block sizes and solver statistics; bypasses the result cache",
+    )
+    output_format: Literal["nested", "compact"] = Field(
+        default="nested",
+        description=(
+            "nested returns `assignments` as lists of participant ids per table and round; "
+            "compact returns `seating`, a base64 int16 matrix of table indices, instead"
+        ),
+    )
 
     @field_validator('tables')
     @classmethod
@@ -48,6 +116,16 @@ class ScheduleRequest(BaseModel):
         return v
 
 
+class CompactSeating(BaseModel):
+    """Seating of a schedule as a (rounds, participants) matrix of table indices"""
+    encoding: str = Field(
+        SEATING_ENCODING,
+        description="Little-endian int16 values, row by row, base64-encoded; 0 means not seated",
+    )
+    shape: List[int] = Field(..., description="[rounds, participants]; column p - 1 is participant p")
+    data: str
+
+
 class ScheduleResponse(BaseModel):
     """Schedule response model"""
     participants: int
@@ -55,16 +133,112 @@ class ScheduleResponse(BaseModel):
     rounds: int
     table_sizes: List[int]
     table_sizes_per_round: List[List[int]]
-    assignments: List[List[List[int]]]
+    # One of the two, depending on the requested output_format
+    assignments: Optional[List[List[List[int]]]] = None
+    seating: Optional[CompactSeating] = None
     satisfied_same_once_pairs: List[List[int]]
     unsatisfied_same_once_pairs: List[List[int]]
     never_together_violations: List[List[int]]
     objective_value: int
     solver_status: str
+    engine: str
+    bound_gap: Optional[int] = None
+    time_to_best: Optional[float] = None
+    round_solve_seconds: Optional[List[float]] = None
+    greedy_rounds: Optional[List[int]] = None
+    objective_stages: Optional[List[Dict[str, Any]]] = None
+    model_size: Optional[Dict[str, int]] = None
+    build_seconds: Optional[float] = None
+    diagnostics: Optional[Dict[str, Any]] = None
+
+
+def request_solver_params(params: Optional[SolverParamsInput]) -> Dict[str, Any]:
+    """Requested solver parameters, with the worker count shared between the pool's solves"""
+    resolved = params.model_dump(exclude_none=True) if params is not None else {}
+    # Every pool worker may be solving at once, so each gets an equal share of the CPUs
+    resolved.setdefault("num_workers", default_num_workers(get_pool().max_workers))
+    return resolved
+
+
+def schedule_kwargs(request: ScheduleRequest) -> Dict[str, Any]:
+    """Translate a validated request into keyword arguments for schedule()"""
+    # Get time limit from request or environment variable
+    default_time_limit = int(os.getenv("DEFAULT_TIME_LIMIT_SECONDS", "60"))
+    return {
+        "num_participants": request.participants,
+        "num_tables": request.tables,
+        "num_rounds": request.rounds,
+        # Convert PairInput to tuples
+        "same_once_pairs": [(p.u, p.v) for p in request.same_once_pairs],
+        "never_together_pairs": [(p.u, p.v) for p in request.never_together_pairs],
+        "time_limit_seconds": request.time_limit_seconds or default_time_limit,
+        "engine": request.engine,
+        "hint_assignments": request.hint_assignments,
+        "lookahead_rounds": request.lookahead_rounds,
+        "symmetry_breaking": request.symmetry_breaking,
+        "objective_mode": request.objective_mode,
+        "solver_params": request_solver_params(request.solver_params),
+        "diagnostics": request.diagnostics,
+    }
+
+
+def ensure_feasible(kwargs: Dict[str, Any]) -> None:
+    """Reject with 422 and the diagnosis an instance the pre-check proves infeasible"""
+    num_participants = kwargs["num_participants"]
+    diagnosis = diagnose_instance(
+        num_participants, kwargs["num_tables"], kwargs["num_rounds"],
+        normalize_pairs(kwargs["same_once_pairs"], num_participants),
+        normalize_pairs(kwargs["never_together_pairs"], num_participants),
+    )
+    if not diagnosis["feasible"]:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "No valid schedule exists for these constraints", "diagnosis": diagnosis},
+        )
+
+
+_cache: Optional[ScheduleCache] = None
+
+
+def get_cache() -> ScheduleCache:
+    """Return the shared result cache, configured from the environment on first use"""
+    global _cache
+    if _cache is None:
+        _cache = ScheduleCache(
+            max_entries=int(os.getenv("SCHEDULE_CACHE_SIZE", "128")),
+            directory=os.getenv("SCHEDULE_CACHE_DIR") or None,
+        )
+    return _cache
+
+
+def cache_key(kwargs: Dict[str, Any]) -> str:
+    # The time limit is handled by the cache itself; hints, symmetry breaking and solver
+    # parameters only steer the search, and diagnostics requests skip the cache
+    ignored = ("time_limit_seconds", "hint_assignments", "symmetry_breaking", "solver_params", "diagnostics")
+    return instance_key(**{k: v for k, v in kwargs.items() if k not in ignored})
+
+
+def response_content(
+    result: Dict[str, Any], output_format: str = "nested", model: type = ScheduleResponse
+) -> Dict[str, Any]:
+    """
+    The fields of ``model`` taken from a solver result, without validating them again.
+
+    The result was produced by the server itself, so re-checking every
+    seat would only cost time on large schedules. With ``compact`` output,
+    ``assignments`` is replaced by the encoded ``seating``.
+    """
+    content = {
+        name: result.get(name, field.default) for name, field in model.model_fields.items()
+    }
+    if output_format == "compact" and result.get("assignments") is not None:
+        content["seating"] = encode_seating(result["assignments"], result["participants"])
+        content["assignments"] = None
+    return content
 
 
 @router.post("/schedule", response_model=ScheduleResponse)
-async def create_schedule(request: ScheduleRequest):
+async def create_schedule(request: ScheduleRequest, http_request: Request):
     """
     Create a round-table schedule based on the provided constraints.
 
@@ -74,28 +248,300 @@ async def create_schedule(request: ScheduleRequest):
     - **same_once_pairs**: Pairs that should be seated together exactly once
     - **never_together_pairs**: Pairs that must never be seated together
     - **time_limit_seconds**: Maximum time for the solver (default: 60)
+    - **engine**: `auto` (default), `cpsat`, `constructive`, `lns` or `rolling`
+    - **lookahead_rounds**: Rounds the `rolling` engine looks ahead (default: 0)
+    - **symmetry_breaking**: Order interchangeable guests and rounds in the CP-SAT model (default: true)
+    - **objective_mode**: `weighted` (default) or `lexicographic` (one CP-SAT stage per objective term)
+    - **hint_assignments**: Optional previous schedule to warm-start the solver
+    - **solver_params**: Optional CP-SAT parameters (`num_workers`, `random_seed`,
+      `linearization_level`, `use_lns`, `log_search_progress`)
+    - **diagnostics**: Add phase timings, model block sizes and solver statistics (default: false);
+      such requests are always solved afresh and not cached
+    - **output_format**: `nested` (default) or `compact` (`seating` instead of `assignments`)
+
+    The response is JSON, or msgpack for `Accept: application/msgpack` when the server has
+    msgpack installed, and gzip-compressed for clients that accept it.
+    If the client disconnects before the answer, the solve is stopped and its worker freed.
     """
+    with track_request("schedule"):
+        with VALIDATION_SECONDS.time():
+            kwargs = schedule_kwargs(request)
+            ensure_feasible(kwargs)
+        try:
+            # Diagnostics describe this solve, so a cached result will not do
+            key = None if request.diagnostics else cache_key(kwargs)
+            result = get_cache().get(key, kwargs["time_limit_seconds"]) if key is not None else None
+            if result is None:
+                # Solve in the process pool so the event loop keeps serving other requests
+                result = await get_pool().run_until_disconnected(http_request.is_disconnected, schedule, **kwargs)
+                record_solve(result)
+                if key is not None:
+                    get_cache().put(key, kwargs["time_limit_seconds"], result)
+
+            return encoded_response(response_content(result, request.output_format), http_request)
+        except PoolSaturatedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        except ClientDisconnectedError as e:
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
+        except AssertionError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid input constraints: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error generating schedule: {str(e)}")
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _stream_events(
+    handle: SolveHandle, key: Optional[str], time_limit: int, output_format: str, started: float
+) -> AsyncIterator[str]:
+    # The request is counted once the stream ends, with the code the error event stands for
+    code = 200
     try:
-        # Convert PairInput to tuples
-        same_once = [(p.u, p.v) for p in request.same_once_pairs]
-        never_together = [(p.u, p.v) for p in request.never_together_pairs]
-
-        # Get time limit from request or environment variable
-        default_time_limit = int(os.getenv("DEFAULT_TIME_LIMIT_SECONDS", "60"))
-        time_limit = request.time_limit_seconds or default_time_limit
-
-        # Call the scheduler
-        result = schedule(
-            num_participants=request.participants,
-            num_tables=request.tables,
-            num_rounds=request.rounds,
-            same_once_pairs=same_once,
-            never_together_pairs=never_together,
-            time_limit_seconds=time_limit,
-        )
+        async for update in handle.updates():
+            yield _sse("solution", update)
+        try:
+            result = await handle.result()
+            record_solve(result)
+            if key is not None:
+                get_cache().put(key, time_limit, result)
+            yield _sse("result", response_content(result, output_format))
+        except AssertionError as e:
+            code = 400
+            yield _sse("error", {"detail": f"Invalid input constraints: {str(e)}"})
+        except Exception as e:
+            code = 500
+            yield _sse("error", {"detail": f"Error generating schedule: {str(e)}"})
+    except (GeneratorExit, asyncio.CancelledError):
+        code = CLIENT_CLOSED_REQUEST
+        raise
+    finally:
+        # Nobody is listening any more once the client goes away
+        if not handle.future.done():
+            handle.cancel()
+        record_request("stream", code, started)
+
 
-        return ScheduleResponse(**result)
-    except AssertionError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid input constraints: {str(e)}")
+@router.post("/schedule/stream")
+async def stream_schedule(request: ScheduleRequest):
+    """
+    Stream improving schedules as Server-Sent Events while the solver runs.
+
+    Each new incumbent is sent as a `solution` event carrying `assignments`,
+    `objective_value`, `best_bound` and `elapsed_seconds`. The final response
+    follows as a `result` event with the same shape as `POST /api/schedule`,
+    or as an `error` event if the solve fails. A cached result is sent as the
+    `result` event straight away.
+    """
+    # A request answered right away is counted here; a started solve when its stream ends
+    started = time.perf_counter()
+    try:
+        with VALIDATION_SECONDS.time():
+            kwargs = schedule_kwargs(request)
+            ensure_feasible(kwargs)
+        # Diagnostics describe this solve, so they are neither served from nor stored in the cache
+        key = None if request.diagnostics else cache_key(kwargs)
+        cached = get_cache().get(key, kwargs["time_limit_seconds"]) if key is not None else None
+        if cached is None:
+            try:
+                handle = get_pool().submit_solve(schedule, **kwargs)
+            except PoolSaturatedError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating schedule: {str(e)}")
+        record_request("stream", getattr(e, "status_code", 500), started)
+        raise
+    if cached is not None:
+        record_request("stream", 200, started)
+        return StreamingResponse(
+            iter([_sse("result", response_content(cached, request.output_format))]),
+            media_type="text/event-stream",
+        )
+    return StreamingResponse(
+        _stream_events(handle, key, kwargs["time_limit_seconds"], request.output_format, started),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchScheduleRequest(BaseModel):
+    """Batch request model"""
+    instances: List[ScheduleRequest] = Field(
+        ..., min_length=1, max_length=100, description="Independent schedule requests to solve together"
+    )
+
+
+def _ndjson(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":")) + "\n"
+
+
+async def _batch_lines(items: List[Tuple[int, Dict[str, Any], str]]) -> AsyncIterator[str]:
+    # items: index, schedule() arguments and output format of each instance.
+    # The solves run while the response streams, so the request is timed and counted here
+    with track_request("batch"):
+        pending: Deque[Tuple[int, Dict[str, Any], str, Optional[str]]] = deque()
+        for index, kwargs, output_format in items:
+            try:
+                ensure_feasible(kwargs)
+            except HTTPException as e:
+                yield _ndjson({"index": index, "status_code": e.status_code, "error": e.detail})
+                continue
+            key = None if kwargs["diagnostics"] else cache_key(kwargs)
+            cached = get_cache().get(key, kwargs["time_limit_seconds"]) if key is not None else None
+            if cached is not None:
+                yield _ndjson({"index": index, "result": response_content(cached, output_format)})
+            else:
+                pending.append((index, kwargs, output_format, key))
+
+        pool = get_pool()
+        running: Dict["asyncio.Future[Any]", Tuple[SolveHandle, int, Dict[str, Any], str, Optional[str]]] = {}
+        try:
+            while pending or running:
+                # At most one solve per pool worker, so the batch leaves queue room to other requests;
+                # each solve already gets only its share of the CPUs
+                while pending and len(running) < pool.max_workers:
+                    try:
+                        handle = pool.submit_solve(schedule, progress=False, **pending[0][1])
+                    except PoolSaturatedError:
+                        break
+                    running[handle.future] = (handle, *pending.popleft())
+                if not running:
+                    # Other requests fill the pool; try again shortly
+                    await asyncio.sleep(0.2)
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    _, index, kwargs, output_format, key = running.pop(future)
+                    try:
+                        result = future.result()
+                    except AssertionError as e:
+                        yield _ndjson(
+                            {"index": index, "status_code": 400, "error": f"Invalid input constraints: {str(e)}"}
+                        )
+                        continue
+                    except Exception as e:
+                        yield _ndjson(
+                            {"index": index, "status_code": 500, "error": f"Error generating schedule: {str(e)}"}
+                        )
+                        continue
+                    record_solve(result)
+                    if key is not None:
+                        get_cache().put(key, kwargs["time_limit_seconds"], result)
+                    yield _ndjson({"index": index, "result": response_content(result, output_format)})
+        finally:
+            # The client went away: stop what is running; the rest was never submitted
+            for handle, *_ in running.values():
+                handle.cancel()
+
+
+@router.post("/schedule/batch")
+async def schedule_batch(request: BatchScheduleRequest):
+    """
+    Solve up to 100 independent schedule requests and stream each result as it finishes.
+
+    The response is newline-delimited JSON, one line per instance in the
+    order the instances finish: `{"index": i, "result": ...}` with the
+    same result as `POST /api/schedule`, or `{"index": i, "status_code":
+    ..., "error": ...}` for an instance that is infeasible or fails. Cached
+    instances come first. The solves share the solver pool: at most one
+    per pool worker runs at a time, each with its share of the CPUs.
+    """
+    items = []
+    for index, instance in enumerate(request.instances):
+        with VALIDATION_SECONDS.time():
+            items.append((index, schedule_kwargs(instance), instance.output_format))
+    return StreamingResponse(_batch_lines(items), media_type="application/x-ndjson")
+
+
+class RepairRequest(BaseModel):
+    """Repair request model"""
+    participants: int = Field(..., ge=1, description="Number of participants the schedule was made for")
+    tables: int = Field(..., ge=1, description="Number of tables")
+    same_once_pairs: List[PairInput] = Field(
+        default_factory=list, description="Same-once pairs the schedule was made with"
+    )
+    never_together_pairs: List[PairInput] = Field(
+        default_factory=list, description="Never-together pairs the schedule was made with"
+    )
+    assignments: List[List[List[int]]] = Field(..., min_length=1, description="Current schedule")
+    frozen_rounds: int = Field(..., ge=0, description="Rounds already played; these are kept as they are")
+    removed_participants: List[int] = Field(
+        default_factory=list, description="Guests who dropped out"
+    )
+    added_participants: int = Field(
+        default=0, ge=0, description="Late guests; they get the next free participant ids"
+    )
+    add_same_once_pairs: List[PairInput] = Field(default_factory=list)
+    remove_same_once_pairs: List[PairInput] = Field(default_factory=list)
+    add_never_together_pairs: List[PairInput] = Field(default_factory=list)
+    remove_never_together_pairs: List[PairInput] = Field(default_factory=list)
+    time_limit_seconds: Optional[int] = Field(
+        default=None, ge=1, le=300, description="Solver time limit in seconds"
+    )
+    solver_params: Optional[SolverParamsInput] = Field(
+        default=None, description="CP-SAT parameters for this request"
+    )
+
+
+class RepairResponse(ScheduleResponse):
+    """Repair response model"""
+    frozen_rounds: int
+    changed_seats: int
+
+
+def repair_kwargs(request: RepairRequest) -> Dict[str, Any]:
+    """Translate a validated repair request into keyword arguments for repair_schedule()"""
+    default_time_limit = int(os.getenv("DEFAULT_TIME_LIMIT_SECONDS", "60"))
+
+    def pairs(items: List[PairInput]) -> List[tuple]:
+        return [(p.u, p.v) for p in items]
+
+    return {
+        "assignments": request.assignments,
+        "num_participants": request.participants,
+        "num_tables": request.tables,
+        "same_once_pairs": pairs(request.same_once_pairs),
+        "never_together_pairs": pairs(request.never_together_pairs),
+        "frozen_rounds": request.frozen_rounds,
+        "removed_participants": request.removed_participants,
+        "added_participants": request.added_participants,
+        "add_same_once_pairs": pairs(request.add_same_once_pairs),
+        "remove_same_once_pairs": pairs(request.remove_same_once_pairs),
+        "add_never_together_pairs": pairs(request.add_never_together_pairs),
+        "remove_never_together_pairs": pairs(request.remove_never_together_pairs),
+        "time_limit_seconds": request.time_limit_seconds or default_time_limit,
+        "solver_params": request_solver_params(request.solver_params),
+    }
+
+
+@router.post("/schedule/repair", response_model=RepairResponse)
+async def repair(request: RepairRequest, http_request: Request):
+    """
+    Re-plan the remaining rounds of an existing schedule after last-minute changes.
+
+    Rounds before `frozen_rounds` are returned unchanged and their meetings
+    still count towards the pair constraints. The later rounds are re-solved
+    for the changed participants and pairs while keeping as many guests as
+    possible in their old seats; `changed_seats` reports how many moved.
+    If the client disconnects first, the solve is stopped.
+    """
+    with track_request("repair"):
+        try:
+            result = await get_pool().run_until_disconnected(
+                http_request.is_disconnected, repair_schedule, **repair_kwargs(request)
+            )
+            return encoded_response(response_content(result, model=RepairResponse), http_request)
+        except PoolSaturatedError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        except ClientDisconnectedError as e:
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
+        except AssertionError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid input constraints: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error repairing schedule: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and occupancy of the result cache"""
+    return get_cache().stats()
@@ -0,0 +1,73 @@
+"""
+Negotiated encodings of the responses built from solver results.
+
+The results come from the server's own solver, so they are not validated
+again on the way out: the endpoints pick the response model's fields from
+the result dict and encode them directly. The body is JSON unless the
+client prefers msgpack (``Accept: application/msgpack``) and the optional
+``msgpack`` package is installed. Bodies of at least ``GZIP_MIN_BYTES``
+are gzip-compressed for clients that accept it (``Accept-Encoding``).
+"""
+import gzip
+import json
+from typing import Any, Dict
+
+from fastapi import Request, Response
+
+try:
+    import msgpack
+except ImportError:  # optional; every response is JSON without it
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+# Smaller bodies gain too little from compression to be worth the CPU
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+def _qualities(header: str) -> Dict[str, float]:
+    # "a/b;q=0.5, c/d" -> {"a/b": 0.5, "c/d": 1.0}
+    qualities = {}
+    for item in header.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return qualities
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client prefers msgpack to JSON and msgpack is available"""
+    if msgpack is None:
+        return False
+    accepted = _qualities(request.headers.get("accept", ""))
+    quality = max(accepted.get(media_type, 0.0) for media_type in _MSGPACK_TYPES)
+    return quality > 0 and quality >= accepted.get(JSON, 0.0)
+
+
+def wants_gzip(request: Request) -> bool:
+    accepted = _qualities(request.headers.get("accept-encoding", ""))
+    return accepted.get("gzip", accepted.get("*", 0.0)) > 0
+
+
+def encoded_response(content: Dict[str, Any], request: Request) -> Response:
+    """``content`` as JSON or msgpack, gzip-compressed when worthwhile, as negotiated with the client"""
+    if wants_msgpack(request):
+        body, media_type = msgpack.packb(content), MSGPACK
+    else:
+        body, media_type = json.dumps(content, separators=(",", ":")).encode(), JSON
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and wants_gzip(request):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
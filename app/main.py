@@ -1,16 +1,32 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
-from app.api import scheduler
+from app.api import jobs, scheduler
+from app.metrics import REGISTRY
+from app.pool import get_pool, shutdown_pool, warm_up_enabled
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the solver workers and let each warm up OR-Tools before the first request
+    if warm_up_enabled():
+        await get_pool().start()
+    yield
+    # Stop solver worker processes on shutdown
+    shutdown_pool()
+
+
 app = FastAPI(
     title="Round-Table Scheduler API",
     description="API for generating round-table seating schedules with constraints",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS from environment variables
@@ -32,6 +48,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(scheduler.router, prefix="/api", tags=["scheduler"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 
 @app.get("/")
@@ -48,3 +65,25 @@ async def root():
 async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+# Read when /metrics is scraped, so they cost nothing per request
+REGISTRY.gauge("scheduler_pool_in_flight", "Solves running or waiting in the pool", lambda: get_pool().in_flight)
+REGISTRY.gauge(
+    "scheduler_pool_queued", "Solves waiting for a free pool worker",
+    lambda: max(0, get_pool().in_flight - get_pool().max_workers),
+)
+REGISTRY.gauge("scheduler_pool_capacity", "Solves the pool accepts before answering 503",
+               lambda: get_pool().capacity)
+REGISTRY.gauge("scheduler_pool_startup_seconds", "Time to start and warm up the pool workers at startup",
+               lambda: get_pool().startup_seconds or 0)
+REGISTRY.counter_func("scheduler_cache_hits_total", "Result cache hits since start",
+                      lambda: scheduler.get_cache().hits)
+REGISTRY.counter_func("scheduler_cache_misses_total", "Result cache misses since start",
+                      lambda: scheduler.get_cache().misses)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, solve and pool metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
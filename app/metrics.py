@@ -0,0 +1,221 @@
+"""
+In-process metrics served in the Prometheus text format at ``/metrics``.
+
+Counters and histograms keep their values in dicts keyed by label values.
+They are only updated from the event loop thread (request handlers and
+callbacks of pool futures), so they need no lock: recording a value is a
+dict lookup and, for histograms, a bisect over the bucket bounds. Gauges
+and counters kept by other objects read their source when the endpoint is
+scraped and cost nothing between scrapes.
+"""
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; solves run from milliseconds (closed-form) up to the 300 s request limit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+PARTICIPANT_BUCKETS = (10, 25, 50, 100, 200, 300, 500, 1000)
+SEAT_BUCKETS = (100, 1000, 10000, 50000, 100000, 500000, 1000000)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic count per combination of label values"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_number(count)}")
+        return lines
+
+
+class Histogram:
+    """Observations counted into fixed buckets per combination of label values"""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labels = tuple(labels)
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self._values.get(label_values)
+        if entry is None:
+            entry = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Observe the seconds spent in the ``with`` block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        entry = self._values.get(label_values)
+        return sum(entry[0]) if entry is not None else 0
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.labels, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Current value read from ``read`` at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def collect(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}",
+                f"{self.name} {_number(self.read())}"]
+
+
+class CounterFunc(Gauge):
+    """Monotonic count kept elsewhere (e.g. by the result cache), read from ``read`` at scrape time"""
+
+    type = "counter"
+
+
+class Registry:
+    """The metrics to render, in registration order"""
+
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> Histogram:
+        return self._add(Histogram(name, help, buckets, labels))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, help, read))
+
+    def counter_func(self, name: str, help: str, read: Callable[[], float]) -> CounterFunc:
+        return self._add(CounterFunc(name, help, read))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    "scheduler_requests_total", "Schedule requests by endpoint and HTTP status code", ("endpoint", "code")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "scheduler_request_duration_seconds", "Time to answer a schedule request, cache hits included",
+    LATENCY_BUCKETS, ("endpoint",),
+)
+VALIDATION_SECONDS = REGISTRY.histogram(
+    "scheduler_validation_duration_seconds",
+    "Time to translate a request and run the feasibility pre-check", FAST_BUCKETS,
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "scheduler_pool_queue_wait_seconds", "Time a solve waited for a free pool worker", LATENCY_BUCKETS,
+)
+RUN_SECONDS = REGISTRY.histogram(
+    "scheduler_pool_run_duration_seconds", "Time a pool worker spent on a solve", LATENCY_BUCKETS,
+)
+SOLVES = REGISTRY.counter(
+    "scheduler_solves_total", "Finished solves by engine and solver status", ("engine", "status")
+)
+PARTICIPANTS = REGISTRY.histogram(
+    "scheduler_instance_participants", "Participants per solved instance", PARTICIPANT_BUCKETS,
+)
+SEATS = REGISTRY.histogram(
+    "scheduler_instance_guest_seats",
+    "Guest seat variables (guests x tables x rounds) per solved instance", SEAT_BUCKETS,
+)
+
+
+# Status for requests whose client went away before the answer (as in nginx)
+CLIENT_CLOSED_REQUEST = 499
+
+
+def record_request(endpoint: str, code: int, started: float) -> None:
+    """Count a request answered with ``code`` and observe the time since ``started`` (a perf_counter value)"""
+    REQUESTS.inc(endpoint, str(code))
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+
+
+@contextmanager
+def track_request(endpoint: str) -> Iterator[None]:
+    """
+    Count a request and time it; an exception's ``status_code`` (else 500) becomes the code.
+
+    Also usable around the body of a streaming response's generator, where
+    it covers the whole stream: closing the generator early (the client
+    went away) counts as ``CLIENT_CLOSED_REQUEST``.
+    """
+    started = time.perf_counter()
+    code = 200
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        code = CLIENT_CLOSED_REQUEST
+        raise
+    except Exception as exc:
+        code = getattr(exc, "status_code", 500)
+        raise
+    finally:
+        record_request(endpoint, code, started)
+
+
+def record_solve(result: Dict[str, object]) -> None:
+    """Count a freshly solved result (not a cached one) by engine, status and size"""
+    SOLVES.inc(str(result["engine"]), str(result["solver_status"]))
+    participants, tables, rounds = int(result["participants"]), int(result["tables"]), int(result["rounds"])
+    PARTICIPANTS.observe(participants)
+    SEATS.observe((participants - tables) * tables * rounds)
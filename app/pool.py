@@ -0,0 +1,227 @@
+import asyncio
+import contextlib
+import functools
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.metrics import QUEUE_WAIT_SECONDS, RUN_SECONDS
+from python.scheduler import warm_up
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when a solve was stopped because nobody is waiting for its result any more"""
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[float, float, Any]:
+    # Runs in the worker: its start on the wall clock, which the server process shares, and
+    # the seconds the call took
+    started = time.time()
+    clock = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return started, time.perf_counter() - clock, result
+
+
+async def _measured(inner: "asyncio.Future[Tuple[float, float, Any]]", submitted: float) -> Any:
+    started, seconds, result = await inner
+    QUEUE_WAIT_SECONDS.observe(max(0.0, started - submitted))
+    RUN_SECONDS.observe(seconds)
+    return result
+
+
+class SolveHandle:
+    """A solve submitted to the pool with a progress channel and a stop signal"""
+
+    def __init__(self, future: "asyncio.Future[Any]", updates: Optional[Any], stop_event: Any):
+        self.future = future
+        self._updates = updates
+        self._stop_event = stop_event
+
+    def cancel(self) -> None:
+        """Ask the worker to stop searching; it still returns its best incumbent"""
+        self._stop_event.set()
+
+    async def result(self) -> Any:
+        return await self.future
+
+    async def updates(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield progress reports from the worker until the solve has finished"""
+        if self._updates is None:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                item = await loop.run_in_executor(None, self._updates.get, True, 0.2)
+            except queue.Empty:
+                if self.future.done():
+                    break
+                continue
+            yield item
+        # The worker puts every report before returning, but the last ones may have arrived
+        # between the timed-out get and the completion check: read whatever is left
+        while True:
+            try:
+                item = self._updates.get_nowait()
+            except queue.Empty:
+                return
+            yield item
+
+
+class SolverPool:
+    """
+    Bounded process pool for CPU-bound solves.
+
+    At most ``max_workers`` solves run at once and at most ``queue_depth``
+    more wait for a worker; anything beyond that is rejected immediately
+    with ``PoolSaturatedError`` instead of piling up behind the others.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, initializer: Optional[Callable[[], Any]] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_depth < 0:
+            raise ValueError("queue_depth cannot be negative")
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        # Runs once in every worker process before its first task
+        self.initializer = initializer
+        self.startup_seconds: Optional[float] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[Any] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_depth
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Spawned workers do not inherit the event loop threads of the server process
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        return self._executor
+
+    def _get_manager(self) -> Any:
+        # Queues and events shared with workers must be proxies; plain ones cannot be pickled
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager
+
+    async def start(self) -> float:
+        """
+        Start all workers now rather than on the first solves; returns the seconds it took.
+
+        Each worker runs the initializer before it takes a task, so once this
+        returns, the next solve lands on a worker that has already run it.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Every submit finding no idle worker spawns one, up to max_workers
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.max_workers)))
+        self.startup_seconds = time.perf_counter() - started
+        return self.startup_seconds
+
+    def _release(self, _future: "asyncio.Future[Any]") -> None:
+        self.in_flight -= 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+        # Only touched from the event loop thread, so the counter needs no lock
+        if self.in_flight >= self.capacity:
+            raise PoolSaturatedError(
+                f"Solver pool is full ({self.max_workers} running, {self.queue_depth} queued)"
+            )
+        loop = asyncio.get_running_loop()
+        call = functools.partial(_timed_call, fn, *args, **kwargs)
+        submitted = time.time()
+        inner = loop.run_in_executor(self._get_executor(), call)
+        self.in_flight += 1
+        inner.add_done_callback(self._release)
+        # Queue wait and run time are recorded on the loop thread once the worker answers
+        return asyncio.ensure_future(_measured(inner, submitted))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await self.submit(fn, *args, **kwargs)
+
+    def submit_solve(self, fn: Callable[..., Any], progress: bool = True, **kwargs: Any) -> SolveHandle:
+        """
+        Submit a solve that can be stopped and, with ``progress``, reports each incumbent.
+
+        ``fn`` must accept the ``stop_event`` keyword argument of
+        ``python.scheduler.schedule``, and ``on_solution`` too with ``progress``.
+        """
+        manager = self._get_manager()
+        updates = manager.Queue() if progress else None
+        stop_event = manager.Event()
+        if updates is not None:
+            kwargs["on_solution"] = updates.put
+        future = self.submit(fn, stop_event=stop_event, **kwargs)
+        return SolveHandle(future, updates, stop_event)
+
+    async def run_until_disconnected(
+        self, is_disconnected: Callable[[], Awaitable[bool]], fn: Callable[..., Any],
+        poll_seconds: float = 0.5, **kwargs: Any,
+    ) -> Any:
+        """
+        Run a stoppable solve and return its result, stopping it if the client goes away.
+
+        ``is_disconnected`` is polled every ``poll_seconds`` while the solve
+        runs (``Request.is_disconnected`` of the request being answered).
+        Raises ``ClientDisconnectedError`` once the stopped solve has
+        returned, so its worker is free again before the handler ends.
+        """
+        handle = self.submit_solve(fn, progress=False, **kwargs)
+        while True:
+            done, _ = await asyncio.wait({handle.future}, timeout=poll_seconds)
+            if done:
+                return handle.future.result()
+            if await is_disconnected():
+                handle.cancel()
+                with contextlib.suppress(Exception):
+                    await handle.future
+                raise ClientDisconnectedError("Client disconnected; the solve was stopped")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+_pool: Optional[SolverPool] = None
+
+
+def warm_up_enabled() -> bool:
+    """Whether workers warm up OR-Tools when they start (``SOLVER_POOL_WARM_UP``, default on)"""
+    return os.getenv("SOLVER_POOL_WARM_UP", "1").lower() in ("1", "true", "yes", "on")
+
+
+def get_pool() -> SolverPool:
+    """Return the shared solver pool, sized from the environment on first use"""
+    global _pool
+    if _pool is None:
+        _pool = SolverPool(
+            max_workers=int(os.getenv("SOLVER_POOL_WORKERS", "2")),
+            queue_depth=int(os.getenv("SOLVER_POOL_QUEUE_DEPTH", "4")),
+            initializer=warm_up if warm_up_enabled() else None,
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
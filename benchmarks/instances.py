@@ -0,0 +1,97 @@
+"""
+Synthetic scheduling instances for the benchmark suite.
+
+An instance is a plain dict holding the arguments of ``schedule()`` plus a
+``name``. Pair lists are drawn among the guests with a seeded generator,
+so the same spec always produces the same instance. Densities are pairs
+per participant: 0.25 with 40 participants gives 10 pairs.
+"""
+import random
+from typing import Any, Dict, List, Tuple
+
+
+def random_pairs(
+    num_participants: int, num_tables: int, count: int, rng: random.Random,
+    exclude: Tuple[Tuple[int, int], ...] = (),
+) -> List[Tuple[int, int]]:
+    """``count`` distinct normalised guest pairs, none of them in ``exclude``"""
+    guests = range(num_tables + 1, num_participants + 1)
+    count = min(count, len(guests) * (len(guests) - 1) // 2 - len(exclude))
+    taken = set(exclude)
+    pairs = set()
+    while len(pairs) < count:
+        u, v = rng.sample(guests, 2)
+        pair = (min(u, v), max(u, v))
+        if pair not in taken:
+            pairs.add(pair)
+    return sorted(pairs)
+
+
+def generate_instance(
+    participants: int,
+    tables: int,
+    rounds: int,
+    same_once_density: float = 0.0,
+    never_together_density: float = 0.0,
+    seed: int = 0,
+    name: str = "",
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    A named instance with random same-once and never-together pairs.
+
+    ``options`` (engine, time_limit_seconds, ...) are passed on to
+    ``schedule()`` unchanged. The two pair lists never share a pair.
+    """
+    rng = random.Random(f"{participants}/{tables}/{rounds}/{seed}")
+    same_once = random_pairs(participants, tables, round(same_once_density * participants), rng)
+    never = random_pairs(
+        participants, tables, round(never_together_density * participants), rng, exclude=tuple(same_once)
+    )
+    return {
+        "name": name or f"{participants}-{tables}-{rounds}",
+        "num_participants": participants,
+        "num_tables": tables,
+        "num_rounds": rounds,
+        "same_once_pairs": same_once,
+        "never_together_pairs": never,
+        **options,
+    }
+
+
+# name: (participants, tables, rounds, same-once density, never-together density, options)
+SUITES: Dict[str, List[Tuple[str, int, int, int, float, float, Dict[str, Any]]]] = {
+    # A few seconds per instance; meant for every change to the solver
+    "smoke": [
+        ("tiny", 12, 3, 3, 0.25, 0.0, {}),
+        ("small-pairs", 20, 5, 4, 0.25, 0.1, {}),
+        ("small-cpsat", 24, 6, 3, 0.1, 0.1, {"engine": "cpsat"}),
+        ("medium-cpsat", 40, 8, 3, 0.5, 0.25, {"engine": "cpsat"}),
+        ("closed-form", 49, 7, 4, 0.0, 0.0, {}),
+    ],
+    # Up to the default time limit per instance
+    "default": [
+        ("60-10-4", 60, 10, 4, 0.25, 0.1, {"engine": "cpsat"}),
+        ("80-16-4", 80, 16, 4, 0.1, 0.0, {"engine": "cpsat"}),
+        ("100-10-4-lns", 100, 10, 4, 0.25, 0.0, {"engine": "lns"}),
+        ("60-12-8-rolling", 60, 12, 8, 0.25, 0.0, {"engine": "rolling"}),
+        ("64-16-3-lexicographic", 64, 16, 3, 0.06, 0.0, {"engine": "cpsat", "objective_mode": "lexicographic"}),
+    ],
+    # Large events; minutes per instance and several GB for the full model
+    "large": [
+        ("200-20-6-lns", 200, 20, 6, 0.25, 0.0, {"engine": "lns"}),
+        ("300-30-6-lns", 300, 30, 6, 0.25, 0.07, {"engine": "lns"}),
+        ("120-20-10-rolling", 120, 20, 10, 0.25, 0.0, {"engine": "rolling"}),
+        ("150-15-3-cpsat", 150, 15, 3, 0.0, 0.0, {"engine": "cpsat"}),
+    ],
+}
+
+
+def suite_instances(suite: str, seed: int = 0) -> List[Dict[str, Any]]:
+    """The instances of a named suite in ``SUITES``"""
+    if suite not in SUITES:
+        raise ValueError(f"Unknown suite {suite!r}; expected one of {', '.join(SUITES)}")
+    return [
+        generate_instance(a, b, c, same, never, seed=seed, name=name, **options)
+        for name, a, b, c, same, never, options in SUITES[suite]
+    ]
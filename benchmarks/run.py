@@ -0,0 +1,326 @@
+"""
+Run a benchmark suite and compare it with a stored baseline.
+
+Usage: python benchmarks/run.py [--suite smoke|default|large] [--time-limit SECONDS]
+                                [--json PATH] [--csv PATH] [--baseline PATH]
+                                [--tolerance FRACTION] [--skip-startup]
+
+Each instance of the suite (see instances.py) is solved in a fresh process,
+so its peak RSS is its own. Per instance the runner records the status,
+objective and bound gap, the model size, the time spent building the
+model and solving it, the time to the first and to the best schedule, and
+the peak memory. One JSON line per instance goes to stdout; --json and
+--csv write the whole run to files.
+
+Before the suite, the runner times startup in fresh interpreters: the
+imports of OR-Tools, the scheduler module and the API, a closed-form CLI
+run, and the first and the second tiny CP-SAT solve of a process. These
+go to stderr and into the metadata of --json.
+
+With --baseline, the run is compared instance by instance with an earlier
+--json file (benchmarks/baseline.json holds the smoke suite): a worse
+status or objective, or a wall time, build time or peak memory beyond the
+tolerance, is a regression and makes the runner exit with status 1.
+Timings only compare meaningfully on the machine that recorded the
+baseline.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.instances import SUITES, suite_instances  # noqa: E402
+from python.scheduler import InfeasibleInstanceError, schedule  # noqa: E402
+from python.solver_params import available_cpus  # noqa: E402
+
+DEFAULT_TIME_LIMITS = {"smoke": 10, "default": 60, "large": 300}
+CSV_FIELDS = [
+    "name", "participants", "tables", "rounds", "same_once_pairs", "never_together_pairs",
+    "engine", "time_limit_seconds", "status", "objective_value", "bound_gap",
+    "variables", "constraints", "build_seconds", "solve_seconds", "wall_seconds",
+    "time_to_first_feasible", "time_to_best", "peak_rss_mb",
+]
+# Statuses from worst to best; a run may not fall below its baseline
+_STATUS_RANK = {"INFEASIBLE_PRECHECK": 0, "UNKNOWN": 0, "INFEASIBLE": 0, "MODEL_INVALID": 0,
+                "FEASIBLE": 1, "OPTIMAL": 2}
+# Absolute slack on top of the relative tolerance, so tiny values do not flap
+_SLACK = {"wall_seconds": 1.0, "build_seconds": 0.2, "peak_rss_mb": 50.0}
+_STARTUP_SLACK = 0.2
+# Each snippet runs in a fresh interpreter and prints the seconds it measured
+_STARTUP_SNIPPETS = {
+    "import_ortools_seconds": "from ortools.sat.python import cp_model; cp_model.CpModel()",
+    "import_scheduler_seconds": "import python.scheduler",
+    "import_api_seconds": "import app.main",
+    "first_solve_seconds": "from python.scheduler import warm_up; warm_up()",
+}
+_STARTUP_TIMER = (
+    "import json, time\n"
+    "started = time.perf_counter()\n"
+    "{snippet}\n"
+    "print(json.dumps(time.perf_counter() - started))\n"
+)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(instance: Dict[str, Any], time_limit: int, solver_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Solve one instance and return its benchmark record; runs in a fresh process"""
+    kwargs = {k: v for k, v in instance.items() if k != "name"}
+    kwargs.setdefault("time_limit_seconds", time_limit)
+    # The scheduler imports OR-Tools on first use; import it before the clock starts so the
+    # build time is the model's alone (startup, measured separately, covers the import)
+    from ortools.sat.python import cp_model
+    cp_model.CpModel()
+    first_feasible: List[float] = []
+    started = time.perf_counter()
+
+    def on_solution(update: Dict[str, Any]) -> None:
+        if not first_feasible:
+            first_feasible.append(time.perf_counter() - started)
+
+    record = {
+        "name": instance["name"],
+        "participants": instance["num_participants"],
+        "tables": instance["num_tables"],
+        "rounds": instance["num_rounds"],
+        "same_once_pairs": len(instance["same_once_pairs"]),
+        "never_together_pairs": len(instance["never_together_pairs"]),
+        "engine": instance.get("engine", "auto"),
+        "time_limit_seconds": kwargs["time_limit_seconds"],
+    }
+    try:
+        result = schedule(**kwargs, on_solution=on_solution, solver_params=solver_params)
+    except InfeasibleInstanceError:
+        result = {"solver_status": "INFEASIBLE_PRECHECK"}
+    wall = time.perf_counter() - started
+
+    model_size = result.get("model_size") or {}
+    build = result.get("build_seconds")
+    record.update({
+        "engine": result.get("engine", record["engine"]),
+        "status": result["solver_status"],
+        "objective_value": result.get("objective_value"),
+        "bound_gap": result.get("bound_gap"),
+        "variables": model_size.get("variables"),
+        "constraints": model_size.get("constraints"),
+        "build_seconds": build,
+        "solve_seconds": round(wall - (build or 0.0), 3),
+        "wall_seconds": round(wall, 3),
+        "time_to_first_feasible": round(first_feasible[0], 3) if first_feasible else None,
+        "time_to_best": result.get("time_to_best"),
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+    return record
+
+
+def run_suite(
+    instances: List[Dict[str, Any]], time_limit: int, solver_params: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    records = []
+    # One process per instance: peak RSS is a high-water mark and never goes down
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1
+    ) as pool:
+        for instance in instances:
+            record = pool.submit(measure, instance, time_limit, solver_params).result()
+            print(json.dumps(record), flush=True)
+            records.append(record)
+    return records
+
+
+def _run(args: List[str], stdin: str = "") -> str:
+    out = subprocess.run(args, cwd=ROOT, input=stdin, capture_output=True, text=True, timeout=120, check=True)
+    return out.stdout
+
+
+def measure_startup(repeat: int = 3) -> Dict[str, float]:
+    """
+    Startup costs, each the fastest of ``repeat`` fresh interpreters.
+
+    The import and first-solve timings are taken inside the interpreter;
+    ``warm_solve_seconds`` is a second tiny solve in the same process and
+    ``cli_closed_form_seconds`` the wall time of a whole CLI run that never
+    needs OR-Tools.
+    """
+    timings: Dict[str, List[float]] = {}
+    warm = "from python.scheduler import warm_up; warm_up()\nstarted = time.perf_counter(); warm_up()"
+    snippets = dict(_STARTUP_SNIPPETS, warm_solve_seconds=warm)
+    for _ in range(repeat):
+        for key, snippet in snippets.items():
+            out = _run([sys.executable, "-c", _STARTUP_TIMER.format(snippet=snippet)])
+            timings.setdefault(key, []).append(json.loads(out))
+        started = time.perf_counter()
+        _run([sys.executable, os.path.join("python", "main.py")], stdin="49 7 4 0 0\n")
+        timings.setdefault("cli_closed_form_seconds", []).append(time.perf_counter() - started)
+    return {key: round(min(values), 3) for key, values in timings.items()}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def metadata(
+    suite: str, time_limit: int, solver_params: Dict[str, Any], startup: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """Where and how a run was recorded, with the startup timings if measured"""
+    try:
+        from ortools import __version__ as ortools_version
+    except ImportError:
+        ortools_version = None
+    return {
+        "suite": suite,
+        "time_limit_seconds": time_limit,
+        "solver_params": solver_params,
+        "cpus": available_cpus(),
+        "python": platform.python_version(),
+        "ortools": ortools_version,
+        "platform": platform.platform(),
+        "commit": _git_commit(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "startup": startup,
+    }
+
+
+def _exceeds(current: Optional[float], baseline: Optional[float], tolerance: float, slack: float) -> bool:
+    if current is None or baseline is None:
+        return False
+    return current > baseline * (1 + tolerance) + slack
+
+
+def compare(
+    baseline: List[Dict[str, Any]], current: List[Dict[str, Any]], tolerance: float = 0.25
+) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``, one message each.
+
+    An instance regresses when its status ranks lower, its objective is
+    lower, or its wall time, build time or peak memory exceeds the baseline
+    by more than ``tolerance`` (a fraction) plus a small absolute slack.
+    Wall times are only compared when the baseline solved to optimality;
+    otherwise both runs used the whole time limit. Instances missing from
+    either side are ignored.
+    """
+    by_name = {record["name"]: record for record in baseline}
+    regressions = []
+    for record in current:
+        name, old = record["name"], by_name.get(record["name"])
+        if old is None:
+            continue
+        if _STATUS_RANK.get(record["status"], 0) < _STATUS_RANK.get(old["status"], 0):
+            regressions.append(f"{name}: status {old['status']} -> {record['status']}")
+        if (
+            record.get("objective_value") is not None and old.get("objective_value") is not None
+            and record["objective_value"] < old["objective_value"]
+        ):
+            regressions.append(f"{name}: objective {old['objective_value']} -> {record['objective_value']}")
+        for key, slack in _SLACK.items():
+            if key == "wall_seconds" and old["status"] != "OPTIMAL":
+                continue
+            if _exceeds(record.get(key), old.get(key), tolerance, slack):
+                regressions.append(f"{name}: {key} {old[key]} -> {record[key]}")
+    return regressions
+
+
+def compare_startup(
+    baseline: Optional[Dict[str, float]], current: Optional[Dict[str, float]], tolerance: float = 0.25
+) -> List[str]:
+    """Startup timings of ``current`` beyond the tolerance of ``baseline``; none without both"""
+    if not baseline or not current:
+        return []
+    return [
+        f"startup: {key} {baseline[key]} -> {value}"
+        for key, value in current.items()
+        if _exceeds(value, baseline.get(key), tolerance, _STARTUP_SLACK)
+    ]
+
+
+def write_json(path: str, meta: Dict[str, Any], records: List[Dict[str, Any]]) -> None:
+    with open(path, "w") as f:
+        json.dump({"metadata": meta, "runs": records}, f, indent=2)
+        f.write("\n")
+
+
+def write_csv(path: str, records: List[Dict[str, Any]]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", choices=sorted(SUITES), default="smoke")
+    parser.add_argument("--time-limit", type=int, default=None,
+                        help="Seconds per instance (default: per suite)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="CP-SAT search workers (default: all available CPUs)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the instance generator")
+    parser.add_argument("--json", help="Write metadata and records to this file")
+    parser.add_argument("--csv", help="Write records to this file")
+    parser.add_argument("--baseline", help="Compare with this earlier JSON output")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown or memory growth (default: 0.25)")
+    parser.add_argument("--skip-startup", action="store_true", help="Do not measure startup times")
+    args = parser.parse_args()
+
+    time_limit = args.time_limit or DEFAULT_TIME_LIMITS[args.suite]
+    # A fixed seed keeps the search reproducible between baseline and run
+    solver_params: Dict[str, Any] = {"random_seed": 0}
+    if args.workers is not None:
+        solver_params["num_workers"] = args.workers
+
+    startup = None
+    if not args.skip_startup:
+        startup = measure_startup()
+        print(json.dumps({"startup": startup}), file=sys.stderr, flush=True)
+    records = run_suite(suite_instances(args.suite, args.seed), time_limit, solver_params)
+    meta = metadata(args.suite, time_limit, solver_params, startup)
+    if args.json:
+        write_json(args.json, meta, records)
+    if args.csv:
+        write_csv(args.csv, records)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["metadata"].get("cpus") != meta["cpus"]:
+            print(f"warning: baseline recorded with {baseline['metadata'].get('cpus')} CPUs, "
+                  f"this run has {meta['cpus']}", file=sys.stderr)
+        regressions = compare(baseline["runs"], records, args.tolerance)
+        regressions += compare_startup(baseline["metadata"].get("startup"), startup, args.tolerance)
+        for message in regressions:
+            print(f"regression: {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Solve many independent instances at once.
+
+Each instance is a JSON object with the fields of a ``POST /api/schedule``
+body: ``participants``, ``tables``, ``rounds`` and optionally the pair
+lists (``[u, v]`` or ``{"u": u, "v": v}``), ``time_limit_seconds``,
+``engine``, ``objective_mode``, ``symmetry_breaking``,
+``lookahead_rounds``, ``hint_assignments``, ``solver_params``,
+``diagnostics`` and ``output_format`` (``compact`` replaces a result's
+``assignments`` with the encoded ``seating``).
+
+The instances are solved in a pool of ``jobs`` processes that import
+OR-Tools once and then take instance after instance. The CPUs are shared:
+unless an instance sets ``num_workers`` itself, each CP-SAT solve gets the
+available CPUs divided by ``jobs``. Results come back as soon as each
+instance finishes, in any order, tagged with the instance's index.
+"""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .compact import encode_seating
+    from .scheduler import InfeasibleInstanceError, schedule
+    from .solver_params import available_cpus, default_num_workers
+except ImportError:
+    from compact import encode_seating
+    from scheduler import InfeasibleInstanceError, schedule
+    from solver_params import available_cpus, default_num_workers
+
+# Instance field -> schedule() keyword argument
+INSTANCE_FIELDS = {
+    "participants": "num_participants",
+    "tables": "num_tables",
+    "rounds": "num_rounds",
+    "same_once_pairs": "same_once_pairs",
+    "never_together_pairs": "never_together_pairs",
+    "time_limit_seconds": "time_limit_seconds",
+    "engine": "engine",
+    "objective_mode": "objective_mode",
+    "symmetry_breaking": "symmetry_breaking",
+    "lookahead_rounds": "lookahead_rounds",
+    "hint_assignments": "hint_assignments",
+    "solver_params": "solver_params",
+    "diagnostics": "diagnostics",
+}
+_REQUIRED = ("participants", "tables", "rounds")
+# Fields that shape the output rather than the solve
+_OUTPUT_FIELDS = ("output_format",)
+OUTPUT_FORMATS = ("nested", "compact")
+
+
+def _pairs(items: Iterable[Any]) -> List[Tuple[int, int]]:
+    pairs = []
+    for item in items:
+        u, v = (item["u"], item["v"]) if isinstance(item, dict) else item
+        pairs.append((int(u), int(v)))
+    return pairs
+
+
+def instance_kwargs(instance: Dict[str, Any]) -> Dict[str, Any]:
+    """schedule() keyword arguments for one instance; ValueError for missing or unknown fields"""
+    if not isinstance(instance, dict):
+        raise ValueError("An instance must be a JSON object")
+    missing = [field for field in _REQUIRED if field not in instance]
+    if missing:
+        raise ValueError(f"Missing fields {', '.join(missing)}")
+    unknown = sorted(set(instance) - set(INSTANCE_FIELDS) - set(_OUTPUT_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields {', '.join(unknown)}")
+    kwargs = {
+        INSTANCE_FIELDS[field]: value
+        for field, value in instance.items()
+        if value is not None and field in INSTANCE_FIELDS
+    }
+    kwargs["same_once_pairs"] = _pairs(instance.get("same_once_pairs") or [])
+    kwargs["never_together_pairs"] = _pairs(instance.get("never_together_pairs") or [])
+    return kwargs
+
+
+def output_format(instance: Dict[str, Any]) -> str:
+    """The instance's ``output_format`` (default ``nested``); ValueError for an unknown one"""
+    value = instance.get("output_format") or "nested"
+    if value not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format {value!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+    return value
+
+
+def format_result(result: Dict[str, Any], output_format: str = "nested") -> Dict[str, Any]:
+    """``result`` in ``output_format``: ``compact`` swaps ``assignments`` for the encoded ``seating``"""
+    if output_format != "compact" or result.get("assignments") is None:
+        return result
+    formatted = dict(result, seating=encode_seating(result["assignments"], result["participants"]))
+    del formatted["assignments"]
+    return formatted
+
+
+def read_instances(lines: Iterable[str]) -> Iterator[Any]:
+    """One instance per non-blank line of a JSON-lines file; a malformed line yields its error"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield ValueError(f"Line {number}: {exc}")
+
+
+def _error(index: int, exc: BaseException) -> Dict[str, Any]:
+    if isinstance(exc, InfeasibleInstanceError):
+        return {"index": index, "error": str(exc), "diagnosis": exc.diagnosis}
+    return {"index": index, "error": str(exc) or type(exc).__name__}
+
+
+def solve_batch(
+    instances: Iterable[Any], jobs: Optional[int] = None, time_limit_seconds: int = 60
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ``{"index": i, "result": ...}`` for every instance as it finishes.
+
+    An instance that cannot be parsed or solved yields ``{"index": i,
+    "error": ...}`` instead (plus ``diagnosis`` when the pre-check proves it
+    infeasible); the others carry on. Indices count the items of
+    ``instances`` from 0. ``time_limit_seconds`` applies to instances that
+    do not set their own.
+    """
+    jobs = max(1, jobs or available_cpus())
+    workers_per_solve = default_num_workers(jobs)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {}
+        formats = {}
+        for index, instance in enumerate(instances):
+            try:
+                if isinstance(instance, Exception):
+                    raise instance
+                kwargs = instance_kwargs(instance)
+                formats[index] = output_format(instance)
+            except (ValueError, TypeError, KeyError) as exc:
+                yield _error(index, exc)
+                continue
+            kwargs.setdefault("time_limit_seconds", time_limit_seconds)
+            kwargs["solver_params"] = {"num_workers": workers_per_solve, **(kwargs.get("solver_params") or {})}
+            futures[pool.submit(schedule, **kwargs)] = index
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield {"index": index, "result": format_result(future.result(), formats[index])}
+            except Exception as exc:
+                yield _error(index, exc)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .scheduler import normalize_pairs
+except ImportError:
+    from scheduler import normalize_pairs
+
+# Only solutions of these statuses are worth keeping
+_CACHEABLE_STATUSES = ("OPTIMAL", "FEASIBLE")
+
+
+def instance_key(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    **options: Any,
+) -> str:
+    """
+    Content hash of a scheduling instance.
+
+    Pairs are normalised and sorted, so the same event submitted with pairs
+    in a different order or orientation maps to the same key. ``options``
+    holds any further settings that change the result; the time limit is
+    deliberately not part of the key (see ``ScheduleCache.get``).
+    """
+    canonical = {
+        "participants": num_participants,
+        "tables": num_tables,
+        "rounds": num_rounds,
+        "same_once_pairs": sorted(normalize_pairs(same_once_pairs, num_participants)),
+        "never_together_pairs": sorted(normalize_pairs(never_together_pairs, num_participants)),
+        "options": options,
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _reusable(status: str, solved_with: float, time_limit: float) -> bool:
+    # A proven optimum never improves; a merely feasible schedule only stands in for
+    # solves that would not have been given more time than it had
+    return status == "OPTIMAL" or time_limit <= solved_with
+
+
+class ScheduleCache:
+    """
+    Two-tier cache of ``schedule()`` results keyed by ``instance_key``.
+
+    The memory tier is an LRU of at most ``max_entries`` results. When
+    ``directory`` is given, results are also written to a sqlite file there
+    and survive restarts. OPTIMAL results are always reused; FEASIBLE ones
+    only for requests whose time limit does not exceed the one they were
+    solved with.
+    """
+
+    def __init__(self, max_entries: int = 128, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[str, Tuple[str, float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(directory, "schedule_cache.sqlite3"), check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                "time_limit REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, entry: Tuple[str, float, Dict[str, Any]]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT status, time_limit, result FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], row[1], json.loads(row[2]))
+        self._remember(key, entry)
+        return entry
+
+    def get(self, key: str, time_limit: float) -> Optional[Dict[str, Any]]:
+        """Return a cached result usable for a solve with ``time_limit``, or None"""
+        with self._lock:
+            in_memory = key in self._entries
+            entry = self._lookup(key)
+            if entry is not None and _reusable(entry[0], entry[1], time_limit):
+                self.hits += 1
+                if not in_memory:
+                    self.disk_hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, time_limit: float, result: Dict[str, Any]) -> None:
+        """Store a result unless an entry that is at least as good is already cached"""
+        status = result.get("solver_status")
+        if status not in _CACHEABLE_STATUSES:
+            return
+        with self._lock:
+            current = self._lookup(key)
+            if current is not None and _reusable(current[0], current[1], time_limit) and status != "OPTIMAL":
+                return
+            entry = (status, float(time_limit), result)
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, status, time_limit, result) VALUES (?, ?, ?, ?)",
+                    (key, status, float(time_limit), json.dumps(result, separators=(",", ":"))),
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+            }
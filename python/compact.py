@@ -0,0 +1,46 @@
+"""
+Compact encoding of the seating of a schedule.
+
+Nested ``assignments`` spell out every participant id once per round,
+with the list punctuation around it. The compact form is the
+``(rounds, participants)`` matrix of table indices instead: column
+``p - 1`` holds the table of participant ``p`` (1-based, 0 when not
+seated), stored row by row as little-endian int16 and base64-encoded:
+two bytes per seat, under three characters in JSON.
+"""
+import base64
+from typing import Any, Dict, List
+
+import numpy as np
+
+try:
+    from .scheduler import _assignments_from_matrix
+except ImportError:
+    from scheduler import _assignments_from_matrix
+
+SEATING_ENCODING = "int16le-base64"
+
+
+def encode_seating(assignments: List[List[List[int]]], num_participants: int) -> Dict[str, Any]:
+    """The seating of ``assignments`` as a base64 (rounds, participants) table-index matrix"""
+    matrix = np.zeros((len(assignments), num_participants), dtype="<i2")
+    for r, round_tables in enumerate(assignments):
+        for t, table in enumerate(round_tables, start=1):
+            matrix[r, np.asarray(table, dtype=np.intp) - 1] = t
+    return {
+        "encoding": SEATING_ENCODING,
+        "shape": list(matrix.shape),
+        "data": base64.b64encode(matrix.tobytes()).decode("ascii"),
+    }
+
+
+def decode_seating(seating: Dict[str, Any], num_tables: int) -> List[List[List[int]]]:
+    """Inverse of ``encode_seating``: the nested assignments, ids ascending within a table"""
+    if seating.get("encoding") != SEATING_ENCODING:
+        raise ValueError(f"Unknown seating encoding {seating.get('encoding')!r}; expected {SEATING_ENCODING!r}")
+    rounds, participants = seating["shape"]
+    matrix = np.frombuffer(base64.b64decode(seating["data"]), dtype="<i2").reshape(rounds, participants)
+    # Column 0 stands for the unused participant id 0, which sits at no table
+    full = np.zeros((rounds, participants + 1), dtype=np.int64)
+    full[:, 1:] = matrix
+    return _assignments_from_matrix(full, num_tables)
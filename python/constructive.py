@@ -0,0 +1,162 @@
+"""
+Closed-form schedules for instances with little or no pair structure.
+
+Guests are laid out on a grid with one column per table. Guest (row q,
+column c) sits at table (c + m_q * r) mod b in round r, where m_q is the
+row's multiplier. Two guests in the same row never meet. Two guests in
+rows q1 and q2 meet only in rounds r with (m_q1 - m_q2) * r == const
+(mod b), so they meet at most once when b / gcd(m_q1 - m_q2, b) >= c.
+This is the cyclic construction of a resolvable design. Every full row puts one
+guest at each table, and a partial row covers a run of distinct tables,
+so the table sizes stay balanced.
+
+Pair lists are then handled by relabelling guests onto grid slots with a
+small local search. The caller validates the result against the full
+constraint set, so a construction that does not fit the instance just
+returns something invalid or None.
+"""
+import random
+from math import gcd
+from typing import Dict, List, Optional, Tuple
+
+# Hard violations outweigh any number of missed same-once pairs
+_HARD = 1000
+
+
+def _pick_multipliers(num_tables: int, num_rounds: int, rows: int) -> Optional[List[int]]:
+    def distinct_visits(m: int) -> int:
+        return min(num_rounds, num_tables // gcd(m, num_tables))
+
+    def compatible(m1: int, m2: int) -> bool:
+        return num_tables // gcd(m1 - m2, num_tables) >= num_rounds
+
+    # Greedy: most host diversity first, so the weakest multiplier lands on the partial last row
+    chosen: List[int] = []
+    for m in sorted(range(num_tables), key=lambda m: (-distinct_visits(m), m)):
+        if all(compatible(m, other) for other in chosen):
+            chosen.append(m)
+            if len(chosen) == rows:
+                return chosen
+    return None
+
+
+def _grid_tables(
+    num_guests: int, num_tables: int, num_rounds: int
+) -> Optional[List[List[int]]]:
+    # tables[s][r]: 0-based table of grid slot s in round r
+    rows = -(-num_guests // num_tables)
+    if rows == 0:
+        return []
+    if num_rounds == 1:
+        multipliers = list(range(rows))
+    else:
+        multipliers = _pick_multipliers(num_tables, num_rounds, rows)
+        if multipliers is None:
+            return None
+    return [
+        [(s % num_tables + multipliers[s // num_tables] * r) % num_tables for r in range(num_rounds)]
+        for s in range(num_guests)
+    ]
+
+
+class _Relabeling:
+    """Local search over which guest takes which grid slot"""
+
+    def __init__(
+        self,
+        slot_tables: List[List[int]],
+        num_tables: int,
+        same_once_pairs: List[Tuple[int, int]],
+        never_together_pairs: List[Tuple[int, int]],
+    ):
+        self.slot_tables = slot_tables
+        self.num_tables = num_tables
+        # Guest g (participant num_tables + 1 + g) starts in slot g
+        self.slot = list(range(len(slot_tables)))
+        self.constraints: Dict[int, List[Tuple[str, int, int]]] = {}
+        for kind, pairs in (("same", same_once_pairs), ("never", never_together_pairs)):
+            for u, v in pairs:
+                if v <= num_tables:
+                    continue  # both hosts: never meet, nothing to arrange
+                key = (kind, u, v)
+                if u > num_tables:
+                    self.constraints.setdefault(u - num_tables - 1, []).append(key)
+                self.constraints.setdefault(v - num_tables - 1, []).append(key)
+
+    def _tables_of(self, p: int) -> List[int]:
+        if p <= self.num_tables:
+            return [p - 1] * len(self.slot_tables[0])
+        return self.slot_tables[self.slot[p - self.num_tables - 1]]
+
+    def _cost(self, key: Tuple[str, int, int]) -> int:
+        kind, u, v = key
+        meetings = sum(1 for a, b in zip(self._tables_of(u), self._tables_of(v)) if a == b)
+        if kind == "never":
+            return _HARD * meetings
+        return 0 if meetings == 1 else (1 if meetings == 0 else _HARD)
+
+    def _guest_cost(self, guests: Tuple[int, ...]) -> int:
+        keys = {key for g in guests for key in self.constraints.get(g, [])}
+        return sum(self._cost(key) for key in keys)
+
+    def total_cost(self) -> int:
+        keys = {key for keys in self.constraints.values() for key in keys}
+        return sum(self._cost(key) for key in keys)
+
+    def improve(self, max_steps: int, seed: int = 0) -> int:
+        rng = random.Random(seed)
+        cost = self.total_cost()
+        involved = list(self.constraints)
+        num_guests = len(self.slot)
+        for _ in range(max_steps):
+            if cost == 0 or not involved:
+                break
+            g = rng.choice(involved)
+            h = rng.randrange(num_guests)
+            if g == h:
+                continue
+            before = self._guest_cost((g, h))
+            self.slot[g], self.slot[h] = self.slot[h], self.slot[g]
+            delta = self._guest_cost((g, h)) - before
+            if delta <= 0:
+                cost += delta
+            else:
+                self.slot[g], self.slot[h] = self.slot[h], self.slot[g]
+        return cost
+
+
+def construct_assignments(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    max_steps: int = 20000,
+) -> Optional[List[List[List[int]]]]:
+    """
+    Build a schedule in the ``assignments`` layout of ``schedule()`` without a solver.
+
+    Pairs must already be normalized. Returns None when no cyclic layout
+    exists for these dimensions; otherwise returns the best relabelling
+    found, which the caller still has to validate.
+    """
+    num_guests = num_participants - num_tables
+    slot_tables = _grid_tables(num_guests, num_tables, num_rounds)
+    if slot_tables is None:
+        return None
+
+    slot = list(range(num_guests))
+    if num_guests and (same_once_pairs or never_together_pairs):
+        search = _Relabeling(slot_tables, num_tables, same_once_pairs, never_together_pairs)
+        search.improve(max_steps)
+        slot = search.slot
+
+    assignments: List[List[List[int]]] = []
+    for r in range(num_rounds):
+        round_tables = [[h] for h in range(1, num_tables + 1)]
+        for g in range(num_guests):
+            round_tables[slot_tables[slot[g]][r]].append(num_tables + 1 + g)
+        for table in round_tables:
+            table.sort()
+        assignments.append(round_tables)
+    return assignments
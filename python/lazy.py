@@ -0,0 +1,28 @@
+"""
+Deferred imports of heavy dependencies.
+
+Importing OR-Tools costs about 0.4 s (protobuf and the native solver
+library), which the CLI and the API would pay at startup even on paths
+that never solve: closed-form schedules, health checks, docs and
+rejected requests. ``lazy_import`` returns the module object right away
+and runs its code on the first attribute access.
+"""
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return module ``name``, loading it on first attribute access unless it is already loaded"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
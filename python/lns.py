@@ -0,0 +1,325 @@
+"""
+Large-neighbourhood search for events too big for one CP-SAT model.
+
+Starting from a complete seating, each step keeps most of the schedule
+fixed and frees a window of (round, table) cells: every guest seated
+at a freed cell may move to any freed cell of the same round. The
+sub-model only has variables for those guests and cells, so its size
+follows the neighbourhood, not the event. Freed cells keep their guest
+counts, which keeps the table balance of the starting seating.
+
+Meetings, host visits and pair meetings outside the window are
+constants of the sub-model. It forbids any new guest meeting that
+would repeat one already made elsewhere, so a starting seating that
+still has conflicts only ever loses them. The neighbourhood size adapts:
+it grows while sub-models are solved or refuted within the step limit
+and shrinks while they time out.
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .lazy import lazy_import
+    from .scheduler import ALPHA, BETA, GAMMA, _solve, _tables_by_participant, schedule_objective
+    from .solver_params import resolve_solver_params
+except ImportError:
+    from lazy import lazy_import
+    from scheduler import ALPHA, BETA, GAMMA, _solve, _tables_by_participant, schedule_objective
+    from solver_params import resolve_solver_params
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+
+# Score penalty per hard-constraint breach left in the incumbent
+_HARD = 100 * ALPHA
+_MIN_SLOTS = 8
+
+
+def schedule_conflicts(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> List[Tuple[int, int]]:
+    """Pairs breaking a hard constraint: guests met twice, same-once met twice, never-together met"""
+    meetings = _meeting_counts(assignments, num_tables)
+    conflicts = [pair for pair, count in meetings.items() if pair[0] > num_tables and count > 1]
+    for (u, v) in same_once_pairs:
+        if u <= num_tables and meetings.get((u, v), 0) > 1:
+            conflicts.append((u, v))
+    for (u, v) in never_together_pairs:
+        if meetings.get((u, v), 0) > 0:
+            conflicts.append((u, v))
+    return conflicts
+
+
+def _meeting_counts(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    skip: Optional[Dict[int, Set[int]]] = None,
+) -> Dict[Tuple[int, int], int]:
+    # (u, v) -> number of rounds u and v share a table, leaving out the cells in skip
+    counts: Dict[Tuple[int, int], int] = {}
+    for r, round_tables in enumerate(assignments):
+        for t, table in enumerate(round_tables, start=1):
+            if skip is not None and t in skip.get(r, ()):
+                continue
+            members = sorted(table)
+            for i, u in enumerate(members):
+                for v in members[i + 1:]:
+                    counts[(u, v)] = counts.get((u, v), 0) + 1
+    return counts
+
+
+def _score(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> int:
+    conflicts = schedule_conflicts(assignments, num_tables, same_once_pairs, never_together_pairs)
+    return schedule_objective(assignments, num_tables, same_once_pairs) - _HARD * len(conflicts)
+
+
+def _pick_neighbourhood(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    targets: List[Tuple[int, int]],
+    slots: int,
+    rng: random.Random,
+) -> Dict[int, Set[int]]:
+    # round -> freed tables, holding roughly `slots` guests in total
+    num_rounds = len(assignments)
+    seats = _tables_by_participant(assignments)
+    free: Dict[int, Set[int]] = {}
+    kind = rng.choice(("pairs", "rounds", "tables")) if targets else rng.choice(("rounds", "tables"))
+
+    if kind == "pairs":
+        # Free the tables of a troubled pair in one round, plus company for them to swap with
+        u, v = rng.choice(targets)
+        # A pair that met too often is split up in one of the rounds it met
+        met = [r for r, seat in enumerate(seats) if seat.get(u) is not None and seat.get(u) == seat.get(v)]
+        r = rng.choice(met) if met else rng.randrange(num_rounds)
+        free[r] = {t for t in (seats[r].get(u), seats[r].get(v)) if t is not None}
+        rounds = [r]
+    elif kind == "rounds":
+        rounds = rng.sample(range(num_rounds), min(num_rounds, rng.choice((1, 2))))
+    else:
+        rounds = list(range(num_rounds))
+        tables = rng.sample(range(1, num_tables + 1), num_tables)
+        for t in tables:
+            if _free_guests(assignments, free, num_tables) >= slots:
+                break
+            for r in rounds:
+                free.setdefault(r, set()).add(t)
+        return free
+
+    candidates = [(r, t) for r in rounds for t in range(1, num_tables + 1) if t not in free.get(r, ())]
+    rng.shuffle(candidates)
+    for r, t in candidates:
+        if _free_guests(assignments, free, num_tables) >= slots:
+            break
+        free.setdefault(r, set()).add(t)
+    return free
+
+
+def _free_guests(assignments: List[List[List[int]]], free: Dict[int, Set[int]], num_tables: int) -> int:
+    return sum(
+        sum(1 for p in assignments[r][t - 1] if p > num_tables)
+        for r, tables in free.items() for t in tables
+    )
+
+
+def _solve_neighbourhood(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    free: Dict[int, Set[int]],
+    time_limit_seconds: float,
+    stop_event: Optional[Any],
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Optional[List[List[List[int]]]], int]:
+    # Re-seat the guests of the freed cells; returns (new assignments or None, status)
+    seats = _tables_by_participant(assignments)
+    fixed_meetings = _meeting_counts(assignments, num_tables, skip=free)
+    never = set(never_together_pairs)
+    model = cp_model.CpModel()
+
+    # Decision vars: x[g, t, r] for each guest of a freed cell and each freed table of its round
+    x: Dict[Tuple[int, int, int], Any] = {}
+    free_guests: Dict[int, List[int]] = {}
+    freed: Set[Tuple[int, int]] = set()
+    for r, tables in free.items():
+        guests = sorted(p for t in tables for p in assignments[r][t - 1] if p > num_tables)
+        free_guests[r] = guests
+        freed.update((g, r) for g in guests)
+        for g in guests:
+            options = []
+            for t in tables:
+                if (t, g) in never:
+                    continue  # never together with this host
+                x[(g, t, r)] = model.NewBoolVar(f"x_p{g}_t{t}_r{r}")
+                options.append(x[(g, t, r)])
+            model.AddExactlyOne(options)
+        # Freed cells keep their guest counts, so the round stays balanced
+        for t in tables:
+            count = sum(1 for p in assignments[r][t - 1] if p > num_tables)
+            model.Add(sum(x[(g, t, r)] for g in guests if (g, t, r) in x) == count)
+
+    # Guest pairs: never twice (counting the fixed cells), never-together pairs not at all
+    shared: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}  # pair -> (t, r) cells both can take
+    for r, guests in free_guests.items():
+        for i, u in enumerate(guests):
+            for v in guests[i + 1:]:
+                cells = [(t, r) for t in free[r] if (u, t, r) in x and (v, t, r) in x]
+                if cells:
+                    shared.setdefault((u, v), []).extend(cells)
+    same_once = set(same_once_pairs)
+    together: Dict[Tuple[int, int, int, int], Any] = {}  # (u, v, t, r) -> u and v share t in r
+    for (u, v), cells in shared.items():
+        if (u, v) in never or fixed_meetings.get((u, v), 0) > 0:
+            for t, r in cells:
+                model.AddBoolOr([x[(u, t, r)].Not(), x[(v, t, r)].Not()])
+            continue
+        if len({r for _, r in cells}) < 2 and (u, v) not in same_once:
+            continue  # one round: they can share at most one table anyway
+        for t, r in cells:
+            z = model.NewBoolVar(f"z_p{u}_p{v}_t{t}_r{r}")
+            model.AddBoolOr([x[(u, t, r)].Not(), x[(v, t, r)].Not(), z])
+            model.AddImplication(z, x[(u, t, r)])
+            model.AddImplication(z, x[(v, t, r)])
+            together[(u, v, t, r)] = z
+        model.Add(sum(together[(u, v, t, r)] for t, r in cells) <= 1)
+
+    # Same-once pairs: rewarded once, never met twice
+    objective = []
+    pair_hosts: Dict[int, Set[int]] = {}  # participant -> hosts of pair meetings in fixed cells
+    new_pair_hosts: Dict[Tuple[int, int], List[Any]] = {}  # (participant, host) -> meeting vars
+    for (u, v) in same_once_pairs:
+        if u <= num_tables:
+            meets = [(x[(v, u, r)], u) for r in free if (v, u, r) in x]
+        else:
+            meets = [(together[(u, v, t, r)], t) for t, r in shared.get((u, v), []) if (u, v, t, r) in together]
+        fixed = [seat[u] for r, seat in enumerate(seats) if seat.get(u) is not None
+                 and seat.get(u) == seat.get(v) and seat[u] not in free.get(r, ())]
+        for p in (u, v):
+            pair_hosts.setdefault(p, set()).update(fixed)
+        if fixed:
+            for var, _ in meets:
+                model.Add(var == 0)
+            continue
+        if not meets:
+            continue
+        model.Add(sum(var for var, _ in meets) <= 1)
+        objective.extend(ALPHA * var for var, _ in meets)
+        for var, t in meets:
+            for p in (u, v):
+                new_pair_hosts.setdefault((p, t), []).append(var)
+
+    for (p, t), meets in new_pair_hosts.items():
+        if t in pair_hosts.get(p, ()):
+            continue
+        y = model.NewBoolVar(f"pair_host_used_p{p}_h{t}")
+        model.Add(y <= sum(meets))
+        objective.append(GAMMA * y)
+
+    # Host visits not already made in a fixed cell
+    visits: Dict[Tuple[int, int], List[Any]] = {}
+    for (g, t, r), var in x.items():
+        visits.setdefault((g, t), []).append(var)
+    for (g, t), options in visits.items():
+        if any(seat.get(g) == t for r, seat in enumerate(seats) if (g, r) not in freed):
+            continue
+        v = model.NewBoolVar(f"visited_p{g}_h{t}")
+        model.Add(v <= sum(options))
+        objective.append(BETA * v)
+
+    model.Maximize(sum(objective))
+    for (g, t, r), var in x.items():
+        model.AddHint(var, 1 if seats[r].get(g) == t else 0)
+
+    solver, status, _ = _solve(
+        model, lambda value: [], time_limit_seconds, None, stop_event, params=solver_params
+    )
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, status
+
+    improved = [[list(table) for table in round_tables] for round_tables in assignments]
+    for r, tables in free.items():
+        for t in tables:
+            improved[r][t - 1] = [p for p in improved[r][t - 1] if p <= num_tables]
+    for (g, t, r), var in x.items():
+        if solver.Value(var):
+            improved[r][t - 1].append(g)
+    for r in free:
+        for table in improved[r]:
+            table.sort()
+    return improved, status
+
+
+def improve_schedule(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    time_limit_seconds: float,
+    iteration_seconds: float = 1.0,
+    neighbourhood_size: int = 48,
+    on_improvement: Optional[Callable[[List[List[List[int]]], float], None]] = None,
+    stop_event: Optional[Any] = None,
+    seed: int = 0,
+    stop_at: Optional[int] = None,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> List[List[List[int]]]:
+    """
+    Improve a complete seating by large-neighbourhood search until the time limit.
+
+    ``assignments`` uses the output layout of ``schedule()`` and must seat
+    everyone, hosts at their own tables. Pairs must already be normalized.
+    ``neighbourhood_size`` is the initial number of guests freed per step;
+    ``on_improvement(assignments, elapsed_seconds)`` is called for every
+    better incumbent. The search ends early once the score reaches ``stop_at``.
+    ``solver_params`` applies to every sub-model (see ``solver_params.py``).
+    """
+    started = time.perf_counter()
+    solver_params = resolve_solver_params(solver_params)
+    rng = random.Random(seed)
+    best = [[sorted(table) for table in round_tables] for round_tables in assignments]
+    best_score = _score(best, num_tables, same_once_pairs, never_together_pairs)
+    total_guests = _free_guests(best, {r: set(range(1, num_tables + 1)) for r in range(len(best))}, num_tables)
+    slots = max(_MIN_SLOTS, min(neighbourhood_size, total_guests))
+
+    while True:
+        remaining = time_limit_seconds - (time.perf_counter() - started)
+        if remaining <= 0 or (stop_event is not None and stop_event.is_set()):
+            break
+        if stop_at is not None and best_score >= stop_at:
+            break
+        conflicts = schedule_conflicts(best, num_tables, same_once_pairs, never_together_pairs)
+        seats = _tables_by_participant(best)
+        unsatisfied = [
+            (u, v) for (u, v) in same_once_pairs if not any(seat[u] == seat[v] for seat in seats)
+        ]
+        free = _pick_neighbourhood(best, num_tables, conflicts or unsatisfied, slots, rng)
+        candidate, status = _solve_neighbourhood(
+            best, num_tables, same_once_pairs, never_together_pairs, free,
+            min(iteration_seconds, remaining), stop_event, solver_params,
+        )
+        # Grow the window while the sub-models are settled in time (a window too tight to
+        # re-seat anyone is infeasible), shrink it when they time out
+        if status in (cp_model.OPTIMAL, cp_model.INFEASIBLE):
+            slots = min(total_guests, int(slots * 1.1) + 1)
+        else:
+            slots = max(_MIN_SLOTS, int(slots * 0.9))
+        if candidate is None:
+            continue
+        score = _score(candidate, num_tables, same_once_pairs, never_together_pairs)
+        if score >= best_score:
+            improved = score > best_score
+            best, best_score = candidate, score
+            if improved and on_improvement is not None:
+                on_improvement(best, time.perf_counter() - started)
+    return best
@@ -1,8 +1,10 @@
 import sys
 import json
-from typing import List, Tuple
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
 
-from scheduler import schedule
+from batch import read_instances, solve_batch
+from scheduler import InfeasibleInstanceError, schedule
 
 
 def parse_stdin() -> Tuple[int, int, int, List[Tuple[int, int]], List[Tuple[int, int]]]:
@@ -118,16 +120,95 @@ def parse_interactive() -> Tuple[int, int, int, List[Tuple[int, int]], List[Tupl
     return a, b, c, same_pairs, never_pairs
 
 
+def print_ndjson(event: str, payload: Dict[str, Any]) -> None:
+    print(json.dumps({"event": event, **payload}, separators=(",", ":")), flush=True)
+
+
+def print_profile(diagnostics: Dict[str, Any]) -> None:
+    # Human-readable summary of the diagnostics on stderr; stdout stays JSON
+    lines = ["phase                    seconds"]
+    lines += [f"  {name:<22} {seconds:>8.4f}" for name, seconds in diagnostics["phases"].items()]
+    if diagnostics["blocks"]:
+        lines.append("block                  variables  constraints")
+        lines += [
+            f"  {name:<22} {counts['variables']:>9} {counts['constraints']:>12}"
+            for name, counts in diagnostics["blocks"].items()
+        ]
+    solver = diagnostics["solver"]
+    if solver:
+        lines.append(
+            f"solver: wall {solver['wall_time']} s, user {solver['user_time']} s, "
+            f"{solver['branches']} branches, {solver['conflicts']} conflicts, "
+            f"best bound {solver['best_bound']}, {solver['num_workers']} workers"
+        )
+    print("\n".join(lines), file=sys.stderr, flush=True)
+
+
+def run_batch(path: str, jobs: Optional[int]) -> None:
+    # One line per instance, in the order they finish; exit status 1 if any of them failed
+    failed = False
+    with (sys.stdin if path == "-" else open(path)) as lines:
+        for line in solve_batch(read_instances(lines), jobs=jobs):
+            failed = failed or "error" in line
+            print(json.dumps(line, separators=(",", ":")), flush=True)
+    if failed:
+        sys.exit(1)
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-table scheduler (reads the instance from stdin)")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print each improving solution as an NDJSON line before the final result",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="add phase timings, model block sizes and solver statistics to the result "
+             "(key \"diagnostics\") and print a summary to stderr",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="PATH",
+        help="solve every instance of a JSON-lines file ('-' for stdin) in parallel and print one "
+             "JSON line per instance as it finishes",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="instances solved at once with --batch (default: available CPUs)",
+    )
+    args = parser.parse_args()
+    if args.batch:
+        run_batch(args.batch, args.jobs)
+        return
     try:
         # If running interactively, guide the user with prompts.
         if sys.stdin.isatty():
             a, b, c, same_pairs, never_pairs = parse_interactive()
         else:
             a, b, c, same_pairs, never_pairs = parse_stdin()
-        print("start scheduler")
-        result = schedule(a, b, c, same_pairs, never_pairs)
-        print(json.dumps(result, separators=(",", ":")))
+        if args.stream:
+            result = schedule(
+                a, b, c, same_pairs, never_pairs,
+                on_solution=lambda update: print_ndjson("solution", update),
+                diagnostics=args.profile,
+            )
+            print_ndjson("result", result)
+        else:
+            print("start scheduler")
+            result = schedule(a, b, c, same_pairs, never_pairs, diagnostics=args.profile)
+            print(json.dumps(result, separators=(",", ":")))
+        if args.profile:
+            print_profile(result["diagnostics"])
+    except InfeasibleInstanceError as exc:
+        print(json.dumps({
+            "error": str(exc),
+            "diagnosis": exc.diagnosis,
+        }), file=sys.stdout)
+        sys.exit(1)
     except Exception as exc:
         print(json.dumps({
             "error": str(exc)
@@ -1,6 +1,123 @@
-from typing import List, Tuple, Dict, Any
+from __future__ import annotations
 
-from ortools.sat.python import cp_model
+import functools
+import itertools
+import os
+import threading
+import time
+from typing import List, Tuple, Dict, Any, Callable, Optional, Sequence, Set
+
+import numpy as np
+
+try:
+    from .constructive import construct_assignments
+    from .lazy import lazy_import
+    from .seeding import greedy_assignments
+    from .skeletons import SkeletonCache
+    from .solver_params import apply_solver_params, resolve_solver_params
+    from .symmetry import add_symmetry_breaking, canonical_assignments, guest_classes
+except ImportError:
+    from constructive import construct_assignments
+    from lazy import lazy_import
+    from seeding import greedy_assignments
+    from skeletons import SkeletonCache
+    from solver_params import apply_solver_params, resolve_solver_params
+    from symmetry import add_symmetry_breaking, canonical_assignments, guest_classes
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+
+# Objective weights: same-once pairs met, distinct hosts visited, distinct hosts of pair meetings
+ALPHA = 1000
+BETA = 1
+GAMMA = 5
+# Reward per participant left at their previous table when repairing a schedule
+KEEP_WEIGHT = 100
+
+ENGINES = ("auto", "cpsat", "constructive", "lns", "rolling")
+# "weighted" maximises the ALPHA/BETA/GAMMA sum in one solve; "lexicographic" maximises
+# pairs met, then hosts visited, then pair hosts, each stage keeping the earlier optima
+OBJECTIVE_MODES = ("weighted", "lexicographic")
+_OBJECTIVE_TERMS = ("same_once_pairs", "host_visits", "pair_hosts")
+# Relative time shares of the lexicographic stages; the first term matters most
+_STAGE_SHARES = (2, 1, 1)
+# Version of the skeleton built by _build_skeleton; part of the cache key, so skeletons
+# written to SKELETON_CACHE_DIR by an older formulation are never reused
+_SKELETON_FORMAT = 1
+
+
+class InfeasibleInstanceError(ValueError):
+    """Raised when the pre-check proves that no valid schedule exists"""
+
+    def __init__(self, diagnosis: Dict[str, Any]):
+        self.diagnosis = diagnosis
+        kinds = ", ".join(sorted({conflict["kind"] for conflict in diagnosis["conflicts"]}))
+        super().__init__(f"No valid schedule exists ({kinds})")
+
+    def __reduce__(self):
+        # Rebuild from the diagnosis when raised in a worker process and unpickled in the parent
+        return type(self), (self.diagnosis,)
+
+
+def normalize_pairs(pairs: List[Tuple[int, int]], num_participants: int) -> List[Tuple[int, int]]:
+    # Normalize pairs: ensure (min,max), remove duplicates and invalid
+    seen = set()
+    out: List[Tuple[int, int]] = []
+    for u, v in pairs:
+        if u == v:
+            continue
+        if not (1 <= u <= num_participants and 1 <= v <= num_participants):
+            continue
+        a, b = (u, v) if u < v else (v, u)
+        key = (a, b)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(key)
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def _progress_callback_class() -> type:
+    # Defined on first use, since subclassing needs OR-Tools loaded
+    class _ProgressCallback(cp_model.CpSolverSolutionCallback):
+        """Reports every improving incumbent and stops once one reaches ``stop_at``"""
+
+        def __init__(
+            self,
+            on_solution: Optional[Callable[[Dict[str, Any]], None]],
+            extract: Callable[[Sequence[int]], List[List[List[int]]]],
+            stop_at: Optional[float] = None,
+        ):
+            super().__init__()
+            self._on_solution = on_solution
+            self._extract = extract
+            self._stop_at = stop_at
+            self.time_to_best: Optional[float] = None
+
+        def on_solution_callback(self) -> None:
+            self.time_to_best = self.WallTime()
+            if self._on_solution is not None:
+                self._on_solution({
+                    "assignments": self._extract(self.Response().solution),
+                    "objective_value": int(self.ObjectiveValue()),
+                    "best_bound": float(self.BestObjectiveBound()),
+                    "elapsed_seconds": self.WallTime(),
+                })
+            # Nothing can beat a proven ceiling, so searching on only proves what is known
+            if self._stop_at is not None and self.ObjectiveValue() >= self._stop_at:
+                self.StopSearch()
+
+    return _ProgressCallback
+
+
+def _stop_when_set(solver: cp_model.CpSolver, stop_event: Any, done: threading.Event) -> None:
+    # stop_event may be a multiprocessing proxy, so poll it rather than block forever.
+    # StopSearch does nothing until Solve() has set up its search, so keep repeating it
+    # until the solve returns
+    while not done.is_set():
+        if stop_event.wait(0.1):
+            solver.StopSearch()
+            done.wait(0.05)
 
 
 def compute_table_sizes(num_participants: int, num_tables: int) -> List[int]:
@@ -9,6 +126,365 @@ def compute_table_sizes(num_participants: int, num_tables: int) -> List[int]:
     return [base + 1 if t < rem else base for t in range(num_tables)]
 
 
+def _tables_by_participant(assignments: List[List[List[int]]]) -> List[Dict[int, int]]:
+    # Per round: participant -> table (1-based)
+    return [
+        {p: t for t, table in enumerate(round_tables, start=1) for p in table}
+        for round_tables in assignments
+    ]
+
+
+def _seat_matrix(assignments: List[List[List[int]]]) -> np.ndarray:
+    # (rounds, participants + 1) table index per participant id, 0 where not seated
+    top = max((p for round_tables in assignments for table in round_tables for p in table), default=0)
+    matrix = np.zeros((len(assignments), top + 1), dtype=np.int32)
+    for r, round_tables in enumerate(assignments):
+        for t, table in enumerate(round_tables, start=1):
+            matrix[r, table] = t
+    return matrix
+
+
+def _assignments_from_matrix(matrix: np.ndarray, num_tables: int) -> List[List[List[int]]]:
+    # Inverse of _seat_matrix: per round, the sorted participant ids at each table
+    assignments: List[List[List[int]]] = []
+    for row in matrix:
+        ids = np.argsort(row, kind="stable")  # grouped by table, ascending ids within a table
+        ends = np.cumsum(np.bincount(row, minlength=num_tables + 1))
+        assignments.append([ids[ends[t - 1]:ends[t]].tolist() for t in range(1, num_tables + 1)])
+    return assignments
+
+
+def _pair_meetings(matrix: np.ndarray, pairs: List[Tuple[int, int]]) -> np.ndarray:
+    # (rounds, pairs) mask of the rounds in which both members of a pair share a table
+    if not pairs:
+        return np.zeros((matrix.shape[0], 0), dtype=bool)
+    ids = np.asarray(pairs)
+    # Ids beyond the matrix were never seated; point them at column 0, which holds no one
+    ids = np.where(ids < matrix.shape[1], ids, 0)
+    seat_u, seat_v = matrix[:, ids[:, 0]], matrix[:, ids[:, 1]]
+    return (seat_u == seat_v) & (seat_u > 0)
+
+
+def _post_check(
+    assignments: List[List[List[int]]],
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> Tuple[List[List[int]], List[List[int]], List[List[int]]]:
+    # Post-check and stats: (satisfied same-once, unsatisfied same-once, never-together violations)
+    matrix = _seat_matrix(assignments)
+    meetings = _pair_meetings(matrix, same_once_pairs).sum(axis=0)
+    satisfied_same_once = [[u, v] for (u, v), count in zip(same_once_pairs, meetings) if count == 1]
+    unsatisfied_same_once = [[u, v] for (u, v), count in zip(same_once_pairs, meetings) if count != 1]
+    violated = _pair_meetings(matrix, never_together_pairs).any(axis=0)
+    never_violations = [[u, v] for (u, v), bad in zip(never_together_pairs, violated) if bad]
+    return satisfied_same_once, unsatisfied_same_once, never_violations
+
+
+def is_valid_schedule(
+    assignments: List[List[List[int]]],
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> bool:
+    """Check every hard constraint of the CP-SAT model against a concrete schedule"""
+    if len(assignments) != num_rounds:
+        return False
+    everyone = list(range(1, num_participants + 1))
+    for round_tables in assignments:
+        if len(round_tables) != num_tables:
+            return False
+        # Everyone seated exactly once, hosts at their own table, sizes balanced
+        if sorted(p for table in round_tables for p in table) != everyone:
+            return False
+        for h, table in enumerate(round_tables, start=1):
+            if h not in table:
+                return False
+        sizes = [len(table) for table in round_tables]
+        if max(sizes) - min(sizes) > 1:
+            return False
+    matrix = _seat_matrix(assignments)
+    # Guests never share a table twice: two guests meet in rounds r1 and r2 exactly when
+    # they make the same table-to-table move between them
+    guests = matrix[:, num_tables + 1:]
+    for r1, r2 in itertools.combinations(range(num_rounds), 2):
+        moves = guests[r1] * (num_tables + 1) + guests[r2]
+        if np.unique(moves).size < moves.size:
+            return False
+    if (_pair_meetings(matrix, same_once_pairs).sum(axis=0) > 1).any():
+        return False
+    return not _pair_meetings(matrix, never_together_pairs).any()
+
+
+def schedule_objective(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+) -> int:
+    """Value of the CP-SAT objective for a concrete schedule"""
+    matrix = _seat_matrix(assignments)
+    base = num_tables + 1
+    together = _pair_meetings(matrix, same_once_pairs)
+    met_pairs = int(together.any(axis=0).sum())
+    # Distinct (participant, table) combinations: tables of each participant's pair meetings...
+    pair_hosts = 0
+    if same_once_pairs:
+        rounds, pairs = np.nonzero(together)
+        ids = np.asarray(same_once_pairs)[pairs]
+        tables = matrix[rounds, ids[:, 0]]
+        pair_hosts = np.unique(np.concatenate([ids[:, 0], ids[:, 1]]) * base + np.tile(tables, 2)).size
+    # ...and hosts visited by guests; participants may be absent from some rounds (repairs)
+    guests = matrix[:, base:]
+    seated = guests > 0
+    visits = np.unique((np.nonzero(seated)[1] + base) * base + guests[seated]).size
+    return ALPHA * met_pairs + BETA * visits + GAMMA * pair_hosts
+
+
+def objective_upper_bound(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> int:
+    """Analytic ceiling of the objective: every term at its individual maximum"""
+    pairs_met, visits, pair_hosts = _objective_ceilings(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    )
+    return ALPHA * pairs_met + BETA * visits + GAMMA * pair_hosts
+
+
+def _objective_ceilings(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> Tuple[int, int, int]:
+    # Unweighted ceilings of the pairs met, hosts visited and pair hosts terms
+    # Only pairs that can meet at all add pair hosts, and only as many as diagnose_instance allows
+    diagnosis = diagnose_instance(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    )
+    dead = {(u, v) for u, v in diagnosis["unsatisfiable_same_once_pairs"]}
+    degree: Dict[int, int] = {}
+    for (u, v) in same_once_pairs:
+        if (u, v) in dead:
+            continue
+        degree[u] = degree.get(u, 0) + 1
+        degree[v] = degree.get(v, 0) + 1
+    # A guest cannot visit the table of a host it must never sit with
+    banned_hosts: Dict[int, int] = {}
+    for (u, v) in never_together_pairs:
+        if u <= num_tables < v:
+            banned_hosts[v] = banned_hosts.get(v, 0) + 1
+    visits = sum(
+        min(num_rounds, num_tables - banned_hosts.get(p, 0))
+        for p in range(num_tables + 1, num_participants + 1)
+    )
+    # Pair meetings of p happen at p's own table, so at most one host per round;
+    # hosts never leave their table
+    pair_hosts = sum(
+        1 if p <= num_tables else min(d, num_rounds, num_tables)
+        for p, d in degree.items()
+    )
+    return diagnosis["max_satisfiable_same_once_pairs"], visits, pair_hosts
+
+
+def _never_together_clique(
+    num_tables: int, never_together_pairs: List[Tuple[int, int]]
+) -> List[int]:
+    # Greedy search for a large set of participants that must all sit apart. Hosts always
+    # sit apart, so they count as never-together with each other.
+    adjacent: Dict[int, Set[int]] = {h: set(range(1, num_tables + 1)) - {h} for h in range(1, num_tables + 1)}
+    for (u, v) in never_together_pairs:
+        adjacent.setdefault(u, set()).add(v)
+        adjacent.setdefault(v, set()).add(u)
+    best: List[int] = []
+    for start, neighbours in adjacent.items():
+        # A clique beating num_tables needs num_tables neighbours per member
+        if len(neighbours) < num_tables:
+            continue
+        clique = [start]
+        candidates = set(neighbours)
+        while candidates:
+            p = max(candidates, key=lambda q: (len(adjacent[q] & candidates), -q))
+            clique.append(p)
+            candidates &= adjacent[p]
+        if len(clique) > len(best):
+            best = clique
+    return sorted(best)
+
+
+def diagnose_instance(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> Dict[str, Any]:
+    """
+    Combinatorial pre-check that runs before any model is built.
+
+    Returns ``feasible`` (False only when a conflict proves that no valid
+    schedule exists), the ``conflicts`` found, the same-once pairs that can
+    never be met, and ``max_satisfiable_same_once_pairs``, an upper bound
+    on how many same-once pairs any schedule meets. Pairs must already be
+    normalized.
+    """
+    conflicts: List[Dict[str, Any]] = []
+    num_guests = num_participants - num_tables
+    sizes = compute_table_sizes(num_participants, num_tables)
+    smallest, largest = min(sizes), max(sizes)
+    guest_ids = range(num_tables + 1, num_participants + 1)
+
+    never_guests: Dict[int, int] = {}
+    banned_hosts: Dict[int, int] = {}
+    for (u, v) in never_together_pairs:
+        if u > num_tables:
+            never_guests[u] = never_guests.get(u, 0) + 1
+            never_guests[v] = never_guests.get(v, 0) + 1
+        else:
+            banned_hosts[v] = banned_hosts.get(v, 0) + 1
+
+    homeless = [g for g in guest_ids if banned_hosts.get(g, 0) >= num_tables]
+    if homeless:
+        conflicts.append({
+            "kind": "no_allowed_table",
+            "participants": homeless,
+            "detail": "these guests must never sit with any of the hosts",
+        })
+    clique = _never_together_clique(num_tables, never_together_pairs)
+    if len(clique) > num_tables and not homeless:
+        conflicts.append({
+            "kind": "never_together_clique",
+            "participants": clique,
+            "detail": f"{len(clique)} participants must all sit apart but there are only {num_tables} tables",
+        })
+
+    # Guests sharing a table after round 0 sat at different tables in round 0
+    if num_rounds > 1 and largest - 1 > num_tables:
+        conflicts.append({
+            "kind": "tables_too_large",
+            "participants": [],
+            "detail": (
+                f"tables seat up to {largest - 1} guests, but guests who share a table after the "
+                f"first round must come from different first-round tables and there are only {num_tables}"
+            ),
+        })
+    # Every round seats a guest with at least smallest - 2 other guests, all of them new
+    needed = num_rounds * (smallest - 2)
+    crowded = [g for g in guest_ids if needed > num_guests - 1 - never_guests.get(g, 0)]
+    if crowded:
+        conflicts.append({
+            "kind": "too_few_tablemates",
+            "participants": crowded,
+            "detail": (
+                f"each guest meets at least {needed} distinct guests over {num_rounds} rounds, "
+                "more than these guests are allowed to meet"
+            ),
+        })
+    # The same count over all guests: meetings per round are fixed by the table sizes
+    meetings = num_rounds * sum((size - 1) * (size - 2) // 2 for size in sizes)
+    available = num_guests * (num_guests - 1) // 2 - sum(never_guests.values()) // 2
+    if meetings > available and not crowded:
+        conflicts.append({
+            "kind": "too_many_meetings",
+            "participants": [],
+            "detail": f"the table sizes force {meetings} guest meetings but only {available} guest pairs may meet",
+        })
+
+    # Same-once pairs that can never meet, then how many each participant can meet at all
+    never = set(never_together_pairs)
+    unsatisfiable = [
+        [u, v] for (u, v) in same_once_pairs if v <= num_tables or (u, v) in never
+    ]
+    dead = {(u, v) for u, v in unsatisfiable}
+    degree: Dict[int, Tuple[int, int]] = {}  # participant -> (guest partners, host partners)
+    for (u, v) in same_once_pairs:
+        if (u, v) in dead:
+            continue
+        for p, q in ((u, v), (v, u)):
+            guests, hosts = degree.get(p, (0, 0))
+            degree[p] = (guests + 1, hosts) if q > num_tables else (guests, hosts + 1)
+    excess = 0
+    for p, (guests, hosts) in degree.items():
+        if p <= num_tables:
+            excess += max(0, guests - num_rounds * (largest - 1))
+        else:
+            excess += max(0, guests - num_rounds * (largest - 2)) + max(0, hosts - num_rounds)
+    # An unmet pair relieves at most both of its participants
+    max_satisfiable = len(same_once_pairs) - len(unsatisfiable) - (excess + 1) // 2
+
+    return {
+        "feasible": not conflicts,
+        "conflicts": conflicts,
+        "unsatisfiable_same_once_pairs": unsatisfiable,
+        "max_satisfiable_same_once_pairs": max_satisfiable,
+    }
+
+
+def _build_result(
+    assignments: List[List[List[int]]],
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    objective_value: int,
+    solver_status: str,
+    engine: str,
+    upper_bound: Optional[float] = None,
+    time_to_best: Optional[float] = None,
+) -> Dict[str, Any]:
+    # upper_bound: best known ceiling of the objective, reported as bound_gap for solved
+    # schedules; time_to_best: seconds until the returned schedule was found
+    # Compute per-round table sizes
+    table_sizes_per_round: List[List[int]] = []
+    for r in range(num_rounds):
+        table_sizes_per_round.append([len(assignments[r][t]) for t in range(num_tables)])
+
+    satisfied_same_once, unsatisfied_same_once, never_violations = _post_check(
+        assignments, same_once_pairs, never_together_pairs
+    )
+
+    return {
+        "participants": num_participants,
+        "tables": num_tables,
+        "rounds": num_rounds,
+        "table_sizes": compute_table_sizes(num_participants, num_tables),
+        "table_sizes_per_round": table_sizes_per_round,
+        "assignments": assignments,
+        "satisfied_same_once_pairs": satisfied_same_once,
+        "unsatisfied_same_once_pairs": unsatisfied_same_once,
+        "never_together_violations": never_violations,
+        "objective_value": objective_value,
+        "solver_status": solver_status,
+        "engine": engine,
+        "bound_gap": (
+            max(0, int(upper_bound) - objective_value)
+            if upper_bound is not None and solver_status in ("OPTIMAL", "FEASIBLE") else None
+        ),
+        "time_to_best": round(time_to_best, 3) if time_to_best is not None else None,
+    }
+
+
+def _diagnostics(phases: Dict[str, float], engine: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # phases: seconds per phase in order (precheck, construct, then build, symmetry_breaking,
+    #   hint, solve, extract, post_check for the full CP-SAT model, else one search phase).
+    # blocks: variables and constraints per model block (x, size, never_together, same_once,
+    #   guest_pair_uniqueness, host_diversity, symmetry_breaking); None without a full model.
+    # solver: wall/user/deterministic time, branches, conflicts, best bound and workers of the
+    #   CP-SAT solve; lexicographic mode sums its stages and lists them under "stages".
+    engine = engine or {}
+    return {
+        "phases": {**phases, **engine.get("phases", {})},
+        "blocks": engine.get("blocks"),
+        "solver": engine.get("solver"),
+    }
+
+
 def schedule(
     num_participants: int,
     num_tables: int,
@@ -16,236 +492,1071 @@ def schedule(
     same_once_pairs: List[Tuple[int, int]],
     never_together_pairs: List[Tuple[int, int]],
     time_limit_seconds: int = 60,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stop_event: Optional[Any] = None,
+    engine: str = "auto",
+    hint_assignments: Optional[List[List[List[int]]]] = None,
+    warm_start: bool = True,
+    lns_iteration_seconds: float = 1.0,
+    lookahead_rounds: int = 0,
+    symmetry_breaking: bool = True,
+    stop_at_bound: bool = True,
+    objective_mode: str = "weighted",
+    solver_params: Optional[Dict[str, Any]] = None,
+    diagnostics: bool = False,
 ) -> Dict[str, Any]:
+    # on_solution receives {assignments, objective_value, best_bound, elapsed_seconds} for
+    # each new incumbent.
+    # Setting stop_event (anything with Event.wait semantics) ends the search early; the best
+    # solution found so far is returned as usual.
+    # engine: "cpsat" always builds the CP-SAT model; "constructive" returns any valid
+    # closed-form schedule; "auto" takes the closed-form one only if it reaches
+    # objective_upper_bound(), and otherwise solves CP-SAT with it as the hint. Both fall
+    # back to CP-SAT when no valid construction exists.
+    # CP-SAT is warm-started from hint_assignments (e.g. a previous schedule in the output
+    # layout), else from a rejected construction, else from a greedy seating, unless
+    # warm_start is False.
+    # engine "lns" improves a starting seating (valid construction, hint_assignments or the
+    # greedy seating) by large-neighbourhood search with lns_iteration_seconds per step; its
+    # models stay small however large the event is.
+    # engine "rolling" solves one round at a time with the earlier rounds fixed, looking
+    # lookahead_rounds further ahead; the result adds round_solve_seconds and greedy_rounds,
+    # the rounds seated greedily after a stop.
+    # symmetry_breaking orders interchangeable guests and the rounds in the full CP-SAT model.
+    # Full CP-SAT results add model_size and build_seconds, the time spent building the model.
+    # With stop_at_bound, CP-SAT and LNS stop as soon as an incumbent reaches
+    # objective_upper_bound(); every result reports bound_gap and time_to_best.
+    # objective_mode "lexicographic" replaces the weighted CP-SAT solve by one stage per term
+    # (pairs met, hosts visited, pair hosts); the result adds objective_stages.
+    # solver_params sets CP-SAT parameters for every solve (see solver_params.py); unset ones
+    # come from the SOLVER_* environment variables, and the worker count from the CPUs available.
+    # diagnostics adds a "diagnostics" entry: seconds per phase, and for the full CP-SAT model
+    # the variables and constraints of each block and the solver statistics (see _diagnostics).
+    # Raises InfeasibleInstanceError, with the diagnosis of diagnose_instance(), when the
+    # pre-check proves that no valid schedule exists.
     # Indices: participants 1..a; tables 1..b; rounds 0..c-1
     assert num_participants >= num_tables > 0
     assert num_rounds > 0
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if objective_mode not in OBJECTIVE_MODES:
+        raise ValueError(
+            f"Unknown objective_mode {objective_mode!r}; expected one of {', '.join(OBJECTIVE_MODES)}"
+        )
+    solver_params = resolve_solver_params(solver_params)
+    phases: Dict[str, float] = {}
+    clock = time.perf_counter()
 
-    # Normalize pairs: ensure (min,max), remove duplicates and invalid
-    def _norm_pairs(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        seen = set()
-        out: List[Tuple[int, int]] = []
-        for u, v in pairs:
-            if u == v:
-                continue
-            if not (1 <= u <= num_participants and 1 <= v <= num_participants):
-                continue
-            a, b = (u, v) if u < v else (v, u)
-            key = (a, b)
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(key)
-        return out
+    def phase(name: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        phases[name] = round(now - clock, 4)
+        clock = now
+
+    def finish(result: Dict[str, Any], searched: bool = True) -> Dict[str, Any]:
+        engine_diagnostics = result.pop("diagnostics", None)
+        if engine_diagnostics is None and searched:
+            phase("search")
+        if diagnostics:
+            result["diagnostics"] = _diagnostics(phases, engine_diagnostics)
+        return result
+
+    same_once_pairs = normalize_pairs(same_once_pairs, num_participants)
+    never_together_pairs = normalize_pairs(never_together_pairs, num_participants)
+    diagnosis = diagnose_instance(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    )
+    if not diagnosis["feasible"]:
+        raise InfeasibleInstanceError(diagnosis)
+    bound = objective_upper_bound(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    )
+    phase("precheck")
+
+    construction = None
+    if engine != "cpsat":
+        started = time.perf_counter()
+        assignments = construct_assignments(
+            num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+        )
+        if assignments is not None and is_valid_schedule(
+            assignments, num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+        ):
+            objective_value = schedule_objective(assignments, num_tables, same_once_pairs)
+            result = _build_result(
+                assignments, num_participants, num_tables, num_rounds,
+                same_once_pairs, never_together_pairs,
+                objective_value, "OPTIMAL" if objective_value >= bound else "FEASIBLE", "constructive",
+                upper_bound=bound, time_to_best=time.perf_counter() - started,
+            )
+            # auto keeps a construction only when it reaches the ceiling; anything short of it
+            # goes on to CP-SAT as the hint, so auto is never worse than cpsat
+            if engine == "constructive" or result["solver_status"] == "OPTIMAL":
+                if on_solution is not None:
+                    on_solution({
+                        "assignments": assignments,
+                        "objective_value": objective_value,
+                        "best_bound": float(bound),
+                        "elapsed_seconds": time.perf_counter() - started,
+                    })
+                phase("construct")
+                return finish(result, searched=False)
+            construction = assignments
+
+    if engine == "lns":
+        start = construction
+        if start is None and hint_assignments is not None and _is_seating(
+            hint_assignments, num_participants, num_tables, num_rounds
+        ):
+            start = hint_assignments
+        phase("construct")
+        return finish(_schedule_lns(
+            num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs,
+            time_limit_seconds, on_solution, stop_event, start, lns_iteration_seconds,
+            bound, stop_at_bound, solver_params,
+        ))
+
+    if hint_assignments is None and warm_start:
+        hint_assignments = construction or greedy_assignments(
+            num_participants, num_tables, num_rounds,
+            compute_table_sizes(num_participants, num_tables),
+            same_once_pairs, never_together_pairs,
+        )
+    phase("construct")
+
+    if engine == "rolling":
+        return finish(_schedule_rolling(
+            num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs,
+            time_limit_seconds, on_solution, stop_event, hint_assignments, lookahead_rounds, bound,
+            solver_params,
+        ))
+
+    return finish(_schedule_cpsat(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs,
+        time_limit_seconds, on_solution, stop_event, hint_assignments, symmetry_breaking,
+        bound, stop_at_bound, objective_mode, solver_params,
+    ))
+
+
+def _schedule_cpsat(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    time_limit_seconds: int,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]],
+    stop_event: Optional[Any],
+    hint_assignments: Optional[List[List[List[int]]]] = None,
+    symmetry_breaking: bool = False,
+    upper_bound: Optional[int] = None,
+    stop_at_bound: bool = False,
+    objective_mode: str = "weighted",
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # Pairs are already normalized here. The result carries a "diagnostics" entry with the
+    # phase timings, the size of each model block and the solver statistics.
+    phases: Dict[str, float] = {}
+    clock = time.perf_counter()
+
+    def phase(name: str) -> None:
+        nonlocal clock
+        now = time.perf_counter()
+        phases[name] = round(now - clock, 4)
+        clock = now
+
+    rounds = list(range(num_rounds))
+    built = _build_model(
+        num_participants, num_tables, rounds, same_once_pairs, never_together_pairs,
+        skeletons=get_skeleton_cache(),
+    )
+    phase("build")
+    if symmetry_breaking:
+        classes = guest_classes(num_participants, num_tables, same_once_pairs, never_together_pairs)
+        add_symmetry_breaking(built.model, built.x, num_tables, num_rounds, classes)
+        built.blocks.mark("symmetry_breaking")
+        if hint_assignments is not None and _is_seating(
+            hint_assignments, num_participants, num_tables, num_rounds
+        ):
+            hint_assignments = canonical_assignments(hint_assignments, classes)
+        phase("symmetry_breaking")
+    if hint_assignments is not None:
+        _add_assignment_hint(built, hint_assignments)
+        phase("hint")
+    model_size = built.size()
+    build_seconds = round(sum(phases.values()), 3)
+    blocks = {name: dict(counts) for name, counts in built.blocks.counts.items()}
 
-    same_once_pairs = _norm_pairs(same_once_pairs)
-    never_together_pairs = _norm_pairs(never_together_pairs)
+    def extract(solution: Sequence[int]) -> List[List[List[int]]]:
+        return _extract_assignments(solution, built)
 
-    # Pre-calc table sizes and host ids
-    table_sizes = compute_table_sizes(num_participants, num_tables)
-    host_ids = list(range(1, num_tables + 1))
+    if objective_mode == "lexicographic":
+        result = _schedule_lexicographic(
+            built, extract, num_participants, num_tables, num_rounds,
+            same_once_pairs, never_together_pairs, time_limit_seconds, on_solution, stop_event,
+            upper_bound, stop_at_bound, solver_params,
+        )
+        phase("solve")
+        result["build_seconds"] = build_seconds
+        result["diagnostics"] = {"phases": phases, "blocks": blocks, "solver": result.pop("solver_stats")}
+        return result
+
+    solver, status, time_to_best = _solve(
+        built.model, extract, time_limit_seconds, on_solution, stop_event,
+        stop_at=upper_bound if stop_at_bound else None, params=solver_params,
+    )
+    phase("solve")
+    assignments = extract(solver.ResponseProto().solution)
+    phase("extract")
 
-    model = cp_model.CpModel()
+    status_str = (
+        solver.StatusName(status) if hasattr(solver, "StatusName") else str(status)
+    )
+    objective_value = (
+        int(solver.ObjectiveValue())
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        else 0
+    )
+    if status == cp_model.FEASIBLE and upper_bound is not None and objective_value >= upper_bound:
+        status_str = "OPTIMAL"  # stopped at the analytic ceiling, so nothing better exists
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        upper_bound = min(solver.BestObjectiveBound(), upper_bound if upper_bound is not None else float("inf"))
 
-    # Decision vars: x[p][t][r] in {0,1}
-    x = {}
-    for p in range(1, num_participants + 1):
-        for t in range(1, num_tables + 1):
-            for r in range(num_rounds):
-                x[(p, t, r)] = model.NewBoolVar(f"x_p{p}_t{t}_r{r}")
+    result = _build_result(
+        assignments, num_participants, num_tables, num_rounds,
+        same_once_pairs, never_together_pairs, objective_value, status_str, "cpsat",
+        upper_bound=upper_bound, time_to_best=time_to_best,
+    )
+    phase("post_check")
+    result["model_size"] = model_size
+    result["build_seconds"] = build_seconds
+    result["diagnostics"] = {"phases": phases, "blocks": blocks, "solver": _solver_stats(solver, status)}
+    return result
 
-    # One table per participant per round
-    for p in range(1, num_participants + 1):
-        for r in range(num_rounds):
-            model.Add(sum(x[(p, t, r)] for t in range(1, num_tables + 1)) == 1)
+
+def _schedule_lexicographic(
+    built: "_ScheduleModel",
+    extract: Callable[[Sequence[int]], List[List[List[int]]]],
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    time_limit_seconds: int,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]],
+    stop_event: Optional[Any],
+    upper_bound: Optional[int],
+    stop_at_bound: bool,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # One solve per objective term, best first. Each stage fixes the value the previous one
+    # reached and starts from its schedule. Stages whose term is a constant are skipped; the
+    # time left is split between the stages still to run by _STAGE_SHARES.
+    model_size = built.size()  # before the stages add their constraints
+    ceilings = _objective_ceilings(
+        num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    )
+    stages = [
+        (name, term, ceiling, share)
+        for name, term, ceiling, share in zip(_OBJECTIVE_TERMS, built.objective_terms, ceilings, _STAGE_SHARES)
+        if not isinstance(term, int)
+    ]
+
+    def report(update: Dict[str, Any]) -> None:
+        # Report the weighted objective so updates compare across modes
+        on_solution({
+            **update,
+            "objective_value": schedule_objective(update["assignments"], num_tables, same_once_pairs),
+            "best_bound": float(upper_bound) if upper_bound is not None else update["best_bound"],
+            "elapsed_seconds": elapsed + update["elapsed_seconds"],
+        })
+
+    started = time.perf_counter()
+    elapsed = 0.0
+    assignments: Optional[List[List[List[int]]]] = None
+    time_to_best: Optional[float] = None
+    status_str = "UNKNOWN"
+    stage_reports: List[Dict[str, Any]] = []
+    stage_stats: List[Dict[str, Any]] = []
+    for k, (name, term, ceiling, share) in enumerate(stages):
+        remaining = time_limit_seconds - (time.perf_counter() - started)
+        if assignments is not None and (remaining <= 0 or (stop_event is not None and stop_event.is_set())):
+            break
+        built.model.Maximize(term)
+        solver, status, stage_best = _solve(
+            built.model, extract, max(remaining, 0.0) * share / sum(stage[3] for stage in stages[k:]),
+            report if on_solution is not None else None, stop_event,
+            stop_at=ceiling if stop_at_bound else None, params=solver_params,
+        )
+        stage_stats.append({"term": name, **_solver_stats(solver, status)})
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if assignments is None:
+                status_str = solver.StatusName(status)
+            break
+        value = int(solver.ObjectiveValue())
+        stage_status = "OPTIMAL" if status == cp_model.OPTIMAL or value >= ceiling else "FEASIBLE"
+        stage_reports.append({
+            "term": name, "value": value, "ceiling": ceiling,
+            "status": stage_status, "seconds": round(solver.WallTime(), 3),
+        })
+        if stage_best is not None:
+            time_to_best = elapsed + stage_best
+        elapsed += solver.WallTime()
+        solution = solver.ResponseProto().solution
+        assignments = extract(solution)
+        status_str = "OPTIMAL" if all(r["status"] == "OPTIMAL" for r in stage_reports) else "FEASIBLE"
+        # Later stages may not give up what this one reached, and start from its schedule
+        built.model.Add(term >= value)
+        built.model.ClearHints()
+        for var, value in zip(built.x.vars, built.x.values(solution)):
+            built.model.AddHint(var, int(value))
+
+    if assignments is None:
+        assignments = [[[] for _ in range(num_tables)] for _ in range(num_rounds)]
+        objective_value = 0
+    else:
+        objective_value = schedule_objective(assignments, num_tables, same_once_pairs)
+    result = _build_result(
+        assignments, num_participants, num_tables, num_rounds,
+        same_once_pairs, never_together_pairs, objective_value, status_str, "cpsat",
+        upper_bound=upper_bound, time_to_best=time_to_best,
+    )
+    # The analytic ceiling is that of the weighted objective, which a lexicographically optimal
+    # schedule need not reach; the stages report their own ceilings and statuses instead
+    result["bound_gap"] = None
+    result["objective_stages"] = stage_reports
+    result["model_size"] = model_size
+    # Counters summed over the stages; each stage has a bound of its own term only
+    result["solver_stats"] = {
+        **{key: round(sum(stats[key] for stats in stage_stats), 4)
+           for key in ("wall_time", "user_time", "deterministic_time", "branches", "conflicts")},
+        "best_bound": None,
+        "num_workers": stage_stats[0]["num_workers"] if stage_stats else None,
+        "stages": stage_stats,
+    }
+    return result
+
+
+def _schedule_rolling(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    time_limit_seconds: int,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]],
+    stop_event: Optional[Any],
+    hint_assignments: Optional[List[List[List[int]]]],
+    lookahead_rounds: int,
+    upper_bound: int,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # Round r is decided by a model over rounds r..r+lookahead_rounds with rounds 0..r-1 as
+    # history; only round r of its solution is kept. Each model covers at most
+    # 1 + lookahead_rounds rounds, so the total work grows about linearly with num_rounds.
+    # The time left is shared evenly between the rounds still to solve.
+    # When a round gets no seating (stopped, out of time, or boxed in by the earlier rounds),
+    # the rounds solved so far are kept and the rest are seated greedily around them; the
+    # result lists those rounds in greedy_rounds.
+    assert lookahead_rounds >= 0
+    started = time.perf_counter()
+    assignments: List[List[List[int]]] = []
+    seats: List[Dict[int, int]] = []
+    round_solve_seconds: List[float] = []
+    status_str = "FEASIBLE"
+    for r in range(num_rounds):
+        round_started = time.perf_counter()
+        horizon = min(num_rounds, r + 1 + lookahead_rounds)
+        while True:
+            built = _build_model(
+                num_participants, num_tables, list(range(r, horizon)),
+                same_once_pairs, never_together_pairs, history=seats,
+            )
+            if hint_assignments is not None:
+                _add_assignment_hint(built, hint_assignments)
+            remaining = time_limit_seconds - (time.perf_counter() - started)
+            solver, status, _ = _solve(
+                built.model, lambda value: [], max(0.1, remaining / (num_rounds - r)), None, stop_event,
+                params=solver_params,
+            )
+            # No seating found with lookahead: settle for this round on its own
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) or horizon == r + 1:
+                break
+            horizon = r + 1
+        round_solve_seconds.append(time.perf_counter() - round_started)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+        round_tables = _extract_assignments(solver.ResponseProto().solution, built)[0]
+        assignments.append(round_tables)
+        seats.append({p: t for t, table in enumerate(round_tables, start=1) for p in table})
+        if on_solution is not None:
+            on_solution({
+                "assignments": assignments,
+                "objective_value": schedule_objective(assignments, num_tables, same_once_pairs),
+                "best_bound": float(solver.BestObjectiveBound()),
+                "elapsed_seconds": time.perf_counter() - started,
+            })
+
+    greedy_rounds = list(range(len(assignments), num_rounds))
+    if greedy_rounds:
+        assignments = greedy_assignments(
+            num_participants, num_tables, num_rounds,
+            compute_table_sizes(num_participants, num_tables),
+            same_once_pairs, never_together_pairs, history=assignments,
+        )
+    objective_value = schedule_objective(assignments, num_tables, same_once_pairs)
+    if not is_valid_schedule(
+        assignments, num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    ):
+        status_str = "UNKNOWN"  # the greedy rounds left conflicts
+    elif objective_value >= upper_bound:
+        status_str = "OPTIMAL"
+    result = _build_result(
+        assignments, num_participants, num_tables, num_rounds,
+        same_once_pairs, never_together_pairs, objective_value, status_str, "rolling",
+        upper_bound=upper_bound, time_to_best=time.perf_counter() - started,
+    )
+    result["round_solve_seconds"] = round_solve_seconds
+    result["greedy_rounds"] = greedy_rounds
+    return result
+
+
+def _is_seating(
+    assignments: List[List[List[int]]], num_participants: int, num_tables: int, num_rounds: int
+) -> bool:
+    # Complete balanced seating with hosts at home; pair constraints are not checked
+    if len(assignments) != num_rounds:
+        return False
+    everyone = list(range(1, num_participants + 1))
+    for round_tables in assignments:
+        if len(round_tables) != num_tables:
+            return False
+        if sorted(p for table in round_tables for p in table) != everyone:
+            return False
+        if any(h not in table for h, table in enumerate(round_tables, start=1)):
+            return False
+        sizes = [len(table) for table in round_tables]
+        if max(sizes) - min(sizes) > 1:
+            return False
+    return True
+
+
+def _schedule_lns(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    time_limit_seconds: int,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]],
+    stop_event: Optional[Any],
+    start: Optional[List[List[List[int]]]],
+    iteration_seconds: float,
+    bound: int,
+    stop_at_bound: bool,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # lns builds on this module, so it is imported on first use
+    try:
+        from .lns import improve_schedule
+    except ImportError:
+        from lns import improve_schedule
+
+    if start is None:
+        start = greedy_assignments(
+            num_participants, num_tables, num_rounds,
+            compute_table_sizes(num_participants, num_tables),
+            same_once_pairs, never_together_pairs,
+        )
+    improved_at = [0.0]
+
+    def report(assignments: List[List[List[int]]], elapsed: float) -> None:
+        improved_at[0] = elapsed
+        if on_solution is not None:
+            on_solution({
+                "assignments": assignments,
+                "objective_value": schedule_objective(assignments, num_tables, same_once_pairs),
+                "best_bound": float(bound),
+                "elapsed_seconds": elapsed,
+            })
+
+    assignments = improve_schedule(
+        start, num_tables, same_once_pairs, never_together_pairs, time_limit_seconds,
+        iteration_seconds=iteration_seconds,
+        on_improvement=report,
+        stop_event=stop_event,
+        stop_at=bound if stop_at_bound else None,
+        solver_params=solver_params,
+    )
+    objective_value = schedule_objective(assignments, num_tables, same_once_pairs)
+    if not is_valid_schedule(
+        assignments, num_participants, num_tables, num_rounds, same_once_pairs, never_together_pairs
+    ):
+        status = "UNKNOWN"  # conflicts left that the search could not remove in time
+    else:
+        status = "OPTIMAL" if objective_value >= bound else "FEASIBLE"
+    return _build_result(
+        assignments, num_participants, num_tables, num_rounds,
+        same_once_pairs, never_together_pairs, objective_value, status, "lns",
+        upper_bound=bound, time_to_best=improved_at[0],
+    )
+
+
+class _Seats:
+    """
+    Seating layer x[(p, t, r)] of the model: a BoolVar for guests, a constant for hosts.
+
+    Host h always sits at table h, so its entries are plain 0/1 and every
+    expression built from them stays linear in the guest variables alone.
+    The guest BoolVars live in one flat list in (guest, table, round) order,
+    created before anything else in the model, so they also occupy one run
+    of the solution vector; ``index`` holds their variable indices as a
+    (guests, tables, rounds) array. With ``first_index`` the variables
+    already exist in ``model`` (a cloned skeleton) from that index on.
+    """
+
+    def __init__(self, model: cp_model.CpModel, num_participants: int, num_tables: int,
+                 rounds: List[int], first_index: Optional[int] = None):
+        self.num_participants = num_participants
+        self.num_tables = num_tables
+        self.rounds = rounds
+        self._round_pos = {r: k for k, r in enumerate(rounds)}
+        guests = range(num_tables + 1, num_participants + 1)
+        if first_index is None:
+            self.vars: List[Any] = [
+                model.NewBoolVar(f"x_p{p}_t{t}_r{r}")
+                for p in guests for t in range(1, num_tables + 1) for r in rounds
+            ]
+        else:
+            count = len(guests) * num_tables * len(rounds)
+            self.vars = [model.GetBoolVarFromProtoIndex(first_index + k) for k in range(count)]
+        self.index = np.array([var.Index() for var in self.vars], dtype=np.int64).reshape(
+            len(guests), num_tables, len(rounds)
+        )
+
+    def position(self, p: int, t: int, r: int) -> int:
+        """Offset of guest p's seat at table t in round r within ``vars``"""
+        return ((p - self.num_tables - 1) * self.num_tables + t - 1) * len(self.rounds) + self._round_pos[r]
+
+    def __getitem__(self, key: Tuple[int, int, int]) -> Any:
+        p, t, r = key
+        if p <= self.num_tables:
+            return 1 if p == t else 0
+        return self.vars[self.position(p, t, r)]
+
+    def __contains__(self, key: Tuple[int, int, int]) -> bool:
+        p, t, r = key
+        return 1 <= p <= self.num_participants and 1 <= t <= self.num_tables and r in self._round_pos
+
+    def values(self, solution: Sequence[int]) -> Optional[np.ndarray]:
+        """Values of ``vars`` read in one pass over the solution vector; None without a solution"""
+        if not self.vars:
+            return np.zeros(0, dtype=np.int8)
+        first = int(self.index.flat[0])
+        if len(solution) < first + len(self.vars):
+            return None
+        # The binding has no buffer view, so copy only the run that holds the seats
+        run = itertools.islice(iter(solution), first, first + len(self.vars))
+        return np.fromiter(run, dtype=np.int8, count=len(self.vars))
+
+    def tables(self, solution: Sequence[int]) -> Optional[np.ndarray]:
+        """(rounds, participants + 1) matrix of table indices, 0 where nobody or nobody seated"""
+        values = self.values(solution)
+        if values is None:
+            return None
+        seated = values.reshape(self.index.shape)
+        matrix = np.zeros((len(self.rounds), self.num_participants + 1), dtype=np.int32)
+        matrix[:, 1:self.num_tables + 1] = np.arange(1, self.num_tables + 1)
+        guest_tables = np.where(seated.any(axis=1), seated.argmax(axis=1) + 1, 0)
+        matrix[:, self.num_tables + 1:] = guest_tables.T
+        return matrix
+
+
+def _and(model: cp_model.CpModel, a: Any, b: Any, name: str) -> Any:
+    # a AND b over seats; constants fold away and only two variables need an indicator
+    if isinstance(a, int) or isinstance(b, int):
+        const, other = (a, b) if isinstance(a, int) else (b, a)
+        return other if const else 0
+    both = model.NewBoolVar(name)
+    # both <= a; both <= b; both >= a + b - 1
+    model.Add(both <= a)
+    model.Add(both <= b)
+    model.Add(both >= a + b - 1)
+    return both
+
+
+def _or(model: cp_model.CpModel, terms: List[Any], name: str) -> Any:
+    # OR of seat indicators; no variable is needed for none or one of them
+    terms = [term for term in terms if not isinstance(term, int) or term]
+    if any(isinstance(term, int) for term in terms):
+        return 1
+    if len(terms) <= 1:
+        return terms[0] if terms else 0
+    either = model.NewBoolVar(name)
+    model.AddMaxEquality(either, terms)
+    return either
+
+
+class _BlockCounts:
+    """Variables and constraints added by each block of a model, counted as the blocks are built"""
+
+    def __init__(self, model: cp_model.CpModel):
+        self.model = model
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._seen = self._totals()
+
+    def _totals(self) -> Tuple[int, int]:
+        proto = self.model.Proto()
+        return len(proto.variables), len(proto.constraints)
+
+    def mark(self, block: str) -> None:
+        """Charge everything added since the previous mark to ``block``"""
+        variables, constraints = self._totals()
+        counts = self.counts.setdefault(block, {"variables": 0, "constraints": 0})
+        counts["variables"] += variables - self._seen[0]
+        counts["constraints"] += constraints - self._seen[1]
+        self._seen = (variables, constraints)
+
+
+class _ScheduleModel:
+    """CP-SAT model of the free rounds of a schedule plus the handles needed to read it back"""
+
+    def __init__(self, model: cp_model.CpModel, x: "_Seats",
+                 num_participants: int, num_tables: int, rounds: List[int],
+                 objective_terms: Optional[List[Any]] = None,
+                 blocks: Optional[_BlockCounts] = None):
+        self.model = model
+        self.x = x
+        self.num_participants = num_participants
+        self.num_tables = num_tables
+        self.rounds = rounds
+        # Unweighted pairs met, hosts visited and pair hosts, history included
+        self.objective_terms = objective_terms or []
+        self.blocks = blocks or _BlockCounts(model)
+
+    def size(self) -> Dict[str, int]:
+        """Variables and constraints in the model, and the host seats folded into constants"""
+        proto = self.model.Proto()
+        return {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "constant_host_seats": self.num_tables * self.num_tables * len(self.rounds),
+        }
+
+
+_skeletons: Optional[SkeletonCache] = None
+
+
+def get_skeleton_cache() -> Optional[SkeletonCache]:
+    """
+    Return this process's skeleton cache, configured from the environment on first use.
+
+    ``SKELETON_CACHE_SIZE`` skeletons are kept in memory (default 4) and
+    ``SKELETON_CACHE_DIR`` adds a directory of skeleton files; None when
+    both are off.
+    """
+    global _skeletons
+    if _skeletons is None:
+        size, directory = int(os.getenv("SKELETON_CACHE_SIZE", "4")), os.getenv("SKELETON_CACHE_DIR") or None
+        if size <= 0 and directory is None:
+            return None
+        _skeletons = SkeletonCache(max_entries=size, directory=directory)
+    return _skeletons
+
+
+def _build_skeleton(
+    model: cp_model.CpModel,
+    blocks: _BlockCounts,
+    num_participants: int,
+    num_tables: int,
+    rounds: List[int],
+    history: List[Dict[int, int]],
+    absent: Set[Tuple[int, int]],
+) -> Tuple[_Seats, Dict[Tuple[int, int], Any], int]:
+    # The blocks that do not depend on the pairs: seats, table sizes, guest pair uniqueness
+    # and the host visit indicators. Returns the seats, the visit indicators and the number
+    # of host visits already made in the history.
+    tables = range(1, num_tables + 1)
+    participants = range(1, num_participants + 1)
+    guest_ids = range(num_tables + 1, num_participants + 1)
+
+    # Decision vars: x[p][t][r] in {0,1}; hosts sit at their own table, so theirs are constants
+    x = _Seats(model, num_participants, num_tables, rounds)
+
+    # One table per guest per round (none if absent)
+    for p in guest_ids:
+        for r in rounds:
+            model.Add(sum(x[(p, t, r)] for t in tables) == (0 if (p, r) in absent else 1))
+    blocks.mark("x")
 
     # No fixed per-table capacities: allow variable table sizes per round
     # But keep per-round balance: max size - min size <= 1
     size = {}
     min_size = {}
     max_size = {}
-    for r in range(num_rounds):
+    for r in rounds:
         min_size[r] = model.NewIntVar(0, num_participants, f"min_size_r{r}")
         max_size[r] = model.NewIntVar(0, num_participants, f"max_size_r{r}")
-        for t in range(1, num_tables + 1):
+        for t in tables:
             cnt = model.NewIntVar(0, num_participants, f"size_t{t}_r{r}")
             size[(t, r)] = cnt
-            model.Add(cnt == sum(x[(p, t, r)] for p in range(1, num_participants + 1)))
+            model.Add(cnt == sum(x[(p, t, r)] for p in participants))
             model.Add(cnt >= min_size[r])
             model.Add(cnt <= max_size[r])
         # Constrain spread
         model.Add(max_size[r] - min_size[r] <= 1)
+    blocks.mark("size")
+
+    # Global pairwise uniqueness for non-host pairs only: guests should not sit together twice.
+    # Two guests meet twice exactly when they make the same table-to-table move between two
+    # rounds, so at most one guest may take each move (t1, r1) -> (t2, r2). This needs
+    # O(G * T^2 * R^2) indicators instead of one per guest pair, table and round.
+    # The loop addresses the flat seat list directly; negations are made once per seat.
+    negated = [var.Not() for var in x.vars] if len(rounds) > 1 else []
+    for i1, r1 in enumerate(rounds):
+        for r2 in rounds[i1 + 1:]:
+            for t1 in tables:
+                for t2 in tables:
+                    moves = []
+                    for p in guest_ids:
+                        y = model.NewBoolVar(f"move_p{p}_t{t1}_r{r1}_t{t2}_r{r2}")
+                        # x[p,t1,r1] and x[p,t2,r2] imply y
+                        model.AddBoolOr([
+                            negated[x.position(p, t1, r1)], negated[x.position(p, t2, r2)], y,
+                        ])
+                        moves.append(y)
+                    model.AddAtMostOne(moves)
+    # A fixed round seats its guests as constants, so a move from it needs no indicator
+    for seat in history:
+        groups: Dict[int, List[int]] = {}
+        for p, t in seat.items():
+            if p > num_tables and p <= num_participants:
+                groups.setdefault(t, []).append(p)
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            for r in rounds:
+                for t in tables:
+                    model.AddAtMostOne([x[(p, t, r)] for p in group])
+    blocks.mark("guest_pair_uniqueness")
+
+    # Host diversity preference: encourage guests to visit different hosts across rounds
+    visited_any = {}
+    visits_offset = 0
+    visited_before = {(p, t) for seat in history for p, t in seat.items()}
+    for p in guest_ids:
+        for h in tables:
+            if (p, h) in visited_before:
+                visits_offset += 1
+                continue
+            if not rounds:
+                continue
+            vph = model.NewBoolVar(f"visited_p{p}_h{h}")
+            visited_any[(p, h)] = vph
+            model.AddMaxEquality(vph, [x[(p, h, r)] for r in rounds])
+    blocks.mark("host_diversity")
+    return x, visited_any, visits_offset
+
+
+def _skeleton_key(num_participants: int, num_tables: int, rounds: List[int]) -> Optional[Tuple[int, ...]]:
+    # Skeletons are cached for whole schedules only (rounds 0..n-1, nothing fixed)
+    if rounds != list(range(len(rounds))):
+        return None
+    return (_SKELETON_FORMAT, num_participants, num_tables, len(rounds))
+
+
+def _build_model(
+    num_participants: int,
+    num_tables: int,
+    rounds: List[int],
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    history: Optional[List[Dict[int, int]]] = None,
+    absent: Optional[Set[Tuple[int, int]]] = None,
+    keep: Optional[Dict[Tuple[int, int], int]] = None,
+    skeletons: Optional[SkeletonCache] = None,
+) -> _ScheduleModel:
+    # rounds: indices of the rounds to decide (x vars exist only for these).
+    # history: participant -> table seats of rounds that are already fixed; their meetings and
+    #   host visits carry into the constraints and the objective as constants.
+    # absent: (p, r) pairs of participants not seated in free round r.
+    # keep: (p, r) -> table placements rewarded with KEEP_WEIGHT each (minimal-change repairs).
+    # skeletons: cache of the pair-independent blocks, used when nothing is fixed or absent;
+    #   a hit clones the cached model and only the pair blocks and the objective are added.
+    history = history or []
+    absent = absent or set()
+    tables = range(1, num_tables + 1)
+    participants = range(1, num_participants + 1)
 
-    # Hosts fixed: participant h sits at table h every round
-    for h in host_ids:
-        for r in range(num_rounds):
-            for t in range(1, num_tables + 1):
-                if t == h:
-                    model.Add(x[(h, t, r)] == 1)
-                else:
-                    model.Add(x[(h, t, r)] == 0)
+    key = None if skeletons is None or history or absent else _skeleton_key(
+        num_participants, num_tables, rounds
+    )
+    cached = skeletons.get(key) if key is not None else None
+    if cached is not None:
+        model, meta = cached
+        blocks = _BlockCounts(model)
+        blocks.counts = {name: dict(counts) for name, counts in meta["blocks"].items()}
+        x = _Seats(model, num_participants, num_tables, rounds, first_index=0)
+        first_visit = meta["first_visit"]
+        guests = range(num_tables + 1, num_participants + 1)
+        visited_any = {
+            (p, h): model.GetBoolVarFromProtoIndex(first_visit + k)
+            for k, (p, h) in enumerate(itertools.product(guests, tables))
+        } if rounds else {}
+        visits_offset = 0
+    else:
+        model = cp_model.CpModel()
+        blocks = _BlockCounts(model)
+        x, visited_any, visits_offset = _build_skeleton(
+            model, blocks, num_participants, num_tables, rounds, history, absent
+        )
+        if key is not None:
+            first_visit = min((var.Index() for var in visited_any.values()), default=0)
+            counts = {name: dict(counts) for name, counts in blocks.counts.items()}
+            skeletons.put(key, model, {"blocks": counts, "first_visit": first_visit})
+    # Terms already decided by the history: pairs met, pair hosts
+    pairs_offset = pair_hosts_offset = 0
 
-    # Never together: for each r,t, x[u,t,r] + x[v,t,r] <= 1
+    # Never together: for each r,t, x[u,t,r] + x[v,t,r] <= 1. Two hosts never meet anyway;
+    # a host u only rules out its own table for guest v
     for (u, v) in never_together_pairs:
-        for r in range(num_rounds):
-            for t in range(1, num_tables + 1):
+        if v <= num_tables:
+            continue
+        for r in rounds:
+            if u <= num_tables:
+                model.Add(x[(v, u, r)] == 0)
+                continue
+            for t in tables:
                 model.Add(x[(u, t, r)] + x[(v, t, r)] <= 1)
+    blocks.mark("never_together")
 
     # Same-once linearization variables and objective parts
     z = {}  # z[i,t,r] indicates pair i shares table t in round r
     meet = {}  # meet[i,r] = OR_t z[i,t,r]
     meet_host = {}  # meet_host[i,h] = OR_r z[i,h,r]
+    met_at: Dict[int, Set[int]] = {}  # tables where pair i already met in history
     for i, (u, v) in enumerate(same_once_pairs):
-        for r in range(num_rounds):
-            meet_var = model.NewBoolVar(f"meet_i{i}_r{r}")
-            meet[(i, r)] = meet_var
-            z_vars = []
-            for t in range(1, num_tables + 1):
-                z_var = model.NewBoolVar(f"z_i{i}_t{t}_r{r}")
-                z[(i, t, r)] = z_var
-                # z <= x[u,t,r]; z <= x[v,t,r]; z >= x[u,t,r] + x[v,t,r] - 1
-                model.Add(z_var <= x[(u, t, r)])
-                model.Add(z_var <= x[(v, t, r)])
-                model.Add(z_var >= x[(u, t, r)] + x[(v, t, r)] - 1)
-                z_vars.append(z_var)
-            # meet == OR(z_vars)
-            model.AddMaxEquality(meet_var, z_vars)
+        history_meetings = [seat[u] for seat in history if u in seat and seat.get(u) == seat.get(v)]
+        met_at[i] = set(history_meetings)
+        if len(history_meetings) == 1:
+            pairs_offset += 1
+        for r in rounds:
+            # A pair with a host can only meet at the host's table: z is that guest's seat there
+            for t in tables:
+                z[(i, t, r)] = _and(model, x[(u, t, r)], x[(v, t, r)], f"z_i{i}_t{t}_r{r}")
+            meet[(i, r)] = _or(model, [z[(i, t, r)] for t in tables], f"meet_i{i}_r{r}")
         # meet_host over hosts
-        for h in range(1, num_tables + 1):
-            mh = model.NewBoolVar(f"meet_host_i{i}_h{h}")
-            meet_host[(i, h)] = mh
-            model.AddMaxEquality(mh, [z[(i, h, r)] for r in range(num_rounds)])
-        # At most once across all rounds
-        model.Add(sum(meet[(i, r)] for r in range(num_rounds)) <= 1)
-
-    # Global pairwise uniqueness for non-host pairs only: guests should not sit together twice
-    for u in range(num_tables + 1, num_participants + 1):
-        for v in range(u + 1, num_participants + 1):
-            meet_uv_round = []
-            for r in range(num_rounds):
-                z_vars = []
-                for t in range(1, num_tables + 1):
-                    z_var = model.NewBoolVar(f"pair_u{u}_v{v}_t{t}_r{r}")
-                    model.Add(z_var <= x[(u, t, r)])
-                    model.Add(z_var <= x[(v, t, r)])
-                    model.Add(z_var >= x[(u, t, r)] + x[(v, t, r)] - 1)
-                    z_vars.append(z_var)
-                meet_r = model.NewBoolVar(f"meet_u{u}_v{v}_r{r}")
-                model.AddMaxEquality(meet_r, z_vars)
-                meet_uv_round.append(meet_r)
-            # At most one round where they meet
-            model.Add(sum(meet_uv_round) <= 1)
-
-    # Host diversity preference: encourage guests to visit different hosts across rounds
-    visited_any = {}
-    for p in range(num_tables + 1, num_participants + 1):
-        for h in range(1, num_tables + 1):
-            vph = model.NewBoolVar(f"visited_p{p}_h{h}")
-            visited_any[(p, h)] = vph
-            model.AddMaxEquality(vph, [x[(p, h, r)] for r in range(num_rounds)])
+        for h in tables:
+            if h in met_at[i] or not rounds:
+                continue
+            mh = _or(model, [z[(i, h, r)] for r in rounds], f"meet_host_i{i}_h{h}")
+            if not isinstance(mh, int):
+                meet_host[(i, h)] = mh
+        # At most once across all rounds, counting history
+        meetings = [meet[(i, r)] for r in rounds if not isinstance(meet[(i, r)], int)]
+        if meetings:
+            model.Add(sum(meetings) <= max(0, 1 - len(history_meetings)))
+    blocks.mark("same_once")
 
     # Distinct-host preference for pair meetings per participant
-    pairs_by_participant: Dict[int, List[int]] = {p: [] for p in range(1, num_participants + 1)}
+    pairs_by_participant: Dict[int, List[int]] = {p: [] for p in participants}
     for i, (u, v) in enumerate(same_once_pairs):
         pairs_by_participant[u].append(i)
         pairs_by_participant[v].append(i)
 
     distinct_pair_host = {}
-    for p in range(1, num_participants + 1):
+    for p in participants:
         idxs = pairs_by_participant[p]
         if not idxs:
             continue
-        for h in range(1, num_tables + 1):
+        for h in tables:
+            if any(h in met_at[i] for i in idxs):
+                pair_hosts_offset += 1
+                continue
             var_list = [meet_host[(i, h)] for i in idxs if (i, h) in meet_host]
             if not var_list:
                 continue
             y = model.NewBoolVar(f"pair_host_used_p{p}_h{h}")
             distinct_pair_host[(p, h)] = y
             model.AddMaxEquality(y, var_list)
+    blocks.mark("host_diversity")
 
     # Objective: weighted sum (prioritize same-once satisfaction, then host diversity)
-    alpha = 1000
-    beta = 1
-    gamma = 5
+    pairs_met = sum(meet[(i, r)] for i in range(len(same_once_pairs)) for r in rounds) + pairs_offset
+    visits = sum(visited_any.values()) + visits_offset
+    pair_hosts = sum(distinct_pair_host.values()) + pair_hosts_offset
     model.Maximize(
-        alpha * sum(
-            meet[(i, r)] for i in range(len(same_once_pairs)) for r in range(num_rounds)
-        )
-        + beta * sum(
-            visited_any[(p, h)]
-            for p in range(num_tables + 1, num_participants + 1)
-            for h in range(1, num_tables + 1)
-        )
-        + gamma * sum(distinct_pair_host[(p, h)] for (p, h) in distinct_pair_host)
+        ALPHA * pairs_met
+        + BETA * visits
+        + GAMMA * pair_hosts
+        + KEEP_WEIGHT * sum(x[(p, t, r)] for (p, r), t in (keep or {}).items() if (p, t, r) in x)
     )
 
+    return _ScheduleModel(
+        model, x, num_participants, num_tables, rounds, [pairs_met, visits, pair_hosts], blocks
+    )
+
+
+def _extract_assignments(solution: Sequence[int], built: _ScheduleModel) -> List[List[List[int]]]:
+    # solution is a response's solution vector; one entry per free round, empty tables
+    # when the response holds no solution
+    matrix = built.x.tables(solution)
+    if matrix is None:
+        return [[[] for _ in range(built.num_tables)] for _ in built.rounds]
+    return _assignments_from_matrix(matrix, built.num_tables)
+
+
+def _add_assignment_hint(built: _ScheduleModel, hint_assignments: List[List[List[int]]]) -> None:
+    # Hint every x var of a guest seated in the hint; hosts have no vars, and rounds, tables
+    # or participants outside the current dimensions are ignored
+    seats = _tables_by_participant(hint_assignments)
+    for r in built.rounds:
+        if r >= len(seats):
+            continue
+        for p, hinted in seats[r].items():
+            if not (built.num_tables < p <= built.num_participants and 1 <= hinted <= built.num_tables):
+                continue
+            for t in range(1, built.num_tables + 1):
+                built.model.AddHint(built.x[(p, t, r)], 1 if t == hinted else 0)
+
+
+def _solve(
+    model: cp_model.CpModel,
+    extract: Callable[[Sequence[int]], List[List[List[int]]]],
+    time_limit_seconds: float,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]],
+    stop_event: Optional[Any],
+    stop_at: Optional[float] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[cp_model.CpSolver, int, Optional[float]]:
+    # Returns the solver, the status and the wall time at which the final incumbent was found
     solver = cp_model.CpSolver()
+    apply_solver_params(solver, params)
     solver.parameters.max_time_in_seconds = float(time_limit_seconds)
-    solver.parameters.num_search_workers = 8
 
-    status = solver.Solve(model)
+    callback = _progress_callback_class()(on_solution, extract, stop_at)
+    if stop_event is not None and stop_event.is_set():
+        # Stopped before the search began (e.g. while queued or building the model)
+        solver.parameters.max_time_in_seconds = 0.0
+    if stop_event is None:
+        status = solver.Solve(model, callback)
+    else:
+        done = threading.Event()
+        watcher = threading.Thread(target=_stop_when_set, args=(solver, stop_event, done), daemon=True)
+        watcher.start()
+        try:
+            status = solver.Solve(model, callback)
+        finally:
+            done.set()
+            watcher.join()
+    return solver, status, callback.time_to_best
 
-    assignments: List[List[List[int]]]
-    assignments = []
-    for r in range(num_rounds):
-        round_tables: List[List[int]] = [[] for _ in range(num_tables)]
-        for t in range(1, num_tables + 1):
-            for p in range(1, num_participants + 1):
-                if solver.Value(x[(p, t, r)]) == 1:
-                    round_tables[t - 1].append(p)
-            round_tables[t - 1].sort()
-        assignments.append(round_tables)
 
-    # Compute per-round table sizes
-    table_sizes_per_round: List[List[int]] = []
-    for r in range(num_rounds):
-        table_sizes_per_round.append([len(assignments[r][t]) for t in range(num_tables)])
+def _solver_stats(solver: cp_model.CpSolver, status: int) -> Dict[str, Any]:
+    # Statistics of a finished solve; presolve and search both count towards wall_time
+    return {
+        "wall_time": round(solver.WallTime(), 4),
+        "user_time": round(solver.UserTime(), 4),
+        "deterministic_time": round(solver.ResponseProto().deterministic_time, 4),
+        "branches": solver.NumBranches(),
+        "conflicts": solver.NumConflicts(),
+        "best_bound": (
+            solver.BestObjectiveBound() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+        ),
+        "num_workers": solver.parameters.num_workers,
+    }
 
-    # Post-check and stats
-    satisfied_same_once = []
-    unsatisfied_same_once = []
-    for i, (u, v) in enumerate(same_once_pairs):
-        count = 0
-        for r in range(num_rounds):
-            if solver.Value(meet[(i, r)]) == 1:
-                count += 1
-        if count == 1:
-            satisfied_same_once.append([u, v])
-        else:
-            unsatisfied_same_once.append([u, v])
 
-    never_violations = []
-    for (u, v) in never_together_pairs:
-        viol = False
-        for r in range(num_rounds):
-            for t in range(1, num_tables + 1):
-                if solver.Value(x[(u, t, r)]) == 1 and solver.Value(x[(v, t, r)]) == 1:
-                    viol = True
-                    break
-            if viol:
-                break
-        if viol:
-            never_violations.append([u, v])
+def repair_schedule(
+    assignments: List[List[List[int]]],
+    num_participants: int,
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    frozen_rounds: int,
+    removed_participants: Optional[List[int]] = None,
+    added_participants: int = 0,
+    add_same_once_pairs: Optional[List[Tuple[int, int]]] = None,
+    remove_same_once_pairs: Optional[List[Tuple[int, int]]] = None,
+    add_never_together_pairs: Optional[List[Tuple[int, int]]] = None,
+    remove_never_together_pairs: Optional[List[Tuple[int, int]]] = None,
+    time_limit_seconds: int = 30,
+    on_solution: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stop_event: Optional[Any] = None,
+    solver_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # Re-plan the rounds after frozen_rounds of an existing schedule (the output of schedule())
+    # after last-minute changes. Rounds 0..frozen_rounds-1 are kept as played; their meetings
+    # and host visits carry forward. Removed guests are no longer seated; added participants
+    # get ids num_participants+1.. and join from the first free round. same_once_pairs and
+    # never_together_pairs are the lists the schedule was made with; the add_/remove_ lists
+    # are applied on top. Seats that stay where they were are rewarded with KEEP_WEIGHT, and
+    # the old plan is the solver hint, so a repair is much cheaper than a fresh solve.
+    num_rounds = len(assignments)
+    assert num_rounds > 0
+    assert 0 <= frozen_rounds <= num_rounds
+    assert num_participants >= num_tables > 0
+    assert added_participants >= 0
+    removed = set(removed_participants or [])
+    assert all(num_tables < p <= num_participants for p in removed), "only existing guests can be removed"
 
-    status_str = (
-        solver.StatusName(status) if hasattr(solver, "StatusName") else str(status)
+    total = num_participants + added_participants
+    same_once = normalize_pairs(list(same_once_pairs) + list(add_same_once_pairs or []), total)
+    dropped = set(normalize_pairs(list(remove_same_once_pairs or []), total))
+    same_once = [pair for pair in same_once if pair not in dropped]
+    never_together = normalize_pairs(list(never_together_pairs) + list(add_never_together_pairs or []), total)
+    dropped = set(normalize_pairs(list(remove_never_together_pairs or []), total))
+    never_together = [pair for pair in never_together if pair not in dropped]
+
+    seats = _tables_by_participant(assignments)
+    free_rounds = list(range(frozen_rounds, num_rounds))
+    absent = {(p, r) for p in removed for r in free_rounds}
+    keep = {
+        (p, r): t for r in free_rounds for p, t in seats[r].items()
+        if p not in removed and p <= num_participants
+    }
+    built = _build_model(
+        total, num_tables, free_rounds, same_once, never_together,
+        history=seats[:frozen_rounds], absent=absent, keep=keep,
     )
-    objective_value = (
-        int(solver.ObjectiveValue())
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-        else 0
+    _add_assignment_hint(built, [
+        [[p for p in table if p not in removed] for table in round_tables]
+        for round_tables in assignments
+    ])
+
+    def extract(solution: Sequence[int]) -> List[List[List[int]]]:
+        return [list(map(list, round_tables)) for round_tables in assignments[:frozen_rounds]] + \
+            _extract_assignments(solution, built)
+
+    solver, status, time_to_best = _solve(
+        built.model, extract, time_limit_seconds, on_solution, stop_event,
+        params=resolve_solver_params(solver_params),
     )
+    repaired = extract(solver.ResponseProto().solution)
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
 
-    return {
-        "participants": num_participants,
-        "tables": num_tables,
-        "rounds": num_rounds,
-        "table_sizes": table_sizes,
-        "table_sizes_per_round": table_sizes_per_round,
-        "assignments": assignments,
-        "satisfied_same_once_pairs": satisfied_same_once,
-        "unsatisfied_same_once_pairs": unsatisfied_same_once,
-        "never_together_violations": never_violations,
-        "objective_value": objective_value,
-        "solver_status": status_str,
-    }
+    result = _build_result(
+        repaired, total, num_tables, num_rounds, same_once, never_together,
+        schedule_objective(repaired, num_tables, same_once) if solved else 0,
+        solver.StatusName(status), "cpsat", time_to_best=time_to_best,
+    )
+    result["table_sizes"] = compute_table_sizes(total - len(removed), num_tables)
+    result["frozen_rounds"] = frozen_rounds
+    new_seats = _tables_by_participant(repaired)
+    result["changed_seats"] = sum(
+        1 for (p, r), t in keep.items() if new_seats[r].get(p) != t
+    ) if solved else 0
+    return result
+
+
+def warm_up() -> float:
+    """
+    Load OR-Tools and solve a tiny instance in this process; returns the seconds it took.
+
+    The first CP-SAT solve of a process pays for importing the solver and
+    for its one-time setup. Calling this once at startup (e.g. as a pool
+    worker initializer) moves that cost out of the first real request.
+    """
+    started = time.perf_counter()
+    schedule(6, 2, 2, [(3, 4)], [], time_limit_seconds=5, engine="cpsat", solver_params={"num_workers": 1})
+    return time.perf_counter() - started
@@ -0,0 +1,177 @@
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+# Penalties for placing a guest at a table; hard-constraint breaches dominate preferences
+_CONFLICT = 1000
+_REVISIT = 1
+
+
+def greedy_assignments(
+    num_participants: int,
+    num_tables: int,
+    num_rounds: int,
+    table_sizes: List[int],
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+    history: Optional[List[List[List[int]]]] = None,
+) -> List[List[List[int]]]:
+    """
+    Seat guests round by round, each at the cheapest table with room left.
+
+    Never-together partners, guests already met and already-met same-once
+    partners make a table expensive; an unmet same-once partner makes it
+    attractive, and revisiting a host costs a little. A min-conflicts pass
+    then swaps guests within rounds to remove conflicts the greedy pass left
+    behind. The result is a starting point for CP-SAT, not a guaranteed
+    feasible schedule. Pairs must already be normalized.
+
+    ``history`` holds rounds already seated (e.g. by the rolling engine); they
+    are kept as they are, count as met pairs and visits, and only the rounds
+    after them are seated.
+    """
+    never: Dict[int, Set[int]] = {}
+    for u, v in never_together_pairs:
+        never.setdefault(u, set()).add(v)
+        never.setdefault(v, set()).add(u)
+    same: Dict[int, Set[int]] = {}
+    for u, v in same_once_pairs:
+        same.setdefault(u, set()).add(v)
+        same.setdefault(v, set()).add(u)
+
+    guests = list(range(num_tables + 1, num_participants + 1))
+    # Most constrained guests pick first
+    guests.sort(key=lambda g: (-(len(never.get(g, ())) + len(same.get(g, ()))), g))
+    met: Set[Tuple[int, int]] = set()
+    visited: Dict[int, Set[int]] = {g: set() for g in guests}
+
+    assignments: List[List[List[int]]] = [
+        [list(table) for table in round_tables] for round_tables in history or []
+    ]
+    for round_tables in assignments:
+        for t, table in enumerate(round_tables, start=1):
+            for i, u in enumerate(table):
+                if u in visited:
+                    visited[u].add(t)
+                for v in table[i + 1:]:
+                    met.add((u, v) if u < v else (v, u))
+    fixed = len(assignments)
+    for r in range(fixed, num_rounds):
+        round_tables = [[h] for h in range(1, num_tables + 1)]
+        # Rotate the order so early guests do not always get first pick
+        shift = (r * len(guests) // num_rounds) if guests else 0
+        for g in guests[shift:] + guests[:shift]:
+            best: Optional[Tuple[int, int]] = None
+            for t in range(1, num_tables + 1):
+                table = round_tables[t - 1]
+                if len(table) >= table_sizes[t - 1]:
+                    continue
+                cost = _REVISIT if t in visited[g] else 0
+                for p in table:
+                    pair = (p, g) if p < g else (g, p)
+                    if p in never.get(g, ()):
+                        cost += _CONFLICT
+                    elif p in same.get(g, ()):
+                        cost += _CONFLICT if pair in met else -_CONFLICT
+                    elif p > num_tables and pair in met:
+                        cost += _CONFLICT
+                if best is None or cost < best[0]:
+                    best = (cost, t)
+            t = best[1]
+            table = round_tables[t - 1]
+            for p in table:
+                met.add((p, g) if p < g else (g, p))
+            table.append(g)
+            visited[g].add(t)
+        assignments.append(round_tables)
+
+    if fixed < num_rounds:
+        _min_conflicts(
+            assignments, num_tables, same, never,
+            max_steps=40 * len(guests) * (num_rounds - fixed), first_round=fixed,
+        )
+    for round_tables in assignments[fixed:]:
+        for table in round_tables:
+            table.sort()
+    return assignments
+
+
+def _min_conflicts(
+    assignments: List[List[List[int]]],
+    num_tables: int,
+    same: Dict[int, Set[int]],
+    never: Dict[int, Set[int]],
+    max_steps: int,
+    seed: int = 0,
+    first_round: int = 0,
+) -> None:
+    # Swap guests between tables of one round, in place, to lower the conflict count;
+    # rounds before first_round count but are left alone
+    counts: Dict[Tuple[int, int], int] = {}
+    for round_tables in assignments:
+        for table in round_tables:
+            for i, u in enumerate(table):
+                for v in table[i + 1:]:
+                    pair = (u, v) if u < v else (v, u)
+                    counts[pair] = counts.get(pair, 0) + 1
+
+    def pair_cost(pair: Tuple[int, int], count: int) -> int:
+        u, v = pair
+        if v in never.get(u, ()):
+            return _CONFLICT * count
+        if v in same.get(u, ()):
+            return _REVISIT if count == 0 else _CONFLICT * (count - 1)
+        if u > num_tables:
+            return _CONFLICT * max(0, count - 1)
+        return 0
+
+    def change(g: int, table: List[int], skip: int, step: int) -> int:
+        # Cost change when g's meeting count with everyone at table (but skip) moves by step
+        delta = 0
+        for p in table:
+            if p == skip or p == g:
+                continue
+            pair = (p, g) if p < g else (g, p)
+            c = counts.get(pair, 0)
+            delta += pair_cost(pair, c + step) - pair_cost(pair, c)
+        return delta
+
+    def move(g: int, table: List[int], skip: int, step: int) -> None:
+        for p in table:
+            if p == skip or p == g:
+                continue
+            pair = (p, g) if p < g else (g, p)
+            counts[pair] = counts.get(pair, 0) + step
+
+    rng = random.Random(seed)
+    num_rounds = len(assignments)
+    for _ in range(max_steps):
+        r = rng.randrange(first_round, num_rounds)
+        round_tables = assignments[r]
+        a_table = rng.randrange(num_tables)
+        table_a = round_tables[a_table]
+        if len(table_a) < 2:
+            continue
+        a = table_a[rng.randrange(1, len(table_a))]  # index 0 is the host
+        if change(a, table_a, a, -1) >= 0:
+            continue  # a is not involved in any conflict here
+        best: Optional[Tuple[int, int, int]] = None
+        for b_table, table_b in enumerate(round_tables):
+            if b_table == a_table:
+                continue
+            for b in table_b[1:]:
+                delta = (
+                    change(a, table_a, a, -1) + change(b, table_a, a, +1)
+                    + change(b, table_b, b, -1) + change(a, table_b, b, +1)
+                )
+                if best is None or delta < best[0] or (delta == best[0] and rng.random() < 0.5):
+                    best = (delta, b_table, b)
+        if best is None or best[0] > 0:
+            continue
+        _, b_table, b = best
+        table_b = round_tables[b_table]
+        move(a, table_a, a, -1)
+        move(b, table_b, b, -1)
+        table_a[table_a.index(a)] = b
+        table_b[table_b.index(b)] = a
+        move(a, table_b, a, +1)
+        move(b, table_a, b, +1)
@@ -0,0 +1,133 @@
+"""
+Cache of pair-independent model skeletons keyed by the instance dimensions.
+
+Most of a CP-SAT schedule model (the seats, table sizes, guest pair
+uniqueness and host visit indicators) depends only on the number of
+participants, tables and rounds; the pairs add comparatively little on top.
+The cache keeps such skeletons and hands out a private copy per request,
+which takes a small fraction of the time it takes to build one.
+
+The memory tier is an LRU of at most ``max_entries`` models. When
+``directory`` is given, skeletons are also written there and survive
+restarts and are shared by all processes using the directory. The Python
+binding offers no binary parse of a model, so the files are in protobuf
+text format: loading one is only about 2.5 times faster than building the
+skeleton, and the files are large (tens of MB for a few hundred
+participants).
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from .lazy import lazy_import
+except ImportError:
+    from lazy import lazy_import
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+
+Key = Tuple[int, ...]
+
+
+def _copy(model: cp_model.CpModel) -> cp_model.CpModel:
+    copy = cp_model.CpModel()
+    copy.Proto().copy_from(model.Proto())
+    return copy
+
+
+class SkeletonCache:
+    """
+    Two-tier cache of model skeletons with their metadata.
+
+    ``meta`` is a JSON-serialisable dict the builder needs to find its way
+    around a skeleton again (variable indices, block sizes).
+    """
+
+    def __init__(self, max_entries: int = 4, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[Key, Tuple[cp_model.CpModel, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: Key) -> Tuple[str, str]:
+        base = os.path.join(self.directory, "skeleton-" + "-".join(str(part) for part in key))
+        return base + ".pbtxt", base + ".json"
+
+    def _remember(self, key: Key, entry: Tuple[cp_model.CpModel, Dict[str, Any]]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: Key) -> Optional[Tuple[cp_model.CpModel, Dict[str, Any]]]:
+        model_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(model_path) as f:
+                text = f.read()
+        except (OSError, ValueError):
+            return None
+        model = cp_model.CpModel()
+        if not model.Proto().parse_text_format(text):
+            return None
+        return model, meta
+
+    def get(self, key: Key) -> Optional[Tuple[cp_model.CpModel, Dict[str, Any]]]:
+        """Return a private copy of the skeleton stored under ``key`` and its metadata, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self.directory:
+                entry = self._load(key)
+                if entry is not None:
+                    self.disk_hits += 1
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return _copy(entry[0]), json.loads(json.dumps(entry[1]))
+
+    def put(self, key: Key, model: cp_model.CpModel, meta: Dict[str, Any]) -> None:
+        """Store a copy of ``model``; the caller may go on adding to the original"""
+        with self._lock:
+            entry = (_copy(model), json.loads(json.dumps(meta)))
+            self._remember(key, entry)
+            if not self.directory:
+                return
+            model_path, meta_path = self._paths(key)
+            if os.path.exists(meta_path):
+                return
+            # Write under temporary names and rename, so readers never see half a file;
+            # the model file goes first because the metadata file marks the entry complete
+            suffix = f".{os.getpid()}.tmp"
+            if not entry[0].export_to_file(model_path + suffix + ".pbtxt"):
+                return
+            os.replace(model_path + suffix + ".pbtxt", model_path)
+            with open(meta_path + suffix, "w") as f:
+                json.dump(entry[1], f)
+            os.replace(meta_path + suffix, meta_path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.directory),
+            }
@@ -0,0 +1,122 @@
+"""
+CP-SAT parameters that callers may set, with defaults from the environment.
+
+The number of search workers defaults to the CPUs this process may use
+(its affinity mask, capped by a cgroup CPU quota) divided by the number of
+solves that run at the same time, so concurrent solves share the cores
+instead of each starting a full portfolio on all of them.
+"""
+from __future__ import annotations
+
+import math
+import os
+import sys
+from typing import Any, Dict, Optional
+
+try:
+    from .lazy import lazy_import
+except ImportError:
+    from lazy import lazy_import
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+
+# Settable keys and the environment variables holding their defaults
+SOLVER_PARAM_ENV = {
+    "num_workers": "SOLVER_NUM_WORKERS",
+    "random_seed": "SOLVER_RANDOM_SEED",
+    "linearization_level": "SOLVER_LINEARIZATION_LEVEL",
+    "use_lns": "SOLVER_USE_LNS",
+    "log_search_progress": "SOLVER_LOG_SEARCH_PROGRESS",
+}
+_BOOL_PARAMS = ("use_lns", "log_search_progress")
+_CGROUP_V2_MAX = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+_CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    # CPU quota of the container, rounded up; None without a quota
+    quota, period = None, None
+    v2 = _read(_CGROUP_V2_MAX)
+    if v2 is not None:
+        parts = v2.split()
+        if len(parts) == 2 and parts[0] != "max":
+            quota, period = parts
+    else:
+        quota, period = _read(_CGROUP_V1_QUOTA), _read(_CGROUP_V1_PERIOD)
+    try:
+        quota_us, period_us = int(quota), int(period)
+    except (TypeError, ValueError):
+        return None
+    if quota_us <= 0 or period_us <= 0:
+        return None
+    return max(1, math.ceil(quota_us / period_us))
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by the cgroup CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return max(1, min(cpus, limit) if limit is not None else cpus)
+
+
+def default_num_workers(concurrent_solves: int = 1) -> int:
+    """Search workers per solve when ``concurrent_solves`` solves share the CPUs"""
+    configured = os.getenv(SOLVER_PARAM_ENV["num_workers"])
+    if configured:
+        return max(1, int(configured))
+    return max(1, available_cpus() // max(1, concurrent_solves))
+
+
+def resolve_solver_params(
+    params: Optional[Dict[str, Any]] = None, concurrent_solves: int = 1
+) -> Dict[str, Any]:
+    """
+    Fill in every parameter the caller did not set.
+
+    Explicit values win, then the ``SOLVER_*`` environment variables, then
+    the defaults above. Raises ValueError for an unknown key.
+    """
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    unknown = sorted(set(params) - set(SOLVER_PARAM_ENV))
+    if unknown:
+        raise ValueError(
+            f"Unknown solver parameters {', '.join(unknown)}; expected {', '.join(SOLVER_PARAM_ENV)}"
+        )
+    resolved: Dict[str, Any] = {}
+    for key, env in SOLVER_PARAM_ENV.items():
+        if key in params:
+            resolved[key] = params[key]
+        elif key == "num_workers":
+            resolved[key] = default_num_workers(concurrent_solves)
+        elif os.getenv(env):
+            value = os.environ[env]
+            resolved[key] = value.lower() in ("1", "true", "yes", "on") if key in _BOOL_PARAMS else int(value)
+    return resolved
+
+
+def apply_solver_params(solver: cp_model.CpSolver, params: Optional[Dict[str, Any]] = None) -> None:
+    """Set resolved parameters on ``solver``; search logs go to stderr, stdout stays JSON"""
+    params = resolve_solver_params(params)
+    solver.parameters.num_workers = int(params["num_workers"])
+    if "random_seed" in params:
+        solver.parameters.random_seed = int(params["random_seed"])
+    if "linearization_level" in params:
+        solver.parameters.linearization_level = int(params["linearization_level"])
+    if "use_lns" in params:
+        solver.parameters.use_lns = bool(params["use_lns"])
+    if params.get("log_search_progress"):
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = lambda line: print(line, file=sys.stderr, flush=True)
@@ -0,0 +1,164 @@
+"""
+Symmetry breaking for the full CP-SAT model.
+
+Two guests with the same same-once and never-together partners can swap
+seats in every round without changing any constraint or the objective,
+and the rounds of a schedule can be put in any order. The model is a
+matrix of table indices, one row per guest and one column per round,
+that is symmetric under row swaps within a class and under any column
+permutation. Reading the matrix row by row, every orbit has a smallest
+element. In that element, the rows of each class are in lexicographic
+order, and so are the columns compared top to bottom (double-lex). Both
+orders are added as constraints. The first is what puts round 0 of the
+interchangeable guests in a canonical order.
+
+A hint must satisfy the same orders, otherwise the solver discards most
+of it. ``canonical_assignments`` moves a seating to such a representative.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    from .lazy import lazy_import
+except ImportError:
+    from lazy import lazy_import
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+
+# Rows compared when ordering rounds; a longer prefix prunes more but costs more variables
+_COLUMN_ROWS = 16
+
+
+def guest_classes(
+    num_participants: int,
+    num_tables: int,
+    same_once_pairs: List[Tuple[int, int]],
+    never_together_pairs: List[Tuple[int, int]],
+) -> List[List[int]]:
+    """
+    Groups of two or more interchangeable guests, largest first.
+
+    Guests are interchangeable when they have the same partners in both
+    pair lists. Pairs must already be normalized.
+    """
+    partners: Dict[int, Tuple[set, set]] = {
+        g: (set(), set()) for g in range(num_tables + 1, num_participants + 1)
+    }
+    for kind, pairs in ((0, same_once_pairs), (1, never_together_pairs)):
+        for u, v in pairs:
+            if u in partners:
+                partners[u][kind].add(v)
+            if v in partners:
+                partners[v][kind].add(u)
+    groups: Dict[Tuple[frozenset, frozenset], List[int]] = {}
+    for g, (same, never) in partners.items():
+        groups.setdefault((frozenset(same), frozenset(never)), []).append(g)
+    classes = [sorted(members) for members in groups.values() if len(members) > 1]
+    classes.sort(key=lambda members: (-len(members), members[0]))
+    return classes
+
+
+def _row_order(classes: List[List[int]]) -> List[int]:
+    return [g for members in classes for g in members]
+
+
+def _add_lex_leq(model: cp_model.CpModel, a: Sequence[Any], b: Sequence[Any], name: str) -> None:
+    # a <=lex b; equal[i] means a and b agree on every position before i
+    equal = [None] + [model.NewBoolVar(f"{name}_eq{i}") for i in range(1, len(a))]
+    for i in range(len(a)):
+        if i == 0:
+            model.Add(a[0] <= b[0])
+        else:
+            model.Add(a[i] <= b[i]).OnlyEnforceIf(equal[i])
+        if i + 1 < len(a):
+            nxt = equal[i + 1]
+            if i > 0:
+                model.AddImplication(nxt, equal[i])
+            model.Add(a[i] == b[i]).OnlyEnforceIf(nxt)
+            # Leaving the tie early needs a strict step here
+            enforce = [nxt.Not()] if i == 0 else [equal[i], nxt.Not()]
+            model.Add(a[i] + 1 <= b[i]).OnlyEnforceIf(enforce)
+
+
+def add_symmetry_breaking(
+    model: cp_model.CpModel,
+    x: Dict[Tuple[int, int, int], Any],
+    num_tables: int,
+    num_rounds: int,
+    classes: List[List[int]],
+) -> None:
+    """Order each class of guests and the rounds (double-lex over table indices)"""
+    rows = _row_order(classes)
+    if not rows:
+        return
+    tables = range(1, num_tables + 1)
+    table_of: Dict[Tuple[int, int], Any] = {}
+    for g in rows:
+        for r in range(num_rounds):
+            var = model.NewIntVar(1, num_tables, f"table_p{g}_r{r}")
+            model.Add(var == sum(t * x[(g, t, r)] for t in tables))
+            table_of[(g, r)] = var
+
+    for members in classes:
+        for a, b in zip(members, members[1:]):
+            _add_lex_leq(
+                model,
+                [table_of[(a, r)] for r in range(num_rounds)],
+                [table_of[(b, r)] for r in range(num_rounds)],
+                f"sym_p{a}_p{b}",
+            )
+    prefix = rows[:_COLUMN_ROWS]
+    for r in range(num_rounds - 1):
+        _add_lex_leq(
+            model,
+            [table_of[(g, r)] for g in prefix],
+            [table_of[(g, r + 1)] for g in prefix],
+            f"sym_r{r}",
+        )
+
+
+def canonical_assignments(
+    assignments: List[List[List[int]]], classes: List[List[int]], max_passes: int = 20
+) -> List[List[List[int]]]:
+    """
+    Relabel guests within classes and reorder rounds so the seating meets the double-lex order.
+
+    Every pass sorts rows, then columns; each sort only makes the
+    row-by-row reading smaller, so the passes settle quickly.
+    """
+    rows = _row_order(classes)
+    if not rows:
+        return assignments
+    seats = [
+        {p: t for t, table in enumerate(round_tables, start=1) for p in table}
+        for round_tables in assignments
+    ]
+    if any(g not in seat for seat in seats for g in rows):
+        return assignments  # not a complete seating; leave it to the solver
+    order = list(range(len(seats)))
+    for _ in range(max_passes):
+        changed = False
+        for members in classes:
+            vectors = sorted(tuple(seats[r][g] for r in order) for g in members)
+            for g, vector in zip(members, vectors):
+                for r, t in zip(order, vector):
+                    if seats[r][g] != t:
+                        seats[r][g] = t
+                        changed = True
+        prefix = rows[:_COLUMN_ROWS]
+        sorted_order = sorted(order, key=lambda r: tuple(seats[r][g] for g in prefix))
+        if sorted_order != order:
+            order = sorted_order
+            changed = True
+        if not changed:
+            break
+
+    num_tables = len(assignments[0])
+    canonical: List[List[List[int]]] = []
+    for r in order:
+        round_tables: List[List[int]] = [[] for _ in range(num_tables)]
+        for p, t in seats[r].items():
+            round_tables[t - 1].append(p)
+        canonical.append([sorted(table) for table in round_tables])
+    return canonical
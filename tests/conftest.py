@@ -0,0 +1,10 @@
+"""Shared test fixtures"""
+import pytest
+
+import app.api.scheduler as scheduler_api
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Give every test an empty result cache so earlier solves are not reused"""
+    monkeypatch.setattr(scheduler_api, "_cache", None)
@@ -1,7 +1,12 @@
 """Tests for the FastAPI endpoints"""
+import json
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
+from app import encoding
 from app.main import app
+from python.compact import decode_seating
 
 
 @pytest.fixture
@@ -60,7 +65,7 @@ class TestScheduleEndpoint:
         request_data = {
             "participants": 6,
             "tables": 2,
-            "rounds": 3,
+            "rounds": 2,
             "same_once_pairs": [{"u": 3, "v": 5}],
             "never_together_pairs": [{"u": 4, "v": 6}]
         }
@@ -68,7 +73,83 @@ class TestScheduleEndpoint:
         assert response.status_code == 200
         data = response.json()
         assert data["participants"] == 6
-        assert len(data["assignments"]) == 3
+        assert len(data["assignments"]) == 2
+
+    def test_solver_params_validated(self, client):
+        """Test that solver parameters out of range are rejected"""
+        request_data = {
+            "participants": 9,
+            "tables": 3,
+            "rounds": 2,
+            "solver_params": {"num_workers": 0}
+        }
+        response = client.post("/api/schedule", json=request_data)
+        assert response.status_code == 422
+
+    def test_default_workers_shared_by_pool(self, monkeypatch):
+        """Test that the default worker count splits the CPUs between pool workers"""
+        import python.solver_params as solver_params
+        from app.api.scheduler import ScheduleRequest, schedule_kwargs
+        from app.pool import SolverPool
+
+        monkeypatch.delenv("SOLVER_NUM_WORKERS", raising=False)
+        monkeypatch.setattr(solver_params, "available_cpus", lambda: 4)
+        monkeypatch.setattr("app.api.scheduler.get_pool", lambda: SolverPool(max_workers=2, queue_depth=0))
+        request = ScheduleRequest(participants=9, tables=3, rounds=2)
+        assert schedule_kwargs(request)["solver_params"] == {"num_workers": 2}
+        request = ScheduleRequest(participants=9, tables=3, rounds=2, solver_params={"num_workers": 3})
+        assert schedule_kwargs(request)["solver_params"] == {"num_workers": 3}
+
+    def test_schedule_lexicographic_mode(self, client):
+        """Test that the staged objective reports its stages"""
+        request_data = {
+            "participants": 9,
+            "tables": 3,
+            "rounds": 2,
+            "same_once_pairs": [{"u": 4, "v": 7}],
+            "engine": "cpsat",
+            "objective_mode": "lexicographic"
+        }
+        response = client.post("/api/schedule", json=request_data)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["objective_stages"][0]["term"] == "same_once_pairs"
+        assert data["satisfied_same_once_pairs"] == [[4, 7]]
+
+    def test_schedule_diagnostics_bypass_cache(self, client):
+        """Test that diagnostics are returned on request and never come from or go to the cache"""
+        request_data = {"participants": 9, "tables": 3, "rounds": 2, "engine": "cpsat"}
+        plain = client.post("/api/schedule", json=request_data).json()
+        profiled = client.post("/api/schedule", json={**request_data, "diagnostics": True}).json()
+        again = client.post("/api/schedule", json=request_data).json()
+
+        assert plain["diagnostics"] is None and again["diagnostics"] is None
+        assert profiled["diagnostics"]["blocks"]["x"]["variables"] > 0
+        assert "solve" in profiled["diagnostics"]["phases"]
+
+    def test_schedule_batch_streams_every_instance(self, client):
+        """Test that each instance comes back once with its index, infeasible ones as errors"""
+        instances = [
+            {"participants": 9, "tables": 3, "rounds": 2},
+            {"participants": 12, "tables": 3, "rounds": 3, "same_once_pairs": [{"u": 4, "v": 7}]},
+            {"participants": 6, "tables": 2, "rounds": 2,
+             "never_together_pairs": [{"u": 3, "v": 1}, {"u": 3, "v": 2}]},
+        ]
+        response = client.post("/api/schedule/batch", json={"instances": instances})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+
+        assert sorted(lines) == [0, 1, 2]
+        assert lines[0]["result"]["participants"] == 9
+        assert lines[1]["result"]["satisfied_same_once_pairs"] == [[4, 7]]
+        assert lines[2]["status_code"] == 422
+        assert lines[2]["error"]["diagnosis"]["feasible"] is False
+
+    def test_schedule_batch_rejects_empty(self, client):
+        """Test that a batch needs at least one instance"""
+        response = client.post("/api/schedule/batch", json={"instances": []})
+        assert response.status_code == 422
 
     def test_schedule_with_time_limit(self, client):
         """Test schedule with custom time limit"""
@@ -143,3 +224,130 @@ class TestScheduleEndpoint:
         }
         response = client.post("/api/schedule", json=request_data)
         assert response.status_code == 422
+
+    def test_schedule_infeasible_returns_diagnosis(self, client):
+        """Test that a provably infeasible request is rejected with a diagnosis"""
+        request_data = {
+            "participants": 12,
+            "tables": 3,
+            "rounds": 2,
+            "never_together_pairs": [{"u": 1, "v": 4}, {"u": 2, "v": 4}, {"u": 3, "v": 4}]
+        }
+        response = client.post("/api/schedule", json=request_data)
+        assert response.status_code == 422
+        diagnosis = response.json()["detail"]["diagnosis"]
+        assert diagnosis["feasible"] is False
+        assert diagnosis["conflicts"][0]["participants"] == [4]
+
+
+class TestResponseEncoding:
+    """Tests for compact output and negotiated response encodings"""
+
+    LARGE = {"participants": 121, "tables": 11, "rounds": 4}
+
+    def test_compact_seating_decodes_to_assignments(self, client):
+        """Test that the compact seating holds the same schedule as the nested assignments"""
+        nested = client.post("/api/schedule", json=self.LARGE).json()
+        compact = client.post("/api/schedule", json={**self.LARGE, "output_format": "compact"}).json()
+
+        assert compact["assignments"] is None
+        assert compact["seating"]["shape"] == [4, 121]
+        assert decode_seating(compact["seating"], 11) == nested["assignments"]
+        assert compact["objective_value"] == nested["objective_value"]
+
+    def test_gzip_negotiated(self, client):
+        """Test that large bodies are compressed only for clients accepting gzip"""
+        compressed = client.post("/api/schedule", json=self.LARGE, headers={"Accept-Encoding": "gzip"})
+        plain = client.post("/api/schedule", json=self.LARGE, headers={"Accept-Encoding": "identity"})
+
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert compressed.json() == plain.json()
+
+    def test_msgpack_negotiated(self, client, monkeypatch):
+        """Test that msgpack is served when preferred and available, and JSON otherwise"""
+        monkeypatch.setattr(encoding, "msgpack", None)
+        fallback = client.post("/api/schedule", json=self.LARGE, headers={"Accept": "application/msgpack"})
+        assert fallback.headers["content-type"] == "application/json"
+
+        monkeypatch.setattr(encoding, "msgpack", SimpleNamespace(packb=lambda content: b"packed"))
+        packed = client.post("/api/schedule", json=self.LARGE, headers={"Accept": "application/msgpack"})
+        assert packed.headers["content-type"] == "application/msgpack"
+        assert packed.content == b"packed"
+        preferred_json = client.post(
+            "/api/schedule", json=self.LARGE, headers={"Accept": "application/json, application/msgpack;q=0.5"}
+        )
+        assert preferred_json.headers["content-type"] == "application/json"
+
+    def test_batch_lines_compact(self, client):
+        """Test that batch instances can ask for compact results one by one"""
+        response = client.post("/api/schedule/batch", json={"instances": [
+            {**self.LARGE, "output_format": "compact"}, self.LARGE,
+        ]})
+        results = {line["index"]: line["result"] for line in map(json.loads, response.text.splitlines())}
+
+        assert results[0]["seating"] is not None and results[0]["assignments"] is None
+        assert decode_seating(results[0]["seating"], 11) == results[1]["assignments"]
+
+
+class TestStreamEndpoint:
+    """Tests for the Server-Sent Events schedule endpoint"""
+
+    def test_stream_solutions_then_result(self):
+        """Test that incumbents are streamed before the final result"""
+        request_data = {
+            "participants": 6,
+            "tables": 2,
+            "rounds": 2,
+            "same_once_pairs": [{"u": 3, "v": 5}],
+            "time_limit_seconds": 10
+        }
+        with TestClient(app) as client:
+            response = client.post("/api/schedule/stream", json=request_data)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+
+        assert events[-1][0] == "result"
+        assert events[-1][1]["participants"] == 6
+        solutions = [data for event, data in events if event == "solution"]
+        assert solutions
+        assert {"assignments", "objective_value", "best_bound", "elapsed_seconds"} <= set(solutions[0])
+
+
+class TestRepairEndpoint:
+    """Tests for the schedule repair endpoint"""
+
+    def test_repair_after_dropout(self, client):
+        """Test that a schedule can be repaired after a guest drops out"""
+        base = client.post("/api/schedule", json={"participants": 9, "tables": 3, "rounds": 3}).json()
+        request_data = {
+            "participants": 9,
+            "tables": 3,
+            "assignments": base["assignments"],
+            "frozen_rounds": 1,
+            "removed_participants": [5],
+            "time_limit_seconds": 10
+        }
+        response = client.post("/api/schedule/repair", json=request_data)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["assignments"][0] == base["assignments"][0]
+        assert all(5 not in table for round_tables in data["assignments"][1:] for table in round_tables)
+        assert "changed_seats" in data
+
+    def test_repair_rejects_host_removal(self, client):
+        """Test that removing a host is reported as invalid input"""
+        request_data = {
+            "participants": 6,
+            "tables": 2,
+            "assignments": [[[1, 3, 4], [2, 5, 6]]],
+            "frozen_rounds": 0,
+            "removed_participants": [1]
+        }
+        response = client.post("/api/schedule/repair", json=request_data)
+        assert response.status_code == 400
@@ -0,0 +1,70 @@
+"""Tests for solving many instances at once"""
+import pytest
+
+from python.batch import instance_kwargs, output_format, read_instances, solve_batch
+from python.compact import decode_seating
+
+
+class TestInstanceKwargs:
+    """Tests for instance_kwargs"""
+
+    def test_maps_fields_and_pairs(self):
+        """Test that API field names and both pair layouts become schedule() arguments"""
+        kwargs = instance_kwargs({
+            "participants": 12, "tables": 3, "rounds": 3,
+            "same_once_pairs": [[4, 7]], "never_together_pairs": [{"u": 5, "v": 8}],
+            "engine": "cpsat",
+        })
+
+        assert kwargs == {
+            "num_participants": 12, "num_tables": 3, "num_rounds": 3,
+            "same_once_pairs": [(4, 7)], "never_together_pairs": [(5, 8)], "engine": "cpsat",
+        }
+
+    def test_accepts_every_schedule_body_field(self):
+        """Test that diagnostics reaches schedule() and output_format is accepted but kept out of it"""
+        instance = {"participants": 12, "tables": 3, "rounds": 3, "diagnostics": True, "output_format": "compact"}
+
+        kwargs = instance_kwargs(instance)
+
+        assert kwargs["diagnostics"] is True
+        assert "output_format" not in kwargs
+        assert output_format(instance) == "compact"
+        assert output_format({"participants": 12, "tables": 3, "rounds": 3}) == "nested"
+
+    @pytest.mark.parametrize("instance", [
+        {"participants": 12, "tables": 3},
+        {"participants": 12, "tables": 3, "rounds": 3, "round": 2},
+        [12, 3, 3],
+    ])
+    def test_rejects_malformed(self, instance):
+        """Test that missing or unknown fields are errors"""
+        with pytest.raises(ValueError):
+            instance_kwargs(instance)
+
+
+class TestSolveBatch:
+    """Tests for solve_batch"""
+
+    def test_every_instance_answered_once(self):
+        """Test that results and errors each carry their instance's index"""
+        lines = ['{"participants": 9, "tables": 3, "rounds": 2}', "", "{oops",
+                 '{"participants": 6, "tables": 2, "rounds": 2, "never_together_pairs": [[3, 1], [3, 2]]}']
+        answers = {line["index"]: line for line in solve_batch(read_instances(lines), jobs=1)}
+
+        assert sorted(answers) == [0, 1, 2]
+        assert answers[0]["result"]["participants"] == 9
+        assert "Line 3" in answers[1]["error"]
+        assert answers[2]["diagnosis"]["feasible"] is False
+
+    def test_honours_diagnostics_and_output_format(self):
+        """Test that a line can ask for diagnostics and compact seating, and a bad format is its own error"""
+        lines = ['{"participants": 9, "tables": 3, "rounds": 2, "diagnostics": true, "output_format": "compact"}',
+                 '{"participants": 9, "tables": 3, "rounds": 2, "output_format": "flat"}']
+        answers = {line["index"]: line for line in solve_batch(read_instances(lines), jobs=1)}
+
+        result = answers[0]["result"]
+        assert result["diagnostics"] is not None
+        assert "assignments" not in result
+        assert len(decode_seating(result["seating"], 3)) == 2
+        assert "output_format" in answers[1]["error"]
@@ -0,0 +1,85 @@
+"""Tests for the benchmark instance generator and baseline comparison"""
+from benchmarks.instances import SUITES, generate_instance, suite_instances
+from benchmarks.run import compare, compare_startup
+
+
+def _record(name="a", status="OPTIMAL", objective=100, wall=2.0, build=0.5, rss=100.0):
+    return {"name": name, "status": status, "objective_value": objective,
+            "wall_seconds": wall, "build_seconds": build, "peak_rss_mb": rss}
+
+
+class TestInstances:
+    """Tests for generate_instance and the named suites"""
+
+    def test_deterministic(self):
+        """Test that the same spec always gives the same pairs, and another seed different ones"""
+        first = generate_instance(40, 8, 3, 0.5, 0.25, seed=1)
+        again = generate_instance(40, 8, 3, 0.5, 0.25, seed=1)
+        other = generate_instance(40, 8, 3, 0.5, 0.25, seed=2)
+
+        assert first == again
+        assert first["same_once_pairs"] != other["same_once_pairs"]
+
+    def test_pairs_are_disjoint_guest_pairs(self):
+        """Test the pair counts, that pairs avoid the hosts and that the two lists never overlap"""
+        instance = generate_instance(40, 8, 3, 0.5, 0.25)
+        same, never = instance["same_once_pairs"], instance["never_together_pairs"]
+
+        assert len(same) == 20 and len(never) == 10
+        assert not set(same) & set(never)
+        assert all(8 < u < v <= 40 for u, v in same + never)
+
+    def test_suites_build(self):
+        """Test that every suite generates named instances with unique names"""
+        for suite in SUITES:
+            names = [instance["name"] for instance in suite_instances(suite)]
+            assert len(names) == len(set(names))
+
+
+class TestCompare:
+    """Tests for the baseline comparison of benchmarks/run.py"""
+
+    def test_same_run_has_no_regressions(self):
+        """Test that a run equal to its baseline passes"""
+        assert compare([_record()], [_record()]) == []
+
+    def test_worse_status_and_objective(self):
+        """Test that a status downgrade and a lower objective are both reported"""
+        regressions = compare([_record()], [_record(status="FEASIBLE", objective=90)])
+
+        assert len(regressions) == 2
+
+    def test_time_within_tolerance_and_slack(self):
+        """Test that small slowdowns pass and large ones regress"""
+        assert compare([_record()], [_record(wall=3.4)], tolerance=0.25) == []
+        assert compare([_record()], [_record(wall=3.6)], tolerance=0.25) != []
+
+    def test_wall_time_ignored_below_optimal(self):
+        """Test that runs that used the whole time limit do not compare wall times"""
+        baseline = [_record(status="FEASIBLE", wall=10.0)]
+
+        assert compare(baseline, [_record(status="FEASIBLE", wall=30.0)]) == []
+
+    def test_memory_growth(self):
+        """Test that peak memory beyond the tolerance is a regression"""
+        assert compare([_record()], [_record(rss=200.0)]) != []
+
+    def test_unknown_instances_ignored(self):
+        """Test that instances missing from the baseline are skipped"""
+        assert compare([_record("a")], [_record("b", status="UNKNOWN")]) == []
+
+
+class TestCompareStartup:
+    """Tests for the startup timing comparison of benchmarks/run.py"""
+
+    def test_slower_import_regresses(self):
+        """Test that only timings beyond tolerance plus slack are reported"""
+        baseline = {"import_api_seconds": 0.5, "first_solve_seconds": 0.4}
+        current = {"import_api_seconds": 0.8, "first_solve_seconds": 0.9}
+
+        assert compare_startup(baseline, current) == ["startup: first_solve_seconds 0.4 -> 0.9"]
+
+    def test_missing_side_skipped(self):
+        """Test that baselines recorded without startup timings compare clean"""
+        assert compare_startup(None, {"import_api_seconds": 9.0}) == []
+        assert compare_startup({"import_api_seconds": 0.5}, None) == []
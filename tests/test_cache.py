@@ -0,0 +1,105 @@
+"""Tests for the schedule result cache"""
+from fastapi.testclient import TestClient
+
+from app.main import app
+from python.cache import ScheduleCache, instance_key
+
+
+def make_result(status, objective=1):
+    return {"solver_status": status, "objective_value": objective}
+
+
+class TestInstanceKey:
+    """Tests for instance_key"""
+
+    def test_pair_order_does_not_matter(self):
+        """Test that reordered and flipped pairs map to the same key"""
+        a = instance_key(8, 2, 3, [(3, 5), (4, 7)], [(6, 8)])
+        b = instance_key(8, 2, 3, [(7, 4), (5, 3), (3, 5)], [(8, 6)])
+        assert a == b
+
+    def test_different_instances_differ(self):
+        """Test that changing dimensions or pairs changes the key"""
+        base = instance_key(8, 2, 3, [(3, 5)], [])
+        assert instance_key(8, 2, 4, [(3, 5)], []) != base
+        assert instance_key(8, 2, 3, [], [(3, 5)]) != base
+        assert instance_key(8, 2, 3, [(3, 5)], [], engine="cpsat") != base
+
+
+class TestScheduleCache:
+    """Tests for ScheduleCache reuse rules"""
+
+    def test_optimal_reused_for_any_time_limit(self):
+        """Test that OPTIMAL results are reused regardless of time limit"""
+        cache = ScheduleCache()
+        cache.put("k", 5, make_result("OPTIMAL"))
+        assert cache.get("k", 300) == make_result("OPTIMAL")
+
+    def test_feasible_reused_only_for_smaller_limits(self):
+        """Test that FEASIBLE results are not reused for longer solves"""
+        cache = ScheduleCache()
+        cache.put("k", 10, make_result("FEASIBLE"))
+        assert cache.get("k", 10) is not None
+        assert cache.get("k", 5) is not None
+        assert cache.get("k", 20) is None
+
+    def test_longer_feasible_replaces_shorter(self):
+        """Test that a FEASIBLE result solved longer replaces the cached one"""
+        cache = ScheduleCache()
+        cache.put("k", 10, make_result("FEASIBLE", 1))
+        cache.put("k", 5, make_result("FEASIBLE", 2))
+        assert cache.get("k", 10)["objective_value"] == 1
+        cache.put("k", 20, make_result("FEASIBLE", 3))
+        assert cache.get("k", 20)["objective_value"] == 3
+
+    def test_unknown_not_cached(self):
+        """Test that results without a solution are never stored"""
+        cache = ScheduleCache()
+        cache.put("k", 10, make_result("UNKNOWN"))
+        cache.put("k", 10, make_result("INFEASIBLE"))
+        assert cache.get("k", 1) is None
+
+    def test_lru_eviction_and_counters(self):
+        """Test LRU eviction and hit/miss counters"""
+        cache = ScheduleCache(max_entries=2)
+        cache.put("a", 1, make_result("OPTIMAL"))
+        cache.put("b", 1, make_result("OPTIMAL"))
+        cache.get("a", 1)
+        cache.put("c", 1, make_result("OPTIMAL"))
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is not None
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["entries"] == 2
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that results written to disk are found by a new cache"""
+        ScheduleCache(directory=str(tmp_path)).put("k", 10, make_result("OPTIMAL"))
+        cache = ScheduleCache(directory=str(tmp_path))
+        assert cache.get("k", 60) == make_result("OPTIMAL")
+        assert cache.stats()["disk_hits"] == 1
+
+
+class TestCachedEndpoint:
+    """Tests for cache use in the schedule endpoint"""
+
+    def test_repeat_request_hits_cache(self):
+        """Test that the same instance with reordered pairs is served from cache"""
+        client = TestClient(app)
+        first = client.post("/api/schedule", json={
+            "participants": 6, "tables": 2, "rounds": 2,
+            "same_once_pairs": [{"u": 3, "v": 5}, {"u": 4, "v": 6}],
+            "time_limit_seconds": 10
+        })
+        second = client.post("/api/schedule", json={
+            "participants": 6, "tables": 2, "rounds": 2,
+            "same_once_pairs": [{"u": 6, "v": 4}, {"u": 5, "v": 3}],
+            "time_limit_seconds": 10
+        })
+        assert first.status_code == second.status_code == 200
+        assert first.json()["assignments"] == second.json()["assignments"]
+
+        stats = client.get("/api/cache/stats").json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
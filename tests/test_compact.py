@@ -0,0 +1,34 @@
+"""Tests for the compact seating encoding"""
+import pytest
+
+from python.compact import SEATING_ENCODING, decode_seating, encode_seating
+
+
+class TestSeatingEncoding:
+    """Tests for encode_seating and decode_seating"""
+
+    def test_round_trip(self):
+        """Test that decoding returns the nested assignments, ids sorted within a table"""
+        assignments = [[[1, 3, 5], [2, 4, 6]], [[1, 4, 6], [2, 3, 5]]]
+        seating = encode_seating(assignments, 6)
+
+        assert seating["encoding"] == SEATING_ENCODING
+        assert seating["shape"] == [2, 6]
+        assert decode_seating(seating, 2) == assignments
+
+    def test_unseated_participants(self):
+        """Test that a participant missing from a round is encoded as table 0 and dropped again"""
+        assignments = [[[1, 3], [2, 4, 5]], [[1, 5], [2, 3]]]
+
+        assert decode_seating(encode_seating(assignments, 5), 2) == assignments
+
+    def test_two_bytes_per_seat(self):
+        """Test that the payload is the int16 matrix in base64"""
+        seating = encode_seating([[[1, 3], [2, 4]]] * 3, 4)
+
+        assert len(seating["data"]) == 4 * ((3 * 4 * 2 + 2) // 3)
+
+    def test_unknown_encoding(self):
+        """Test that other encodings are rejected"""
+        with pytest.raises(ValueError):
+            decode_seating({"encoding": "int8", "shape": [1, 1], "data": ""}, 1)
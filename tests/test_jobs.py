@@ -0,0 +1,110 @@
+"""Tests for the asynchronous job API"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.jobs import Job, JobStore
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    """Create a test client that keeps one event loop for background jobs"""
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_for_job(client, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f"/api/jobs/{job_id}").json()
+        if data["status"] != "running":
+            return data
+        time.sleep(0.2)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobEndpoints:
+    """Tests for submit, poll and cancel"""
+
+    def test_submit_and_poll(self, client):
+        """Test that a submitted job completes with a schedule"""
+        response = client.post("/api/jobs", json={
+            "participants": 6,
+            "tables": 2,
+            "rounds": 2,
+            "same_once_pairs": [{"u": 3, "v": 5}],
+            "time_limit_seconds": 10
+        })
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        data = wait_for_job(client, job_id)
+        assert data["status"] == "completed"
+        assert data["result"]["participants"] == 6
+        assert data["best_objective"] == data["result"]["objective_value"]
+
+        # Finished results can be fetched again
+        assert client.get(f"/api/jobs/{job_id}").json()["result"] == data["result"]
+
+    def test_cancel_running_job(self, client):
+        """Test that cancelling stops the search well before the time limit"""
+        response = client.post("/api/jobs", json={
+            "participants": 60,
+            "tables": 10,
+            "rounds": 3,
+            "time_limit_seconds": 120,
+            "engine": "cpsat"
+        })
+        job_id = response.json()["job_id"]
+        time.sleep(1)
+
+        started = time.monotonic()
+        assert client.delete(f"/api/jobs/{job_id}").status_code == 200
+        data = wait_for_job(client, job_id)
+        assert time.monotonic() - started < 30
+        assert data["status"] == "cancelled"
+
+        # Deleting a finished job discards it
+        assert client.delete(f"/api/jobs/{job_id}").status_code == 200
+        assert client.get(f"/api/jobs/{job_id}").status_code == 404
+
+    def test_unknown_job(self, client):
+        """Test that unknown job ids return 404"""
+        assert client.get("/api/jobs/missing").status_code == 404
+        assert client.delete("/api/jobs/missing").status_code == 404
+
+
+class TestJobStore:
+    """Tests for JobStore eviction"""
+
+    def make_finished_job(self, job_id, finished_at):
+        job = Job(job_id, handle=None)
+        job.status = "completed"
+        job.finished_at = finished_at
+        return job
+
+    def test_ttl_eviction(self):
+        """Test that finished jobs expire after the TTL"""
+        store = JobStore(ttl_seconds=10, max_jobs=10)
+        store.add(self.make_finished_job("old", time.monotonic() - 20))
+        store.add(self.make_finished_job("new", time.monotonic()))
+        assert store.get("old") is None
+        assert store.get("new") is not None
+
+    def test_capacity_evicts_oldest_finished(self):
+        """Test that a full store drops the oldest finished job first"""
+        store = JobStore(ttl_seconds=100, max_jobs=2)
+        store.add(self.make_finished_job("a", time.monotonic() - 2))
+        store.add(self.make_finished_job("b", time.monotonic() - 1))
+        assert store.has_room()
+        assert store.get("a") is None
+        assert store.get("b") is not None
+
+    def test_running_jobs_are_kept(self):
+        """Test that running jobs are never evicted"""
+        store = JobStore(ttl_seconds=0, max_jobs=1)
+        store.add(Job("running", handle=None))
+        assert not store.has_room()
+        assert store.get("running") is not None
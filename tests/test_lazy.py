@@ -0,0 +1,30 @@
+"""Tests for deferred imports"""
+import subprocess
+import sys
+
+from python.lazy import lazy_import
+
+LOADED = "import sys; print('ortools.sat.python.cp_model_helper' in sys.modules)"
+
+
+def _ortools_loaded_after(statement):
+    out = subprocess.run(
+        [sys.executable, "-c", f"{statement}; {LOADED}"], capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip() == "True"
+
+
+class TestLazyImport:
+    """Tests for lazy_import and the modules using it"""
+
+    def test_loaded_module_returned(self):
+        """Test that a module already imported is returned as it is"""
+        assert lazy_import("json") is sys.modules["json"]
+
+    def test_api_import_skips_ortools(self):
+        """Test that importing the API and the scheduler does not load OR-Tools"""
+        assert not _ortools_loaded_after("import app.main, python.scheduler, python.lns")
+
+    def test_loaded_on_first_solve(self):
+        """Test that OR-Tools is loaded once a CP-SAT solve needs it"""
+        assert _ortools_loaded_after("from python.scheduler import warm_up; warm_up()")
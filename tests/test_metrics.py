@@ -0,0 +1,179 @@
+"""Tests for the in-process metrics and the /metrics endpoint"""
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.main import app
+from app.metrics import CLIENT_CLOSED_REQUEST, Counter, Histogram, Registry, track_request
+
+
+@pytest.fixture
+def client():
+    """Create a test client"""
+    return TestClient(app)
+
+
+class TestMetricTypes:
+    """Tests for counters, histograms and their text format"""
+
+    def test_counter_by_labels(self):
+        """Test that each combination of label values counts on its own"""
+        counter = Counter("requests_total", "Requests", ("code",))
+        counter.inc("200")
+        counter.inc("200")
+        counter.inc("503")
+
+        assert counter.value("200") == 2
+        assert 'requests_total{code="503"} 1' in counter.collect()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket boundaries (le is inclusive), +Inf, sum and count"""
+        histogram = Histogram("latency_seconds", "Latency", (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        lines = histogram.collect()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert "latency_seconds_sum 3.65" in lines
+        assert "latency_seconds_count 4" in lines
+
+    def test_registry_renders_in_order(self):
+        """Test that HELP and TYPE lines precede each metric"""
+        registry = Registry()
+        registry.counter("a_total", "A")
+        registry.gauge("b", "B", lambda: 7)
+
+        assert registry.render() == "# HELP a_total A\n# TYPE a_total counter\n# HELP b B\n# TYPE b gauge\nb 7\n"
+
+    def test_counter_func_typed_as_counter(self):
+        """Test that a count read at scrape time is exported as a counter"""
+        registry = Registry()
+        registry.counter_func("hits_total", "Hits", lambda: 3)
+
+        assert registry.render() == "# HELP hits_total Hits\n# TYPE hits_total counter\nhits_total 3\n"
+
+
+def _seconds(histogram, *label_values):
+    # The _sum sample of one label combination
+    prefix = histogram.name + "_sum" + metrics._labels(histogram.labels, label_values) + " "
+    return next((float(line[len(prefix):]) for line in histogram.collect() if line.startswith(prefix)), 0.0)
+
+
+class TestTrackRequest:
+    """Tests for track_request around streaming responses"""
+
+    @staticmethod
+    async def _lines(endpoint):
+        with track_request(endpoint):
+            yield "first"
+            await asyncio.sleep(0.05)
+            yield "second"
+
+    def test_covers_the_whole_stream(self):
+        """Test that the time between a generator's lines is part of the request's duration"""
+        async def consume():
+            return [line async for line in self._lines("test-stream")]
+
+        assert asyncio.run(consume()) == ["first", "second"]
+        assert metrics.REQUESTS.value("test-stream", "200") == 1
+        assert _seconds(metrics.REQUEST_SECONDS, "test-stream") >= 0.05
+
+    def test_closed_stream_counted_as_client_closed(self):
+        """Test that a stream closed before its end counts as 499"""
+        async def abandon():
+            lines = self._lines("test-closed")
+            await lines.__anext__()
+            await lines.aclose()
+
+        asyncio.run(abandon())
+        assert metrics.REQUESTS.value("test-closed", str(CLIENT_CLOSED_REQUEST)) == 1
+        assert metrics.REQUESTS.value("test-closed", "200") == 0
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics"""
+
+    def test_records_requests_and_solves(self, client):
+        """Test that a schedule request shows up in the request, validation, pool and solve metrics"""
+        requests = metrics.REQUESTS.value("schedule", "200")
+        runs = metrics.RUN_SECONDS.count()
+        validations = metrics.VALIDATION_SECONDS.count()
+        response = client.post("/api/schedule", json={"participants": 9, "tables": 3, "rounds": 2})
+        assert response.status_code == 200
+
+        assert metrics.REQUESTS.value("schedule", "200") == requests + 1
+        assert metrics.RUN_SECONDS.count() == runs + 1
+        assert metrics.VALIDATION_SECONDS.count() == validations + 1
+        text = client.get("/metrics").text
+        assert 'scheduler_solves_total{engine="constructive",status="OPTIMAL"}' in text
+        assert "scheduler_pool_queue_wait_seconds_count" in text
+        assert "scheduler_pool_in_flight 0" in text
+        assert "# TYPE scheduler_cache_misses_total counter" in text
+        assert "scheduler_cache_misses_total 1" in text
+
+    def test_rejected_request_counted_by_code(self, client):
+        """Test that an infeasible instance is counted with its 422"""
+        before = metrics.REQUESTS.value("schedule", "422")
+        response = client.post("/api/schedule", json={
+            "participants": 6, "tables": 2, "rounds": 2,
+            "never_together_pairs": [{"u": 3, "v": 1}, {"u": 3, "v": 2}],
+        })
+
+        assert response.status_code == 422
+        assert metrics.REQUESTS.value("schedule", "422") == before + 1
+
+    def test_batch_timed_over_its_solves(self, client):
+        """Test that a batch is counted once its stream ends and its duration covers the solves"""
+        requests = metrics.REQUESTS.value("batch", "200")
+        batch_seconds = _seconds(metrics.REQUEST_SECONDS, "batch")
+        run_seconds = _seconds(metrics.RUN_SECONDS)
+        response = client.post("/api/schedule/batch", json={"instances": [
+            {"participants": 12, "tables": 3, "rounds": 3, "engine": "cpsat", "time_limit_seconds": 1},
+        ]})
+        assert response.status_code == 200
+
+        assert metrics.REQUESTS.value("batch", "200") == requests + 1
+        assert _seconds(metrics.REQUEST_SECONDS, "batch") - batch_seconds >= _seconds(metrics.RUN_SECONDS) - run_seconds
+
+    def test_stream_counted_when_its_stream_ends(self, client):
+        """Test that a streamed solve is counted once with a duration covering the solve"""
+        requests = metrics.REQUESTS.value("stream", "200")
+        stream_seconds = _seconds(metrics.REQUEST_SECONDS, "stream")
+        run_seconds = _seconds(metrics.RUN_SECONDS)
+        response = client.post("/api/schedule/stream", json={
+            "participants": 12, "tables": 3, "rounds": 3, "engine": "cpsat", "time_limit_seconds": 1,
+        })
+        assert "event: result" in response.text
+
+        assert metrics.REQUESTS.value("stream", "200") == requests + 1
+        solve_seconds = _seconds(metrics.RUN_SECONDS) - run_seconds
+        assert _seconds(metrics.REQUEST_SECONDS, "stream") - stream_seconds >= solve_seconds
+
+    def test_rejected_repair_counted(self, client):
+        """Test that repair requests go through the request metrics"""
+        before = metrics.REQUESTS.value("repair", "400")
+        response = client.post("/api/schedule/repair", json={
+            "participants": 6, "tables": 2, "assignments": [[[1, 3, 4], [2, 5, 6]]],
+            "frozen_rounds": 0, "removed_participants": [1],
+        })
+
+        assert response.status_code == 400
+        assert metrics.REQUESTS.value("repair", "400") == before + 1
+
+    def test_job_counted_when_it_ends(self, client):
+        """Test that a background job is counted once its solve has finished"""
+        before = metrics.REQUESTS.value("job", "200")
+        job = client.post("/api/jobs", json={
+            "participants": 12, "tables": 3, "rounds": 3, "engine": "cpsat", "time_limit_seconds": 1,
+        }).json()
+        for _ in range(100):
+            if client.get(f"/api/jobs/{job['job_id']}").json()["status"] != "running":
+                break
+            time.sleep(0.1)
+
+        assert metrics.REQUESTS.value("job", "200") == before + 1
@@ -0,0 +1,144 @@
+"""Tests for the solver process pool"""
+import asyncio
+import queue
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.scheduler as scheduler_api
+from app.main import app
+from app.pool import ClientDisconnectedError, PoolSaturatedError, SolveHandle, SolverPool, warm_up_enabled
+from python.scheduler import schedule, warm_up
+
+
+class TestSolverPool:
+    """Tests for SolverPool"""
+
+    def test_invalid_sizes(self):
+        """Test that pool sizes are validated"""
+        with pytest.raises(ValueError):
+            SolverPool(max_workers=0, queue_depth=1)
+        with pytest.raises(ValueError):
+            SolverPool(max_workers=1, queue_depth=-1)
+
+    def test_runs_in_worker(self):
+        """Test that a function runs in a worker process and returns its result"""
+        pool = SolverPool(max_workers=1, queue_depth=0)
+        try:
+            assert asyncio.run(pool.run(max, 3, 7)) == 7
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    def test_rejects_when_full(self):
+        """Test that calls beyond workers plus queue depth are rejected immediately"""
+        pool = SolverPool(max_workers=1, queue_depth=1)
+
+        async def scenario():
+            running = [asyncio.ensure_future(pool.run(time.sleep, 1)) for _ in range(2)]
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(time.sleep, 1)
+            assert time.perf_counter() - started < 0.5
+            await asyncio.gather(*running)
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+
+
+class _LateQueue(queue.Queue):
+    # A timed get misses the reports, as if they arrived right after its timeout
+    def get(self, block=True, timeout=None):
+        if block:
+            raise queue.Empty
+        return super().get(block, timeout)
+
+
+class TestSolveHandle:
+    """Tests for the progress channel of a solve"""
+
+    def test_reports_after_completion_not_lost(self):
+        """Test that reports still queued when the solve completes are yielded before the end"""
+        updates = _LateQueue()
+        for objective in (3, 5):
+            updates.put({"objective_value": objective})
+
+        async def scenario():
+            future = asyncio.get_running_loop().create_future()
+            future.set_result("done")
+            return [item async for item in SolveHandle(future, updates, None).updates()]
+
+        assert asyncio.run(scenario()) == [{"objective_value": 3}, {"objective_value": 5}]
+
+
+class TestStartup:
+    """Tests for starting and warming up the pool workers"""
+
+    def test_start_spawns_warm_workers(self):
+        """Test that start() launches every worker through the initializer before any solve"""
+        pool = SolverPool(max_workers=2, queue_depth=0, initializer=warm_up)
+        try:
+            seconds = asyncio.run(pool.start())
+
+            assert seconds > 0 and pool.startup_seconds == seconds
+            assert len(pool._get_executor()._processes) == 2
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    def test_warm_up_can_be_disabled(self, monkeypatch):
+        """Test that SOLVER_POOL_WARM_UP turns the warm-up off"""
+        monkeypatch.setenv("SOLVER_POOL_WARM_UP", "0")
+        assert not warm_up_enabled()
+        monkeypatch.delenv("SOLVER_POOL_WARM_UP")
+        assert warm_up_enabled()
+
+
+class TestSaturatedEndpoint:
+    """Tests for the schedule endpoint when the pool is full"""
+
+    def test_returns_503(self, monkeypatch):
+        """Test that a saturated pool maps to 503 with Retry-After"""
+        pool = SolverPool(max_workers=1, queue_depth=0)
+        pool.in_flight = 1
+        monkeypatch.setattr(scheduler_api, "get_pool", lambda: pool)
+
+        client = TestClient(app)
+        response = client.post(
+            "/api/schedule", json={"participants": 4, "tables": 2, "rounds": 1}
+        )
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert client.get("/health").status_code == 200
+
+
+class TestCancellation:
+    """Tests for stopping solves nobody waits for any more"""
+
+    def test_disconnect_stops_solve(self):
+        """Test that a disconnected client stops the solve and frees the worker long before its limit"""
+        pool = SolverPool(max_workers=1, queue_depth=0)
+        same_once = [(11 + i, 30 + i) for i in range(15)]
+
+        async def disconnected() -> bool:
+            return True
+
+        async def scenario():
+            started = time.perf_counter()
+            with pytest.raises(ClientDisconnectedError):
+                await pool.run_until_disconnected(
+                    disconnected, schedule, poll_seconds=0.5, num_participants=60, num_tables=10,
+                    num_rounds=4, same_once_pairs=same_once, never_together_pairs=[],
+                    time_limit_seconds=120, engine="cpsat",
+                )
+            assert time.perf_counter() - started < 60
+            assert pool.in_flight == 0
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            pool.shutdown()
@@ -1,6 +1,27 @@
 """Tests for the scheduler module"""
+import threading
+import time
+
 import pytest
-from python.scheduler import compute_table_sizes, schedule
+from python.scheduler import (
+    ALPHA,
+    BETA,
+    GAMMA,
+    InfeasibleInstanceError,
+    _assignments_from_matrix,
+    _build_model,
+    _post_check,
+    _seat_matrix,
+    compute_table_sizes,
+    diagnose_instance,
+    is_valid_schedule,
+    objective_upper_bound,
+    repair_schedule,
+    schedule,
+    schedule_objective,
+)
+from python.seeding import greedy_assignments
+from python.symmetry import canonical_assignments, guest_classes
 
 
 class TestComputeTableSizes:
@@ -100,14 +121,15 @@ class TestSchedule:
         result = schedule(
             num_participants=6,
             num_tables=2,
-            num_rounds=3,
+            num_rounds=2,
             same_once_pairs=[],
             never_together_pairs=[(4, 6)],
             time_limit_seconds=10
         )
 
         # Check that pair (4, 6) never appears together
-        for r in range(3):
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        for r in range(2):
             for table in result["assignments"][r]:
                 assert not (4 in table and 6 in table)
 
@@ -157,3 +179,582 @@ class TestSchedule:
         for r in range(2):
             sizes = result["table_sizes_per_round"][r]
             assert max(sizes) - min(sizes) <= 1
+
+    def test_guests_meet_at_most_once(self):
+        """Test that no two guests share a table in more than one round"""
+        result = schedule(
+            num_participants=12,
+            num_tables=3,
+            num_rounds=3,
+            same_once_pairs=[],
+            never_together_pairs=[],
+            time_limit_seconds=10
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        meetings = {}
+        for round_tables in result["assignments"]:
+            for table in round_tables:
+                guests = [p for p in table if p > 3]
+                for i, u in enumerate(guests):
+                    for v in guests[i + 1:]:
+                        meetings[(u, v)] = meetings.get((u, v), 0) + 1
+        assert all(count == 1 for count in meetings.values())
+
+    def test_on_solution_reports_incumbents(self):
+        """Test that each incumbent is reported with its assignments"""
+        updates = []
+        result = schedule(
+            num_participants=6,
+            num_tables=2,
+            num_rounds=2,
+            same_once_pairs=[(3, 5)],
+            never_together_pairs=[],
+            time_limit_seconds=10,
+            on_solution=updates.append
+        )
+
+        assert updates
+        assert updates[-1]["objective_value"] == result["objective_value"]
+        assert updates[-1]["assignments"] == result["assignments"]
+        assert all(u["elapsed_seconds"] >= 0 for u in updates)
+
+
+class TestPrecheck:
+    """Tests for the combinatorial pre-check"""
+
+    def test_feasible_instance(self):
+        """Test that a satisfiable instance passes"""
+        diagnosis = diagnose_instance(12, 3, 3, [(4, 7)], [(5, 6)])
+
+        assert diagnosis["feasible"] is True
+        assert diagnosis["conflicts"] == []
+        assert diagnosis["max_satisfiable_same_once_pairs"] == 1
+
+    def test_never_together_clique(self):
+        """Test that more mutually exclusive guests than tables are detected"""
+        never = [(4, 5), (4, 6), (4, 7), (5, 6), (5, 7), (6, 7)]
+        diagnosis = diagnose_instance(12, 3, 2, [], never)
+
+        assert diagnosis["feasible"] is False
+        assert diagnosis["conflicts"][0]["kind"] == "never_together_clique"
+        assert diagnosis["conflicts"][0]["participants"] == [4, 5, 6, 7]
+
+    def test_guest_banned_from_every_host(self):
+        """Test that a guest who may sit with no host is detected"""
+        diagnosis = diagnose_instance(12, 3, 2, [], [(1, 4), (2, 4), (3, 4)])
+
+        assert diagnosis["conflicts"][0]["kind"] == "no_allowed_table"
+        assert diagnosis["conflicts"][0]["participants"] == [4]
+
+    def test_tables_too_large(self):
+        """Test that tables with more guests than there are tables fail after round 0"""
+        diagnosis = diagnose_instance(40, 5, 3, [], [])
+
+        assert [c["kind"] for c in diagnosis["conflicts"]] == ["tables_too_large"]
+
+    def test_unsatisfiable_same_once_pairs(self):
+        """Test that pairs which can never meet lower the satisfiable bound"""
+        same_once = [(1, 2), (4, 5), (6, 7)]
+        diagnosis = diagnose_instance(12, 3, 3, same_once, [(6, 7)])
+
+        assert diagnosis["feasible"] is True
+        assert diagnosis["unsatisfiable_same_once_pairs"] == [[1, 2], [6, 7]]
+        assert diagnosis["max_satisfiable_same_once_pairs"] == 1
+
+    def test_schedule_raises_with_diagnosis(self):
+        """Test that schedule() stops before building a model"""
+        with pytest.raises(InfeasibleInstanceError) as info:
+            schedule(8, 2, 2, [], [], time_limit_seconds=60)
+
+        assert info.value.diagnosis["feasible"] is False
+
+
+class TestEarlyStop:
+    """Tests for stopping at the analytic bound"""
+
+    def test_stops_at_bound_and_reports_gap(self):
+        """Test that reaching the ceiling ends the search as OPTIMAL with no gap"""
+        result = schedule(15, 5, 3, [(6, 9)], [], time_limit_seconds=30, engine="cpsat")
+
+        assert result["solver_status"] == "OPTIMAL"
+        assert result["objective_value"] == objective_upper_bound(15, 5, 3, [(6, 9)], [])
+        assert result["bound_gap"] == 0
+        assert 0 <= result["time_to_best"] < 30
+
+    def test_bound_ignores_unsatisfiable_pairs(self):
+        """Test that same-once pairs that can never meet do not raise the ceiling"""
+        base = objective_upper_bound(12, 3, 3, [(4, 7)], [])
+
+        assert objective_upper_bound(12, 3, 3, [(4, 7), (1, 2)], []) == base
+
+    def test_every_engine_reports_gap(self):
+        """Test that the constructive engine also reports bound_gap and time_to_best"""
+        result = schedule(12, 3, 3, [], [], time_limit_seconds=10, engine="constructive")
+
+        assert result["bound_gap"] == objective_upper_bound(12, 3, 3, [], []) - result["objective_value"]
+        assert result["time_to_best"] is not None
+
+
+class TestStopEvent:
+    """Tests for stopping a solve from outside"""
+
+    def test_stop_before_search(self):
+        """Test that a stop requested before the search starts is not lost"""
+        stop = threading.Event()
+        stop.set()
+        started = time.perf_counter()
+        result = schedule(
+            40, 8, 3, [(9 + i, 20 + i) for i in range(10)], [], time_limit_seconds=60,
+            engine="cpsat", stop_event=stop,
+        )
+
+        assert time.perf_counter() - started < 10
+        assert result["solver_status"] in ("UNKNOWN", "FEASIBLE")
+
+
+class TestConstructiveEngine:
+    """Tests for engine selection and the closed-form construction"""
+
+    def test_auto_uses_construction_without_pairs(self):
+        """Test that constraint-free instances are built without CP-SAT"""
+        result = schedule(
+            num_participants=105,
+            num_tables=15,
+            num_rounds=3,
+            same_once_pairs=[],
+            never_together_pairs=[],
+            time_limit_seconds=10
+        )
+
+        assert result["engine"] == "constructive"
+        assert result["solver_status"] == "OPTIMAL"
+        assert is_valid_schedule(result["assignments"], 105, 15, 3, [], [])
+
+    @pytest.mark.parametrize("a, b, c, same_once", [(24, 6, 3, []), (12, 3, 3, [(4, 5)])])
+    def test_auto_never_worse_than_cpsat(self, a, b, c, same_once):
+        """Test that auto solves CP-SAT from a construction short of the ceiling instead of returning it"""
+        auto = schedule(a, b, c, same_once, [], time_limit_seconds=10)
+        cpsat = schedule(a, b, c, same_once, [], time_limit_seconds=10, engine="cpsat")
+
+        assert auto["objective_value"] >= cpsat["objective_value"]
+        assert auto["solver_status"] == "OPTIMAL"
+        assert auto["bound_gap"] == 0
+
+    def test_construction_with_light_pairs(self):
+        """Test that a relabelled construction honours pair lists"""
+        same_once = [(6, 7), (8, 20), (1, 12)]
+        never = [(9, 10), (2, 11)]
+        result = schedule(
+            num_participants=30,
+            num_tables=5,
+            num_rounds=3,
+            same_once_pairs=same_once,
+            never_together_pairs=never,
+            time_limit_seconds=10,
+            engine="constructive",
+        )
+
+        assert result["engine"] == "constructive"
+        assert result["unsatisfied_same_once_pairs"] == []
+        assert result["never_together_violations"] == []
+        assert is_valid_schedule(result["assignments"], 30, 5, 3, same_once, never)
+
+    def test_falls_back_to_cpsat(self):
+        """Test that dimensions without a cyclic layout go to CP-SAT"""
+        result = schedule(
+            num_participants=6,
+            num_tables=2,
+            num_rounds=3,
+            same_once_pairs=[],
+            never_together_pairs=[],
+            time_limit_seconds=10
+        )
+
+        assert result["engine"] == "cpsat"
+
+    def test_cpsat_engine_forced(self):
+        """Test that engine='cpsat' skips the construction"""
+        result = schedule(
+            num_participants=12,
+            num_tables=3,
+            num_rounds=3,
+            same_once_pairs=[],
+            never_together_pairs=[],
+            time_limit_seconds=10,
+            engine="cpsat"
+        )
+
+        assert result["engine"] == "cpsat"
+
+    def test_unknown_engine(self):
+        """Test that an unknown engine name is rejected"""
+        with pytest.raises(ValueError):
+            schedule(4, 2, 1, [], [], engine="magic")
+
+    def test_objective_matches_cpsat(self):
+        """Test that the objective recomputed from assignments equals the solver's"""
+        same_once = [(4, 5), (1, 6)]
+        result = schedule(
+            num_participants=9,
+            num_tables=3,
+            num_rounds=2,
+            same_once_pairs=same_once,
+            never_together_pairs=[],
+            time_limit_seconds=10,
+            engine="cpsat"
+        )
+
+        assert result["solver_status"] == "OPTIMAL"
+        assert schedule_objective(result["assignments"], 3, same_once) == result["objective_value"]
+        assert result["objective_value"] <= objective_upper_bound(9, 3, 2, same_once, [])
+
+
+class TestWarmStart:
+    """Tests for solver hints"""
+
+    def test_greedy_seed_is_valid(self):
+        """Test that the greedy seeding produces a valid schedule on a mid-sized instance"""
+        same_once = [(5, 9), (10, 22), (3, 30)]
+        never = [(6, 7), (12, 25)]
+        seed = greedy_assignments(40, 8, 3, compute_table_sizes(40, 8), same_once, never)
+
+        assert is_valid_schedule(seed, 40, 8, 3, same_once, never)
+
+    def test_previous_schedule_as_hint(self):
+        """Test that a previous schedule can seed a new solve"""
+        previous = schedule(12, 3, 3, [], [], time_limit_seconds=10, engine="cpsat")
+        result = schedule(
+            num_participants=12,
+            num_tables=3,
+            num_rounds=3,
+            same_once_pairs=[(4, 7)],
+            never_together_pairs=[],
+            time_limit_seconds=10,
+            engine="cpsat",
+            hint_assignments=previous["assignments"]
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert is_valid_schedule(result["assignments"], 12, 3, 3, [(4, 7)], [])
+
+    def test_hint_with_other_dimensions_is_ignored(self):
+        """Test that hint entries outside the instance do not break the solve"""
+        result = schedule(
+            num_participants=6,
+            num_tables=2,
+            num_rounds=2,
+            same_once_pairs=[],
+            never_together_pairs=[],
+            time_limit_seconds=10,
+            engine="cpsat",
+            hint_assignments=[[[1, 3, 9], [2, 4], [7]], [[1], [2]], [[1], [2]]]
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+
+
+class TestSymmetryBreaking:
+    """Tests for interchangeable guests and rounds"""
+
+    def test_guest_classes(self):
+        """Test that guests are grouped by their pair partners"""
+        classes = guest_classes(12, 3, [(4, 9), (5, 9)], [(6, 7)])
+
+        assert classes == [[8, 10, 11, 12], [4, 5]]
+
+    def test_canonical_assignments_keeps_schedule_valid(self):
+        """Test that the representative is a valid schedule with ordered guests and rounds"""
+        same_once = [(4, 7)]
+        seed = greedy_assignments(15, 5, 3, compute_table_sizes(15, 5), same_once, [])
+        classes = guest_classes(15, 5, same_once, [])
+        canonical = canonical_assignments(seed, classes)
+
+        assert is_valid_schedule(canonical, 15, 5, 3, same_once, [])
+        assert schedule_objective(canonical, 5, same_once) == schedule_objective(seed, 5, same_once)
+        seats = [{p: t for t, table in enumerate(tables, start=1) for p in table} for tables in canonical]
+        for members in classes:
+            vectors = [[seat[g] for seat in seats] for g in members]
+            assert vectors == sorted(vectors)
+
+    def test_same_optimum_with_and_without(self):
+        """Test that breaking symmetry does not cut off the optimum"""
+        values = [
+            schedule(12, 3, 3, [(4, 7)], [], time_limit_seconds=20, engine="cpsat", symmetry_breaking=flag)
+            for flag in (True, False)
+        ]
+
+        assert [result["solver_status"] for result in values] == ["OPTIMAL", "OPTIMAL"]
+        assert values[0]["objective_value"] == values[1]["objective_value"]
+
+
+class TestSeatMatrix:
+    """Tests for the array form of a schedule used by extraction and post-checks"""
+
+    def test_round_trip(self):
+        """Test that a schedule survives conversion to the (rounds, participants) matrix and back"""
+        assignments = [[[1, 4, 7], [2, 5], [3, 6]], [[1, 6], [2, 4], [3, 5, 7]]]
+        matrix = _seat_matrix(assignments)
+
+        assert matrix.tolist() == [[0, 1, 2, 3, 1, 2, 3, 1], [0, 1, 2, 3, 2, 3, 1, 3]]
+        assert _assignments_from_matrix(matrix, 3) == assignments
+
+    def test_checks_with_absent_participants(self):
+        """Test that unseated participants never count as meeting anyone"""
+        assignments = [[[1, 4, 5], [2, 6]], [[1, 6], [2, 4]]]  # 5 left after round 0
+        satisfied, unsatisfied, violations = _post_check(assignments, [(4, 5), (5, 6), (4, 9)], [(1, 6)])
+
+        assert satisfied == [[4, 5]]
+        assert unsatisfied == [[5, 6], [4, 9]]
+        assert violations == [[1, 6]]
+        assert schedule_objective(assignments, 2, [(4, 5)]) == ALPHA + 5 * BETA + 2 * GAMMA
+
+    def test_repeated_meeting_detected(self):
+        """Test that two guests sharing a table twice make the schedule invalid"""
+        assignments = [[[1, 3, 4], [2, 5, 6]], [[1, 3, 4], [2, 5, 6]]]
+
+        assert not is_valid_schedule(assignments, 6, 2, 2, [], [])
+
+
+class TestHostConstants:
+    """Tests for hosts seated as constants rather than variables"""
+
+    def test_no_variables_for_hosts(self):
+        """Test that the model has seat variables for guests only"""
+        result = schedule(9, 3, 2, [], [], time_limit_seconds=10, engine="cpsat", symmetry_breaking=False)
+
+        assert result["model_size"]["constant_host_seats"] == 3 * 3 * 2
+        built = _build_model(9, 3, [0, 1], [(1, 5)], [(2, 6)])
+        names = [var.name for var in built.model.Proto().variables]
+        assert not any(name.startswith(("x_p1_", "x_p2_", "x_p3_")) for name in names)
+        assert "x_p4_t1_r0" in names
+
+    def test_host_pairs_still_enforced(self):
+        """Test that same-once and never-together pairs with a host hold without host variables"""
+        same_once, never = [(1, 5), (2, 8)], [(3, 6), (1, 7)]
+        result = schedule(12, 3, 3, same_once, never, time_limit_seconds=20, engine="cpsat")
+
+        assert is_valid_schedule(result["assignments"], 12, 3, 3, same_once, never)
+        assert result["satisfied_same_once_pairs"] == [[1, 5], [2, 8]]
+        for round_tables in result["assignments"]:
+            assert 6 not in round_tables[2] and 7 not in round_tables[0]
+
+
+class TestDiagnostics:
+    """Tests for the diagnostics entry of schedule()"""
+
+    def test_absent_unless_requested(self):
+        """Test that results carry no diagnostics by default"""
+        result = schedule(9, 3, 2, [], [], time_limit_seconds=10, engine="cpsat")
+
+        assert "diagnostics" not in result
+
+    def test_blocks_add_up_to_model_size(self):
+        """Test that the per-block counts cover the whole model and every phase is timed"""
+        result = schedule(
+            12, 3, 3, [(4, 7)], [(5, 8)], time_limit_seconds=10, engine="cpsat", diagnostics=True
+        )
+        diagnostics = result["diagnostics"]
+        blocks = diagnostics["blocks"]
+
+        assert list(blocks) == [
+            "x", "size", "guest_pair_uniqueness", "host_diversity", "never_together", "same_once",
+            "symmetry_breaking",
+        ]
+        assert sum(b["variables"] for b in blocks.values()) == result["model_size"]["variables"]
+        assert sum(b["constraints"] for b in blocks.values()) == result["model_size"]["constraints"]
+        assert list(diagnostics["phases"]) == [
+            "precheck", "construct", "build", "symmetry_breaking", "hint", "solve", "extract", "post_check",
+        ]
+        assert diagnostics["solver"]["branches"] >= 0
+        assert diagnostics["solver"]["best_bound"] >= result["objective_value"]
+
+    def test_other_engines_report_phases_only(self):
+        """Test that engines without one full model time their search as a single phase"""
+        result = schedule(24, 6, 3, [(7, 8)], [], time_limit_seconds=3, engine="lns", diagnostics=True)
+
+        assert list(result["diagnostics"]["phases"]) == ["precheck", "construct", "search"]
+        assert result["diagnostics"]["blocks"] is None
+
+
+class TestLexicographicMode:
+    """Tests for the staged objective"""
+
+    def test_stages_in_priority_order(self):
+        """Test that the pairs stage reaches its ceiling before hosts are optimised"""
+        same_once = [(4, 7), (8, 11)]
+        result = schedule(12, 3, 3, same_once, [], time_limit_seconds=20,
+                          engine="cpsat", objective_mode="lexicographic")
+
+        assert is_valid_schedule(result["assignments"], 12, 3, 3, same_once, [])
+        stages = result["objective_stages"]
+        assert [stage["term"] for stage in stages] == ["same_once_pairs", "host_visits", "pair_hosts"]
+        assert stages[0]["value"] == stages[0]["ceiling"] == 2
+        assert len(result["satisfied_same_once_pairs"]) == 2
+        assert result["objective_value"] == schedule_objective(result["assignments"], 3, same_once)
+
+    def test_constant_stages_skipped(self):
+        """Test that without same-once pairs only the host visits stage runs"""
+        result = schedule(12, 3, 2, [], [], time_limit_seconds=10,
+                          engine="cpsat", objective_mode="lexicographic")
+
+        assert [stage["term"] for stage in result["objective_stages"]] == ["host_visits"]
+        assert result["solver_status"] == "OPTIMAL"
+
+    def test_no_weighted_gap_beside_stage_optimality(self):
+        """Test that an OPTIMAL lexicographic result does not also report a weighted bound gap"""
+        result = schedule(10, 3, 3, [], [], time_limit_seconds=10,
+                          engine="cpsat", objective_mode="lexicographic")
+
+        assert result["solver_status"] == "OPTIMAL"
+        assert result["bound_gap"] is None
+        assert all(stage["status"] == "OPTIMAL" for stage in result["objective_stages"])
+
+    def test_unknown_mode_rejected(self):
+        """Test that an unknown objective mode is an error"""
+        with pytest.raises(ValueError):
+            schedule(6, 2, 2, [], [], objective_mode="pareto")
+
+
+class TestLNSEngine:
+    """Tests for the large-neighbourhood search engine"""
+
+    def test_lns_schedule_is_valid(self):
+        """Test that LNS returns a valid schedule with the pairs met"""
+        same_once = [(13, 14), (20, 31), (5, 40)]
+        never = [(15, 16), (7, 22)]
+        result = schedule(48, 8, 3, same_once, never, time_limit_seconds=5, engine="lns")
+
+        assert result["engine"] == "lns"
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert is_valid_schedule(result["assignments"], 48, 8, 3, same_once, never)
+        assert result["unsatisfied_same_once_pairs"] == []
+
+    def test_lns_removes_conflicts_from_start(self):
+        """Test that a start where guests keep meeting is turned into a valid schedule"""
+        start = [[[1, 4, 5, 6], [2, 7, 8, 9], [3, 10, 11, 12]] for _ in range(2)]
+        result = schedule(
+            12, 3, 2, [], [], time_limit_seconds=3, engine="lns", hint_assignments=start
+        )
+
+        assert is_valid_schedule(result["assignments"], 12, 3, 2, [], [])
+
+    def test_lns_reports_improvements(self):
+        """Test that on_solution sees each better incumbent"""
+        reports = []
+        result = schedule(
+            40, 8, 3, [(9, 10), (11, 30)], [], time_limit_seconds=3, engine="lns",
+            on_solution=reports.append
+        )
+
+        objectives = [report["objective_value"] for report in reports]
+        assert objectives == sorted(objectives)
+        if reports:
+            assert objectives[-1] == result["objective_value"]
+
+
+class TestRollingEngine:
+    """Tests for the round-by-round decomposition"""
+
+    def test_rolling_schedule_is_valid(self):
+        """Test that solving round by round still respects every hard constraint"""
+        same_once = [(13, 14), (20, 31), (5, 40)]
+        never = [(15, 16)]
+        result = schedule(48, 12, 6, same_once, never, time_limit_seconds=20, engine="rolling")
+
+        assert result["engine"] == "rolling"
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert is_valid_schedule(result["assignments"], 48, 12, 6, same_once, never)
+        assert result["objective_value"] == schedule_objective(result["assignments"], 12, same_once)
+        assert len(result["round_solve_seconds"]) == 6
+
+    def test_stopped_rolling_keeps_solved_rounds(self):
+        """Test that a rolling solve stopped after its first round keeps it and seats the rest greedily"""
+        stop = threading.Event()
+        first_rounds = []
+
+        def on_solution(update):
+            first_rounds.append([list(table) for table in update["assignments"][0]])
+            stop.set()
+
+        result = schedule(
+            24, 6, 3, [], [], time_limit_seconds=20, engine="rolling", on_solution=on_solution, stop_event=stop,
+        )
+
+        assert result["engine"] == "rolling"
+        assert result["greedy_rounds"] == [1, 2]
+        assert result["assignments"][0] == first_rounds[0]
+        assert result["solver_status"] in ("FEASIBLE", "OPTIMAL")
+        assert is_valid_schedule(result["assignments"], 24, 6, 3, [], [])
+
+    def test_rolling_with_lookahead(self):
+        """Test that looking ahead still keeps only one round per step"""
+        result = schedule(
+            12, 3, 3, [(4, 7)], [], time_limit_seconds=10, engine="rolling", lookahead_rounds=1
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert is_valid_schedule(result["assignments"], 12, 3, 3, [(4, 7)], [])
+        assert len(result["round_solve_seconds"]) == 3
+
+
+class TestRepair:
+    """Tests for re-solving the remaining rounds of a schedule"""
+
+    @pytest.fixture
+    def base(self):
+        return schedule(24, 6, 3, [(7, 8)], [], time_limit_seconds=10, engine="cpsat")
+
+    def test_frozen_rounds_unchanged(self, base):
+        """Test that played rounds are returned as they were"""
+        result = repair_schedule(
+            base["assignments"], 24, 6, [(7, 8)], [], frozen_rounds=1,
+            removed_participants=[9], time_limit_seconds=10
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert result["frozen_rounds"] == 1
+        assert result["assignments"][0] == base["assignments"][0]
+
+    def test_removed_guest_is_not_seated(self, base):
+        """Test that a guest who dropped out disappears from the later rounds"""
+        result = repair_schedule(
+            base["assignments"], 24, 6, [(7, 8)], [], frozen_rounds=1,
+            removed_participants=[9], time_limit_seconds=10
+        )
+
+        for round_tables in result["assignments"][1:]:
+            seated = sorted(p for table in round_tables for p in table)
+            assert seated == [p for p in range(1, 25) if p != 9]
+            assert max(map(len, round_tables)) - min(map(len, round_tables)) <= 1
+
+    def test_new_never_together_pair(self, base):
+        """Test that a never-together pair added late is honoured in the free rounds"""
+        table = next(t for t in base["assignments"][2] if len([p for p in t if p > 6]) >= 2)
+        u, v = [p for p in table if p > 6][:2]
+        result = repair_schedule(
+            base["assignments"], 24, 6, [(7, 8)], [], frozen_rounds=2,
+            add_never_together_pairs=[(u, v)], time_limit_seconds=10
+        )
+
+        assert result["solver_status"] in ["OPTIMAL", "FEASIBLE"]
+        assert result["never_together_violations"] == []
+        assert result["changed_seats"] >= 1
+        assert is_valid_schedule(result["assignments"], 24, 6, 3, [(7, 8)], [(u, v)])
+
+    def test_added_guest_is_seated(self, base):
+        """Test that a late guest joins from the first free round without meeting anyone twice"""
+        result = repair_schedule(
+            base["assignments"], 24, 6, [(7, 8)], [], frozen_rounds=1,
+            added_participants=1, time_limit_seconds=10
+        )
+
+        assert result["participants"] == 25
+        for round_tables in result["assignments"][1:]:
+            assert 25 in [p for table in round_tables for p in table]
+        assert result["table_sizes"] == compute_table_sizes(25, 6)
+
+    def test_removing_a_host_is_rejected(self, base):
+        """Test that hosts cannot be removed"""
+        with pytest.raises(AssertionError):
+            repair_schedule(base["assignments"], 24, 6, [], [], frozen_rounds=1, removed_participants=[2])
@@ -0,0 +1,69 @@
+"""Tests for the model skeleton cache"""
+from python.scheduler import _build_model, schedule
+from python.skeletons import SkeletonCache
+
+
+def build(skeletons, same_once=((4, 7), (1, 9)), never=((5, 8),), **kwargs):
+    return _build_model(12, 3, [0, 1, 2], list(same_once), list(never), skeletons=skeletons, **kwargs)
+
+
+class TestSkeletonCache:
+    """Tests for SkeletonCache and its use by _build_model"""
+
+    def test_cloned_model_matches_fresh_build(self):
+        """Test that a model built on a cached skeleton equals one built from scratch"""
+        fresh = build(None)
+        cache = SkeletonCache()
+        build(cache, same_once=[(5, 6)], never=[])
+        cloned = build(cache)
+
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert str(cloned.model.Proto()) == str(fresh.model.Proto())
+        assert cloned.blocks.counts == fresh.blocks.counts
+
+    def test_clones_are_independent(self):
+        """Test that adding pairs to one clone leaves the cached skeleton untouched"""
+        cache = SkeletonCache()
+        first = build(cache, same_once=[(4, 7), (5, 8), (6, 9)])
+        second = build(cache, same_once=[], never=[])
+
+        assert len(second.model.Proto().variables) < len(first.model.Proto().variables)
+        assert str(second.model.Proto()) == str(build(None, same_once=[], never=[]).model.Proto())
+
+    def test_lru_eviction(self):
+        """Test that the least recently used skeleton is dropped beyond max_entries"""
+        cache = SkeletonCache(max_entries=1)
+        build(cache)
+        _build_model(9, 3, [0, 1], [], [], skeletons=cache)
+        build(cache)
+
+        assert cache.stats() == {
+            "hits": 0, "misses": 3, "disk_hits": 0, "entries": 1, "max_entries": 1, "persistent": False,
+        }
+
+    def test_disk_tier_shared_between_caches(self, tmp_path):
+        """Test that a skeleton written by one cache is loaded by another on the same directory"""
+        build(SkeletonCache(directory=str(tmp_path)))
+        other = SkeletonCache(max_entries=0, directory=str(tmp_path))
+        loaded = build(other)
+
+        assert other.stats()["disk_hits"] == 1
+        assert str(loaded.model.Proto()) == str(build(None).model.Proto())
+
+    def test_fixed_rounds_bypass_cache(self):
+        """Test that models with history or absences are always built from scratch"""
+        cache = SkeletonCache()
+        build(cache, history=[{4: 1, 7: 1}])
+        build(cache, absent={(5, 0)})
+        _build_model(12, 3, [1, 2], [], [], skeletons=cache)
+
+        assert cache.stats()["entries"] == 0 and cache.stats()["misses"] == 0
+
+    def test_schedule_unchanged_on_cache_hit(self):
+        """Test that repeated solves with a fixed seed return the same schedule"""
+        kwargs = dict(time_limit_seconds=10, engine="cpsat", solver_params={"random_seed": 0, "num_workers": 1})
+        first = schedule(24, 6, 3, [(7, 8), (9, 20)], [(10, 11)], **kwargs)
+        second = schedule(24, 6, 3, [(7, 8), (9, 20)], [(10, 11)], **kwargs)
+
+        assert second["assignments"] == first["assignments"]
+        assert second["objective_value"] == first["objective_value"]
@@ -0,0 +1,77 @@
+"""Tests for the CP-SAT parameter defaults"""
+import pytest
+from ortools.sat.python import cp_model
+
+import python.solver_params as solver_params
+from python.solver_params import apply_solver_params, default_num_workers, resolve_solver_params
+
+
+@pytest.fixture(autouse=True)
+def no_solver_env(monkeypatch):
+    """Keep SOLVER_* variables of the test environment out of the defaults"""
+    for env in solver_params.SOLVER_PARAM_ENV.values():
+        monkeypatch.delenv(env, raising=False)
+
+
+class TestWorkerCount:
+    """Tests for the default number of search workers"""
+
+    @pytest.mark.parametrize("content, expected", [
+        ("200000 100000", 2),
+        ("150000 100000", 2),
+        ("max 100000", None),
+    ])
+    def test_cgroup_v2_quota(self, monkeypatch, content, expected):
+        """Test that a CPU quota is rounded up to whole CPUs"""
+        monkeypatch.setattr(solver_params, "_read", lambda path: content)
+
+        assert solver_params._cgroup_cpu_limit() == expected
+
+    def test_quota_caps_affinity(self, monkeypatch):
+        """Test that the quota wins over a larger affinity mask"""
+        monkeypatch.setattr(solver_params.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+        monkeypatch.setattr(solver_params, "_cgroup_cpu_limit", lambda: 4)
+
+        assert solver_params.available_cpus() == 4
+
+    def test_shared_between_concurrent_solves(self, monkeypatch):
+        """Test that concurrent solves split the CPUs and always keep one worker"""
+        monkeypatch.setattr(solver_params, "available_cpus", lambda: 4)
+
+        assert default_num_workers() == 4
+        assert default_num_workers(2) == 2
+        assert default_num_workers(8) == 1
+
+    def test_environment_override(self, monkeypatch):
+        """Test that SOLVER_NUM_WORKERS replaces the derived count"""
+        monkeypatch.setenv("SOLVER_NUM_WORKERS", "3")
+
+        assert default_num_workers(4) == 3
+
+
+class TestResolveSolverParams:
+    """Tests for resolve_solver_params"""
+
+    def test_explicit_values_win(self, monkeypatch):
+        """Test that request values beat the environment, which beats the built-in defaults"""
+        monkeypatch.setenv("SOLVER_RANDOM_SEED", "7")
+        monkeypatch.setenv("SOLVER_USE_LNS", "false")
+
+        resolved = resolve_solver_params({"random_seed": 3, "num_workers": 2})
+
+        assert resolved == {"num_workers": 2, "random_seed": 3, "use_lns": False}
+
+    def test_unknown_key_rejected(self):
+        """Test that a misspelt parameter is an error rather than silently ignored"""
+        with pytest.raises(ValueError):
+            resolve_solver_params({"workers": 2})
+
+    def test_applied_to_solver(self):
+        """Test that the parameters reach the CP-SAT solver"""
+        solver = cp_model.CpSolver()
+        apply_solver_params(solver, {"num_workers": 2, "random_seed": 5, "linearization_level": 2})
+
+        assert solver.parameters.num_workers == 2
+        assert solver.parameters.random_seed == 5
+        assert solver.parameters.linearization_level == 2
+        assert not solver.parameters.log_search_progress